@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmarks for the Storyscript compiler.
+
+Usage:
+    python scripts/benchmark.py dispatch
+    python scripts/benchmark.py parse [STORY...]
+    python scripts/benchmark.py incremental
+    python scripts/benchmark.py backends [STORY...]
+"""
+import json
+import random
+import timeit
+from glob import glob
+from os import path
+
+from bom_open import bom_open
+
+import click
+
+from lark import Lark
+
+from storyscript.Api import Api
+from storyscript.compiler.Backends import Backends
+from storyscript.compiler.semantics.Visitors import ScopeSelectiveVisitor
+from storyscript.parser import Parser, Tree
+
+root_dir = path.dirname(path.dirname(path.realpath(__file__)))
+
+
+def report(name, seconds, count, unit):
+    """
+    Prints the time per `unit` of a benchmark.
+    """
+    per_unit = seconds / count * 1e9
+    click.echo(f'{name:>24}: {per_unit:10.1f} ns/{unit}')
+
+
+def best_of(fn, repeat):
+    """
+    Returns the fastest of `repeat` runs of `fn` in seconds.
+    """
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+class DispatchVisitor(ScopeSelectiveVisitor):
+    """
+    Visitor dispatching with the precomputed dispatch table.
+    """
+    def __init__(self):
+        pass
+
+    def block(self, tree, scope):
+        self.visit_children(tree, scope)
+
+    def rules(self, tree, scope):
+        self.visit_children(tree, scope)
+
+    def assignment(self, tree, scope):
+        self.visit_children(tree, scope)
+
+
+class GetattrVisitor(DispatchVisitor):
+    """
+    Visitor dispatching with hasattr/getattr on every node.
+    """
+    def visit(self, tree, scope=None):
+        if hasattr(self, tree.data):
+            return getattr(self, tree.data)(tree, scope)
+
+
+def load_stories(paths):
+    """
+    Reads the given stories or all end-to-end test stories.
+    """
+    if len(paths) == 0:
+        paths = sorted(glob(path.join(root_dir, 'tests', 'e2e', '*.story')))
+    sources = []
+    for story in paths:
+        with bom_open(story, 'r') as f:
+            sources.append(f.read())
+    return sources
+
+
+class TwoPassParser(Parser):
+    """
+    Parser building the lark parse tree first and transforming it to a
+    Storyscript tree in a second pass.
+    """
+    def _lark(self):
+        return Lark(self.grammar(), parser=self.algo, postlex=self.indenter())
+
+    def parse(self, source, allow_single_quotes=False):
+        tree = self.lark.parse(f'{source}\n')
+        return self.transformer(allow_single_quotes).transform(tree)
+
+
+def dispatch_tree(nodes):
+    """
+    Builds a tree of `nodes` nested blocks with handled and unhandled nodes.
+    """
+    names = ['rules', 'assignment', 'expression', 'entity']
+    children = []
+    for i in range(nodes // (len(names) + 1)):
+        leaves = [Tree(name, []) for name in names]
+        children.append(Tree('block', leaves))
+    return Tree('block', children)
+
+
+def large_story(lines):
+    """
+    Builds a story with approximately `lines` lines.
+    """
+    block = [
+        'a{i} = {i}',
+        'if a{i} > 2',
+        '    b = "x{i}"',
+        'else',
+        '    b = [a{i}, {{"k": a{i}}}]',
+        '# comment {i}',
+        '',
+    ]
+    source = []
+    for i in range(lines // len(block)):
+        source.extend(line.format(i=i) for line in block)
+    return '\n'.join(source)
+
+
+@click.group()
+def benchmark():
+    pass
+
+
+@benchmark.command()
+@click.option('--nodes', default=100000, help='Number of visited nodes')
+@click.option('--repeat', default=5, help='Number of runs')
+def dispatch(nodes, repeat):
+    """
+    Per-node overhead of the visitor dispatch.
+    """
+    tree = dispatch_tree(nodes)
+    for visitor in (GetattrVisitor(), DispatchVisitor()):
+        seconds = best_of(lambda: visitor.visit(tree), repeat)
+        report(type(visitor).__name__, seconds, nodes, 'node')
+
+
+@benchmark.command()
+@click.argument('stories', nargs=-1, type=click.Path(exists=True))
+@click.option('--repeat', default=5, help='Number of runs')
+def parse(stories, repeat):
+    """
+    Time to parse stories into Storyscript trees.
+    """
+    two_pass, inline = TwoPassParser(), Parser()
+    sources = []
+    for source in load_stories(stories):
+        # only benchmark valid stories
+        try:
+            two_pass.parse(source)
+        except Exception:
+            continue
+        sources.append(source)
+
+    size = sum(len(source) for source in sources)
+    click.echo(f'{len(sources)} stories, {size} characters')
+    for parser in (two_pass, inline):
+        def run():
+            for source in sources:
+                parser.parse(source)
+        seconds = best_of(run, repeat)
+        report(type(parser).__name__, seconds, size, 'char')
+
+
+@benchmark.command()
+@click.option('--lines', default=5000, help='Number of lines of the story')
+@click.option('--edits', default=20, help='Number of edits')
+def incremental(lines, edits):
+    """
+    Latency of reparsing a large story after single-character edits.
+    """
+    parser = Parser()
+    source = large_story(lines)
+    previous = parser.parse_incremental(source)
+    # every edit inserts a digit into the value of a random assignment
+    rand = random.Random(0)
+    sources = []
+    for _ in range(edits):
+        line = rand.randrange(lines // 7) * 7
+        source = source.split('\n')
+        source[line] = source[line].replace('= ', '= 1', 1)
+        source = '\n'.join(source)
+        sources.append(source)
+
+    def full():
+        for source in sources:
+            parser.parse(source)
+
+    def reparse():
+        tree = previous
+        for source in sources:
+            tree = parser.parse_incremental(source, tree)
+
+    assert parser.parse(sources[-1]) == \
+        parser.parse_incremental(sources[-1], previous)
+    click.echo(f'{len(source)} characters, {edits} edits')
+    for name, fn in (('full', full), ('incremental', reparse)):
+        seconds = best_of(fn, 3)
+        click.echo(f'{name:>24}: {seconds / edits * 1e3:10.2f} ms/edit')
+
+
+@benchmark.command()
+@click.argument('stories', nargs=-1, type=click.Path(exists=True))
+@click.option('--repeat', default=5, help='Number of runs')
+def backends(stories, repeat):
+    """
+    Size of the dumped output of each backend and the time an engine needs
+    to load it.
+    """
+    # only benchmark stories which compile
+    sources = [source for source in load_stories(stories)
+               if Api.loads(source).success()]
+    click.echo(f'{len(sources)} stories')
+    for name in Backends.names():
+        backend = Backends.get(name)
+        dumped = []
+        for source in sources:
+            output = Api.loads(source, {'backend': name}).result().output()
+            dumped.append(json.dumps(output, indent=backend.indent))
+
+        def load():
+            for output in dumped:
+                json.loads(output)
+        size = sum(len(output) for output in dumped)
+        click.echo(f'{name:>24}: {size:10d} bytes')
+        report(f'{name} load', best_of(load, repeat), len(dumped), 'story')
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -99,7 +99,7 @@ class Api:
         features = Features(features)
         try:
             story = Story.from_stream(stream, features).process()
-            s = {stream.name: story, 'services': story['services']}
+            s = {stream.name: story, 'services': story.get('services', [])}
             return StoryscriptCompilationResult.from_result(s)
         except StoryError as e:
             return StoryscriptCompilationResult.from_error(e)
@@ -2,8 +2,12 @@
 import json
 
 from .Bundle import Bundle
+from .Features import Features
+from .Formatter import Formatter
 from .Story import Story
-from .exceptions import StoryError
+from .compiler.Backends import Backends
+from .exceptions import CompilerError, StoryError
+from .hub.Hub import HubSnapshot
 from .parser import Grammar
 
 
@@ -30,33 +34,88 @@ class App:
         story = Story.from_file(path, features=features)
         output = story.parse(parser=parser).format()
         if inplace:
-            with open(path, 'w') as w:
-                w.write(output)
+            if output != story.story:
+                with open(path, 'w') as w:
+                    w.write(output)
             return None
 
         return output
 
+    @staticmethod
+    def format_paths(path, ignored_path=None, ebnf=None, features=None,
+                     jobs=None, cache=None):
+        """
+        Formats all stories found in path with a pool of `jobs` processes,
+        returning a FormattedStory for each of them
+        """
+        formatter = Formatter(ebnf=ebnf, features=features, jobs=jobs,
+                              cache=cache)
+        results = formatter.format(Formatter.paths(path,
+                                                   ignored_path=ignored_path))
+        formatter.save()
+        return results
+
     @staticmethod
     def compile(path, ignored_path=None, ebnf=None, concise=False,
                 first=False, features=None):
         """
         Parses and compiles stories found in path, returning JSON
         """
+        features = App.concise(features, concise)
+        bundle = Bundle.from_path(path, ignored_path=ignored_path,
+                                  features=features)
+        backend = App.backend(Features(features).backend)
+        return App.dumps(bundle.bundle(ebnf=ebnf), first=first,
+                         indent=backend.indent)
+
+    @staticmethod
+    def concise(features, concise):
+        """
+        Turns on the concise output, which leaves out empty fields, in the
+        features if `concise`
+        """
+        if not concise:
+            return features
+        return {**(features or {}), 'concise': True}
+
+    @staticmethod
+    def backend(name):
+        """
+        Returns the compiler backend called `name`
+        """
+        try:
+            return Backends.get(name)
+        except CompilerError as e:
+            raise StoryError(e, None) from e
+
+    @staticmethod
+    def hub_snapshot(path, output, ignored_path=None, ebnf=None,
+                     features=None):
+        """
+        Compiles stories found in path and writes a hub snapshot with the
+        services they use to output, returning the services
+        """
         bundle = Bundle.from_path(path, ignored_path=ignored_path,
                                   features=features)
-        result = bundle.bundle(ebnf=ebnf)
-        if concise:
-            result = _clean_dict(result)
+        services = bundle.bundle(ebnf=ebnf).get('services', [])
+        HubSnapshot.write(output, services)
+        return services
+
+    @staticmethod
+    def dumps(result, first=False, indent=2):
+        """
+        Converts a bundle of compiled stories to JSON
+        """
         if first:
             if len(result['stories']) != 1:
                 raise StoryError.create_error('first_option_more_stories')
             result = next(iter(result['stories'].values()))
-        return json.dumps(result, indent=2)
+        return json.dumps(result, indent=indent)
 
     @staticmethod
     def lex(path, features, ebnf=None):
         """
-        Lex stories, producing the list of used tokens
+        Lex stories, producing the tokens of each story as they are lexed
         """
         return Bundle.from_path(path, features=features).lex(ebnf=ebnf)
 
@@ -66,12 +125,3 @@ class App:
         Returns the current grammar
         """
         return Grammar().build()
-
-
-def _clean_dict(d):
-    """
-    Removes all falsy elements from a nested dict
-    """
-    if not isinstance(d, dict):
-        return d
-    return {k: _clean_dict(v) for k, v in d.items() if v}
@@ -4,7 +4,8 @@ import subprocess
 
 from .Features import Features
 from .Story import Story
-from .parser import Parser
+from .compiler.semantics.ServiceTyping import ServiceTyping
+from .parser import ParserPool
 
 
 class Bundle:
@@ -14,6 +15,8 @@ class Bundle:
 
     def __init__(self, story_files=None, features=None):
         self.stories = {}
+        # service name -> service data fetched from the hub
+        self.service_data = {}
         if isinstance(features, Features):
             self.features = features
         else:
@@ -100,6 +103,13 @@ class Bundle:
             self.story_files[path] = Story.read(path)
         return Story(self.story_files[path], features=self.features, path=path)
 
+    def remove_story(self, path):
+        """
+        Removes a story and its results from the bundle
+        """
+        self.story_files.pop(path, None)
+        self.stories.pop(path, None)
+
     def find_stories(self):
         """
         Finds bundle stories.
@@ -109,7 +119,7 @@ class Bundle:
     def services(self):
         services = []
         for storypath, story in self.stories.items():
-            services += story['services']
+            services += story.get('services', [])
         services = list(set(services))
         services.sort()
         return services
@@ -117,7 +127,7 @@ class Bundle:
     @staticmethod
     def parser(ebnf):
         if ebnf is not None:
-            return Parser(ebnf=ebnf)
+            return ParserPool.instance().get(ebnf)
         return None
 
     def parse(self, stories, parser, lower):
@@ -129,14 +139,39 @@ class Bundle:
             story.parse(parser=parser, lower=lower)
             self.stories[storypath] = story.tree
 
+    def prefetch(self, trees):
+        """
+        Fetches the data of the services used by parsed trees at once.
+        Found services are kept, s.t. later compilations of the bundle (e.g.
+        while watching) only fetch services which haven't been found yet.
+        """
+        names = set()
+        for tree in trees:
+            names.update(ServiceTyping.service_names(tree))
+        services = {name: self.service_data[name] for name in names
+                    if name in self.service_data}
+        missing = names - services.keys()
+        if len(missing) > 0:
+            services.update(ServiceTyping.prefetch(
+                missing, snapshot=self.features.hub_snapshot))
+        self.service_data.update((name, data)
+                                 for name, data in services.items()
+                                 if data is not None)
+        return services
+
     def compile(self, stories, parser):
         """
         Reads, parses and compiles the story.
+        The services of all stories are fetched before compiling them.
         """
+        parsed = []
         for storypath in stories:
             story = self.load_story(storypath)
             story.parse(parser=parser)
-            story.compile()
+            parsed.append((storypath, story))
+        services = self.prefetch(story.tree for _, story in parsed)
+        for storypath, story in parsed:
+            story.compile(services=services)
             self.stories[storypath] = story.compiled.output()
 
     def bundle(self, ebnf=None):
@@ -146,8 +181,17 @@ class Bundle:
         entrypoint = self.find_stories()
         parser = self.parser(ebnf)
         self.compile(entrypoint, parser=parser)
-        return {'stories': self.stories, 'services': self.services(),
-                'entrypoint': entrypoint}
+        return self.result(entrypoint)
+
+    def result(self, entrypoint):
+        """
+        Returns the bundle of the compiled stories
+        """
+        result = {'stories': self.stories, 'services': self.services(),
+                  'entrypoint': entrypoint}
+        if self.features.concise:
+            return {k: v for k, v in result.items() if v}
+        return result
 
     def bundle_trees(self, ebnf=None, lower=False):
         """
@@ -159,12 +203,12 @@ class Bundle:
 
     def lex(self, ebnf=None):
         """
-        Lexes the bundle
+        Lexes the bundle, yielding each story with a generator of its tokens,
+        including the indentation tokens of the postlexer.
+        The tokens of a story must be consumed before those of the next story,
+        as the lexer is shared.
         """
-        stories = self.find_stories()
         parser = self.parser(ebnf)
-        results = {}
-        for story in stories:
-            results[story] = Story.from_file(story, features=self.features) \
-                                  .lex(parser=parser)
-        return results
+        for storypath in self.find_stories():
+            story = self.load_story(storypath)
+            yield storypath, story.lex(parser=parser)
@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
 import io
+import json
+import os
+import sys
 
 import click
 
@@ -9,10 +12,12 @@ from .App import App
 from .Features import Features
 from .Project import Project
 from .Version import version as app_version
+from .Watcher import Watcher
 from .exceptions import StoryError
+from .lsp import LanguageServer
 
 
-story_features = Features.all_feature_names()
+story_features = Features.flag_names()
 
 
 def preview_cb(ctx, param, values):
@@ -40,6 +45,123 @@ def preview_cb(ctx, param, values):
     return features
 
 
+def with_hub_snapshot(features, hub_snapshot):
+    """
+    Adds the path of a hub snapshot to the preview features.
+    """
+    if hub_snapshot is None:
+        return features
+    return {**features, 'hub_snapshot': hub_snapshot}
+
+
+def with_optimize(features, optimize):
+    """
+    Adds the optimization level to the preview features.
+    """
+    if optimize == 0:
+        return features
+    return {**features, 'optimize': optimize}
+
+
+def with_backend(features, backend):
+    """
+    Adds the compiler backend to the preview features.
+    """
+    if backend is None:
+        return features
+    return {**features, 'backend': backend}
+
+
+def echo_tree(story, tree, raw):
+    click.echo('File: {}'.format(story))
+    if raw:
+        click.echo(tree)
+    else:
+        click.echo(tree.pretty())
+
+
+def token_json(story, token):
+    """
+    Serializes a token to a compact JSON line.
+    """
+    return json.dumps({
+        'story': story, 'type': token.type, 'value': token.value,
+        'line': token.line, 'column': token.column,
+    }, separators=(',', ':'))
+
+
+def watch_parse(path, ignore, ebnf, lower, preview, raw):
+    """
+    Parses the changed stories of path whenever stories change.
+    """
+    watcher = Watcher(path, ignored_path=ignore, ebnf=ebnf, features=preview)
+    for cycle in watcher.watch(lambda: watcher.parse(lower=lower)):
+        for story in cycle.changed:
+            if story in watcher.bundle.stories:
+                echo_tree(story, watcher.bundle.stories[story], raw)
+        for error in cycle.errors:
+            error.echo()
+        click.echo(cycle.summary(), err=True)
+
+
+def watch_compile(path, output, json, silent, ebnf, ignore, concise, first,
+                  preview):
+    """
+    Compiles the changed stories of path whenever stories change and writes
+    the bundle once all stories compile.
+    """
+    preview = App.concise(preview, concise)
+    backend = App.backend(Features(preview).backend)
+    watcher = Watcher(path, ignored_path=ignore, ebnf=ebnf, features=preview)
+    for cycle in watcher.watch(watcher.compile):
+        for error in cycle.errors:
+            error.echo()
+        if len(cycle.errors) == 0 and not silent:
+            try:
+                if json:
+                    results = App.dumps(watcher.result(), first=first,
+                                        indent=backend.indent)
+                    if output:
+                        Watcher.write(output, results)
+                    else:
+                        click.echo(results)
+                else:
+                    msg = 'Script syntax passed!'
+                    click.echo(click.style(msg, fg='green'))
+            except StoryError as e:
+                e.echo()
+        click.echo(cycle.summary(), err=True)
+
+
+def format_paths(path, ignore, ebnf, preview, inplace, check, jobs, cache):
+    """
+    Formats all stories of path. Returns whether all stories are formatted.
+    """
+    results = App.format_paths(path, ignored_path=ignore, ebnf=ebnf,
+                               features=preview, jobs=jobs, cache=cache)
+    success = True
+    unformatted = []
+    for result in results:
+        if result.error is not None:
+            click.echo(result.error)
+            success = False
+        elif check:
+            if result.changed:
+                unformatted.append(result.path)
+        elif inplace:
+            result.write()
+        else:
+            click.echo('File: {}'.format(result.path))
+            click.echo(result.output)
+    if len(unformatted) > 0:
+        for story in unformatted:
+            click.echo('{} needs reformatting'.format(story))
+        click.echo('{} of {} stories need reformatting'.format(
+            len(unformatted), len(results)), err=True)
+        success = False
+    return success
+
+
 class Cli:
 
     version_help = 'Prints Storyscript version'
@@ -47,6 +169,16 @@ class Cli:
     ebnf_help = 'Load the grammar from a file. Useful for development'
     preview_help = 'Activate upcoming Storyscript features'
     inplace_help = 'Perform operation directly on the source file.'
+    watch_help = 'Watch the stories and process them again when they change.'
+    check_help = 'Only list the stories which need reformatting.'
+    jobs_help = 'Number of processes formatting stories (default: all CPUs)'
+    cache_help = 'Remember formatted stories in a file to skip them later.'
+    hub_snapshot_help = 'Type services with a hub snapshot instead of the ' \
+        'hub, e.g. to compile offline.'
+    optimize_help = 'Optimization level, e.g. -O1 folds constant ' \
+        'expressions and removes dead code.'
+    backend_help = 'Backend of the compiled stories, e.g. `compact` for ' \
+        'the compact encoding of the JSON output (default: json).'
 
     @click.group(invoke_without_command=True, cls=ClickAliasedGroup)
     @click.option('--version', '-v', is_flag=True, help=version_help)
@@ -74,19 +206,19 @@ class Cli:
                   multiple=True, help=preview_help)
     @click.option('--ignore', default=None,
                   help='Specify path of ignored files')
-    def parse(path, debug, ebnf, raw, ignore, lower, preview):
+    @click.option('--watch', '-w', is_flag=True, help=watch_help)
+    def parse(path, debug, ebnf, raw, ignore, lower, preview, watch):
         """
         Parses stories, producing the abstract syntax tree.
         """
         try:
+            if watch:
+                watch_parse(path, ignore, ebnf, lower, preview, raw)
+                return
             trees = App.parse(path, ignored_path=ignore, ebnf=ebnf,
                               lower=lower, features=preview)
             for story, tree in trees.items():
-                click.echo('File: {}'.format(story))
-                if raw:
-                    click.echo(tree)
-                else:
-                    click.echo(tree.pretty())
+                echo_tree(story, tree, raw)
         except StoryError as e:
             if debug:
                 raise e.error
@@ -108,11 +240,22 @@ class Cli:
     @click.option('--ebnf', help=ebnf_help)
     @click.option('--preview', callback=preview_cb, is_eager=True,
                   multiple=True, help=preview_help)
-    def format(path, debug, ebnf, preview, inplace):
+    @click.option('--check', is_flag=True, help=check_help)
+    @click.option('--jobs', '-j', type=int, default=None, help=jobs_help)
+    @click.option('--cache', default=None, help=cache_help)
+    @click.option('--ignore', default=None,
+                  help='Specify path of ignored files')
+    def format(path, debug, ebnf, preview, inplace, check, jobs, cache,
+               ignore):
         """
-        Format a story.
+        Format a story or all stories of a directory.
         """
         try:
+            if check or cache or jobs or os.path.isdir(path):
+                if not format_paths(path, ignore, ebnf, preview, inplace,
+                                    check, jobs, cache):
+                    exit(1)
+                return
             output = App.format(path, ebnf=ebnf, features=preview,
                                 inplace=inplace)
             if not inplace:
@@ -144,12 +287,25 @@ class Cli:
                   help='Specify path of ignored files')
     @click.option('--preview', callback=preview_cb, is_eager=True,
                   multiple=True, help=preview_help)
+    @click.option('--watch', '-w', is_flag=True, help=watch_help)
+    @click.option('--hub-snapshot', type=click.Path(exists=True),
+                  help=hub_snapshot_help)
+    @click.option('--optimize', '-O', type=click.IntRange(min=0), default=0,
+                  help=optimize_help)
+    @click.option('--backend', '-b', default=None, help=backend_help)
     def compile(path, output, json, silent, debug, ebnf, ignore, concise,
-                first, preview):
+                first, preview, watch, hub_snapshot, optimize, backend):
         """
         Compiles stories and validates syntax
         """
         try:
+            preview = with_hub_snapshot(preview, hub_snapshot)
+            preview = with_optimize(preview, optimize)
+            preview = with_backend(preview, backend)
+            if watch:
+                watch_compile(path, output, json, silent, ebnf, ignore,
+                              concise, first, preview)
+                return
             results = App.compile(path, ignored_path=ignore,
                                   ebnf=ebnf, concise=concise, first=first,
                                   features=preview)
@@ -183,13 +339,19 @@ class Cli:
     @click.option('--debug', is_flag=True)
     @click.option('--preview', callback=preview_cb, is_eager=True,
                   multiple=True, help=preview_help)
-    def lex(path, ebnf, debug, preview):
+    @click.option('--json', '-j', 'as_json', is_flag=True,
+                  help='Print each token as a line of JSON')
+    def lex(path, ebnf, debug, preview, as_json):
         """
         Shows lexer tokens for given stories
         """
         try:
             results = App.lex(path, ebnf=ebnf, features=preview)
-            for file, tokens in results.items():
+            for file, tokens in results:
+                if as_json:
+                    for token in tokens:
+                        click.echo(token_json(file, token))
+                    continue
                 click.echo('File: {}'.format(file))
                 for n, token in enumerate(tokens):
                     click.echo('{} {} {}'.format(n, token.type, token.value))
@@ -206,6 +368,57 @@ class Cli:
                 StoryError.internal_error(e).echo()
                 exit(1)
 
+    @main.group()
+    def hub():  # noqa N805
+        """
+        Manages the services of the Storyscript hub
+        """
+
+    @staticmethod
+    @hub.command()
+    @click.argument('path', default='.')
+    @click.argument('output')
+    @click.option('--debug', is_flag=True)
+    @click.option('--ebnf', help=ebnf_help)
+    @click.option('--ignore', default=None,
+                  help='Specify path of ignored files')
+    @click.option('--preview', callback=preview_cb, is_eager=True,
+                  multiple=True, help=preview_help)
+    def snapshot(path, output, debug, ebnf, ignore, preview):
+        """
+        Writes a hub snapshot with the services used by the stories
+        """
+        try:
+            services = App.hub_snapshot(path, output, ignored_path=ignore,
+                                        ebnf=ebnf, features=preview)
+            click.echo(f'Wrote {len(services)} services to {output}')
+        except StoryError as e:
+            if debug:
+                raise e.error
+            else:
+                e.echo()
+                exit(1)
+        except Exception as e:
+            if debug:
+                raise e
+            else:
+                StoryError.internal_error(e).echo()
+                exit(1)
+
+    @staticmethod
+    @main.command()
+    @click.option('--debounce', default=0.2,
+                  help='Seconds to wait after a change before compiling')
+    @click.option('--preview', callback=preview_cb, is_eager=True,
+                  multiple=True, help=preview_help)
+    def lsp(debounce, preview):
+        """
+        Runs a language server on stdin and stdout
+        """
+        server = LanguageServer(sys.stdin.buffer, sys.stdout.buffer,
+                                features=preview, debounce=debounce)
+        server.serve()
+
     @staticmethod
     @main.command(aliases=['g'])
     def grammar():
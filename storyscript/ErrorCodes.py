@@ -108,6 +108,8 @@ class ErrorCodes:
     invalid_preview_flag = (
         'E0078',
         'Invalid preview flag. `{flag}` is not a valid preview feature.')
+    backend_unknown = (
+        'E0079', 'Unknown backend `{backend}`. Available: {backends}.')
     type_assignment_different = (
         'E0100', "Can't assign `{source}` to `{target}`")
     var_not_defined = (
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+
+
+class FakeLine(str):
+    """
+    The line of a tree created while lowering, e.g. the third line inserted
+    before the source line 12. It keeps the source `line` and the `index` of
+    the inserted line, s.t. they never need to be parsed again, but compares,
+    hashes and serializes like its string form ('12.3').
+    """
+
+    __slots__ = ('line', 'index')
+
+    def __new__(cls, line, index):
+        self = super().__new__(cls, f'{line}.{index}')
+        self.line = line
+        self.index = index
+        return self
+
+    def __str__(self):
+        # lines are looked up with `str(token.line)`: keep the structure
+        return self
+
+    def __repr__(self):
+        return f'FakeLine({self.line}, {self.index})'
+
+    def __getnewargs__(self):
+        return self.line, self.index
@@ -9,8 +9,16 @@ class Features:
     defaults = {
         'globals': False,  # makes global variables writable
         'debug': False,    # enable debug output
+        'source_map': False,  # map compiled lines to their source ranges
+        'hub_snapshot': None,  # path of a hub snapshot to use offline
+        'optimize': 0,  # optimization level
+        'backend': 'json',  # name of the compiler backend
+        'concise': False,  # leave out empty fields of the output
     }
 
+    # features which have their own options instead of a preview flag
+    options = ['concise']
+
     def __init__(self, features):
         self.features = self.defaults.copy()
         if features is not None:
@@ -28,3 +36,12 @@ class Features:
     @classmethod
     def all_feature_names(cls):
         return cls.defaults.keys()
+
+    @classmethod
+    def flag_names(cls):
+        """
+        Returns the names of the features which are turned on or off with
+        preview flags.
+        """
+        return [k for k, v in cls.defaults.items()
+                if isinstance(v, bool) and k not in cls.options]
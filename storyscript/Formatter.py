@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .Bundle import Bundle
+from .Features import Features
+from .Story import Story
+from .Version import version
+from .exceptions import StoryError
+
+
+def format_source(path, source, ebnf, features):
+    """
+    Formats the source of a story. Returns the formatted source or the error
+    message, as errors can't always be sent from pool workers.
+    """
+    try:
+        story = Story(source, features, path=path)
+        return story.parse(parser=Bundle.parser(ebnf)).format(), None
+    except StoryError as e:
+        return None, e.message()
+    except Exception as e:
+        return None, StoryError.internal_error(e).message()
+
+
+class FormattedStory:
+    """
+    The outcome of formatting a story.
+    """
+
+    def __init__(self, path, source, output=None, error=None):
+        self.path = path
+        self.source = source
+        self.output = output
+        self.error = error
+
+    @property
+    def changed(self):
+        return self.output is not None and self.output != self.source
+
+    def write(self):
+        """
+        Writes the formatted source if it differs from the story.
+        """
+        if self.changed:
+            with open(self.path, 'w') as w:
+                w.write(self.output)
+
+
+class Formatter:
+    """
+    Formats many stories with a pool of processes.
+    Stories known to be formatted are remembered by the hash of their source
+    and skipped. The hashes are stored in the `cache` file, if given.
+    """
+
+    # stories per task, s.t. workers don't wait on the pool for small stories
+    chunksize = 8
+
+    def __init__(self, ebnf=None, features=None, jobs=None, cache=None):
+        self.ebnf = ebnf
+        self.features = features
+        self.jobs = jobs
+        # the results of custom grammars can't be cached
+        self.cache = cache if ebnf is None else None
+        self.formatted = self.load()
+
+    def load(self):
+        """
+        Loads the hashes of formatted stories from the cache file.
+        """
+        if self.cache is None or not os.path.exists(self.cache):
+            return set()
+        try:
+            with io.open(self.cache, 'r') as f:
+                return set(json.load(f)['formatted'])
+        except (ValueError, KeyError, TypeError):
+            return set()
+
+    def save(self):
+        """
+        Writes the hashes of formatted stories to the cache file.
+        """
+        if self.cache is None:
+            return
+        with io.open(self.cache, 'w') as f:
+            json.dump({'formatted': sorted(self.formatted)}, f)
+
+    def key(self, source):
+        """
+        Hashes a source together with everything else its format depends on.
+        """
+        text = f'{version}\0{Features(self.features)}\0{source}'
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def format(self, paths):
+        """
+        Formats stories, returning a FormattedStory for each path.
+        """
+        results = []
+        pending = []
+        for path in paths:
+            try:
+                source = Story.read(path)
+            except StoryError as e:
+                results.append(FormattedStory(path, None, error=e.message()))
+                continue
+            result = FormattedStory(path, source)
+            results.append(result)
+            if self.key(source) in self.formatted:
+                result.output = source
+            else:
+                pending.append(result)
+
+        for result, (output, error) in zip(pending, self.run(pending)):
+            result.output, result.error = output, error
+            if output == result.source:
+                self.formatted.add(self.key(output))
+        return results
+
+    def run(self, stories):
+        """
+        Formats the sources of stories, in parallel if there are several.
+        """
+        args = ([story.path for story in stories],
+                [story.source for story in stories],
+                [self.ebnf] * len(stories),
+                [self.features] * len(stories))
+        if len(stories) < 2 or self.jobs == 1:
+            return list(map(format_source, *args))
+        with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+            return list(pool.map(format_source, *args,
+                                 chunksize=self.chunksize))
+
+    @staticmethod
+    def paths(path, ignored_path=None):
+        """
+        Finds the stories of a path.
+        """
+        if os.path.isdir(path):
+            return Bundle.parse_directory(path, ignored_path=ignored_path)
+        return [path]
@@ -1,6 +1,5 @@
 # -*- coding: utf-8 -*-
 import os
-from functools import lru_cache
 
 from bom_open import bom_open
 
@@ -10,15 +9,14 @@ from .compiler import Compiler
 from .compiler.lowering import Lowering
 from .compiler.pretty.PrettyPrinter import PrettyPrinter
 from .exceptions import CompilerError, StoryError, StorySyntaxError
-from .parser import Parser
+from .parser import ParserPool
 
 
-@lru_cache(maxsize=1)
 def _parser():
     """
-    Cached instance of the parser
+    Cached instance of the parser of the current thread
     """
-    return Parser()
+    return ParserPool.instance().get()
 
 
 class Story:
@@ -100,13 +98,15 @@ class Story:
         except (CompilerError, StorySyntaxError) as error:
             raise self.error(error) from error
 
-    def compile(self):
+    def compile(self, services=None):
         """
-        Compiles the story and stores the result.
+        Compiles the story and stores the result. `services` are the
+        prefetched service data of a bundle.
         """
         try:
             self.compiled = Compiler.compile(self.tree, story=self,
-                                             features=self.features)
+                                             features=self.features,
+                                             services=services)
         except (CompilerError, StorySyntaxError) as error:
             raise self.error(error) from error
 
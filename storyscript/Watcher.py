@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+import os
+import tempfile
+import time
+
+from .Bundle import Bundle
+from .exceptions import StoryError
+
+
+class WatchCycle:
+    """
+    The outcome of a watch cycle in which stories have changed.
+    """
+
+    def __init__(self, changed, deleted, errors, seconds):
+        self.changed = changed
+        self.deleted = deleted
+        self.errors = errors
+        self.seconds = seconds
+
+    def summary(self):
+        """
+        Describes the changes and the latency of a cycle.
+        """
+        return (f'{len(self.changed)} changed, {len(self.deleted)} deleted, '
+                f'{len(self.errors)} failed stories in '
+                f'{self.seconds * 1000:.1f}ms')
+
+
+class Watcher:
+    """
+    Watches the stories of a path by polling their modification times.
+    The parser, the results of all stories and the services fetched from
+    the hub are kept between cycles, s.t. only changed or added stories are
+    processed again.
+    """
+
+    interval = 0.5
+
+    def __init__(self, path, ignored_path=None, ebnf=None, features=None):
+        self.path = path
+        self.ignored_path = ignored_path
+        self.bundle = Bundle(features=features)
+        self.parser = Bundle.parser(ebnf)
+        # story -> (modification time, size)
+        self.mtimes = {}
+        # story -> StoryError of the last failed processing
+        self.errors = {}
+
+    def paths(self):
+        """
+        Finds the stories of the watched path.
+        """
+        if os.path.isdir(self.path):
+            return Bundle.parse_directory(self.path,
+                                          ignored_path=self.ignored_path)
+        return [self.path]
+
+    def scan(self):
+        """
+        Returns the modification time and size of all existing stories.
+        """
+        mtimes = {}
+        for path in self.paths():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            mtimes[path] = (stat.st_mtime_ns, stat.st_size)
+        return mtimes
+
+    def update(self, process):
+        """
+        Processes all changed or added stories with `process` (e.g.
+        Bundle.compile) and removes the deleted stories from the bundle.
+        Returns a WatchCycle or `None` if nothing has changed.
+        """
+        start = time.perf_counter()
+        mtimes = self.scan()
+        changed = [path for path, mtime in mtimes.items()
+                   if self.mtimes.get(path) != mtime]
+        deleted = [path for path in self.mtimes if path not in mtimes]
+        self.mtimes = mtimes
+        if len(changed) == 0 and len(deleted) == 0:
+            return None
+
+        for path in deleted:
+            self.bundle.remove_story(path)
+            self.errors.pop(path, None)
+        for path in changed:
+            self.bundle.remove_story(path)
+            self.errors.pop(path, None)
+            try:
+                process([path], parser=self.parser)
+            except StoryError as e:
+                self.errors[path] = e
+        errors = [self.errors[path] for path in self.mtimes
+                  if path in self.errors]
+        return WatchCycle(changed, deleted, errors,
+                          time.perf_counter() - start)
+
+    def compile(self):
+        """
+        Compiles all changed stories.
+        """
+        return self.update(self.bundle.compile)
+
+    def parse(self, lower=False):
+        """
+        Parses all changed stories.
+        """
+        def parse(stories, parser):
+            self.bundle.parse(stories, parser=parser, lower=lower)
+        return self.update(parse)
+
+    def result(self):
+        """
+        Returns the bundle of all compiled stories in the order of the
+        stories of the watched path.
+        """
+        stories = self.bundle.stories
+        self.bundle.stories = {path: stories[path] for path in self.mtimes
+                               if path in stories}
+        return self.bundle.result(list(self.mtimes))
+
+    def watch(self, update, cycles=None):
+        """
+        Runs `update` every `interval` seconds and yields the watch cycles
+        in which stories have changed.
+        """
+        while cycles != 0:
+            cycle = update()
+            if cycle is not None:
+                yield cycle
+            if cycles is not None:
+                cycles -= 1
+            if cycles != 0:
+                time.sleep(self.interval)
+
+    @staticmethod
+    def write(path, text):
+        """
+        Replaces the content of a file atomically, s.t. readers never see a
+        partially written file.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        mode = 0o644
+        if os.path.exists(path):
+            mode = os.stat(path).st_mode
+        fd, temp = tempfile.mkstemp(dir=directory, prefix='.storyscript-')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(text)
+            os.chmod(temp, mode)
+            os.replace(temp, path)
+        except BaseException:
+            os.unlink(temp)
+            raise
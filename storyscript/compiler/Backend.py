@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+from abc import ABC, abstractmethod
+
+
+class Backend(ABC):
+    """
+    A compiler backend, which turns the checked tree of a story into its
+    output. Backends reuse the lowered tree and the module of the semantic
+    pass, so they only need to serialize the story.
+    Backends are used as classes, so a backend without `compile` is
+    rejected once it's defined instead of once it's instantiated.
+    """
+
+    # indentation of the dumped output, None for a single line
+    indent = 2
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if getattr(cls.compile, '__isabstractmethod__', False):
+            raise TypeError(f'Backend {cls.__name__} must define compile')
+
+    @classmethod
+    @abstractmethod
+    def compile(cls, tree, story, module, features):
+        """
+        Returns the output of a story.
+        """
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+import pkg_resources
+
+from storyscript.compiler.compact.CompactBackend import CompactBackend
+from storyscript.compiler.json.JSONBackend import JSONBackend
+from storyscript.exceptions import CompilerError
+
+
+class Backends:
+    """
+    Registry of the compiler backends. Packages add backends with entry
+    points of the `storyscript.backends` group, which name a subclass of
+    `Backend`. They are only imported once they are selected and can't
+    replace the builtin backends.
+    """
+
+    group = 'storyscript.backends'
+    builtins = {'json': JSONBackend, 'compact': CompactBackend}
+    _entry_points = None
+
+    @classmethod
+    def entry_points(cls):
+        """
+        Finds the backends of the installed packages.
+        """
+        if cls._entry_points is None:
+            entry_points = {}
+            for entry_point in pkg_resources.iter_entry_points(cls.group):
+                if entry_point.name not in cls.builtins:
+                    entry_points[entry_point.name] = entry_point
+            cls._entry_points = entry_points
+        return cls._entry_points
+
+    @classmethod
+    def names(cls):
+        """
+        Returns the names of all available backends.
+        """
+        return sorted({*cls.builtins, *cls.entry_points()})
+
+    @classmethod
+    def get(cls, name):
+        """
+        Returns the backend called `name`.
+        """
+        backend = cls.builtins.get(name)
+        if backend is not None:
+            return backend
+        entry_point = cls.entry_points().get(name)
+        if entry_point is None:
+            raise CompilerError('backend_unknown', format_args={
+                'backend': name,
+                'backends': ', '.join(cls.names())
+            })
+        return entry_point.load()
@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
-from storyscript.compiler.json.JSONCompiler import JSONCompiler
+from storyscript.compiler.Backends import Backends
 from storyscript.compiler.lowering.Lowering import Lowering
+from storyscript.compiler.optimizer.ConstantFolding import ConstantFolding
+from storyscript.compiler.optimizer.DeadCodeElimination import \
+    DeadCodeElimination
 from storyscript.compiler.semantics.Semantics import Semantics
 
 
@@ -10,10 +13,11 @@ class CompilerOutput:
     Allows to access to the compilation output and its semantic module object.
     """
 
-    def __init__(self, backend, output, module):
+    def __init__(self, backend, output, module, eliminated=0):
         self.backend = backend
         self._output = output
         self._module = module
+        self._eliminated = eliminated
 
     def output(self):
         """
@@ -27,26 +31,50 @@ class CompilerOutput:
         """
         return self._module
 
+    def eliminated(self):
+        """
+        Number of tree nodes removed by the optimizer.
+        """
+        return self._eliminated
+
 
 class Compiler:
 
     @classmethod
-    def generate(cls, tree, features):
+    def generate(cls, tree, features, services=None):
         """
         Parses an AST and checks it.
         """
         tree = Lowering(parser=tree.parser, features=features).process(tree)
-        module = Semantics(features=features).process(tree)
+        module = Semantics(features=features,
+                           services=services).process(tree)
         return tree, module
 
     @classmethod
-    def compile(cls, tree, story, features, backend='json'):
-        assert backend == 'json'
-        compiler = JSONCompiler(story)
-        tree, module = cls.generate(tree, features)
-        output = compiler.compile(tree)
+    def optimize(cls, tree, features):
+        """
+        Optimizes a checked AST and returns the number of eliminated nodes.
+        """
+        if features.optimize < 1:
+            return 0
+        eliminated = ConstantFolding().process(tree)
+        return eliminated + DeadCodeElimination().process(tree)
+
+    @classmethod
+    def compile(cls, tree, story, features, backend=None, services=None):
+        """
+        Compiles an AST with a backend, by default the one of `features`.
+        """
+        if backend is None:
+            backend = features.backend
+        compiler = Backends.get(backend)
+        tree, module = cls.generate(tree, features, services=services)
+        eliminated = cls.optimize(tree, features)
+        output = compiler.compile(tree, story=story, module=module,
+                                  features=features)
         return CompilerOutput(
             backend=backend,
             module=module,
-            output=output
+            output=output,
+            eliminated=eliminated
         )
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+import re
+from functools import lru_cache
+
+
+class LiteralError(Exception):
+    """
+    An invalid literal, which is reported at the tree of the literal.
+    """
+
+    def __init__(self, error, **format_args):
+        super().__init__(error)
+        self.error = error
+        self.format_args = format_args
+
+
+class Literals:
+    """
+    Decodes the values of literal tokens. Each value is decoded once and
+    cached, as stories repeat the same literals and many compiler stages
+    look at them.
+    """
+
+    time_part = re.compile(r'([0-9]+)(ms|[smhdw])')
+    regular_expression_parts = re.compile(r'/([^/\n]*)/([a-z]*)')
+
+    # milliseconds of time units in the order they must be written
+    time_units = {
+        'w': 604800000,
+        'd': 86400000,
+        'h': 3600000,
+        'm': 60000,
+        's': 1000,
+        'ms': 1,
+    }
+    time_order = {unit: i for i, unit in enumerate(time_units)}
+
+    @classmethod
+    def decode(cls, tree, decode, value):
+        """
+        Decodes a value and reports its errors at `tree`.
+        """
+        try:
+            return decode(value)
+        except LiteralError as e:
+            tree.expect(0, e.error, **e.format_args)
+
+    @staticmethod
+    def time_parts(value):
+        """
+        Splits a time string into its subparts.
+        Example: 1h5s = [(1, 'h'), (5, 's')]
+        """
+        return [(int(number), unit) for number, unit in
+                Literals.time_part.findall(value)]
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def decode_time(value):
+        """
+        Returns the milliseconds of a time string.
+        """
+        assert len(value) > 0
+        ms_value = 0
+        previous = None
+        for number, unit in Literals.time_parts(value):
+            if unit == previous:
+                raise LiteralError('time_value_duplicate', time_type=unit)
+            if previous is not None:
+                if unit == 'w':
+                    raise LiteralError('time_value_inconsistent_week')
+                if Literals.time_order[previous] > Literals.time_order[unit]:
+                    raise LiteralError('time_value_inconsistent',
+                                       prev=previous, current=unit)
+            ms_value += Literals.time_units[unit] * number
+            previous = unit
+        return ms_value
+
+    @classmethod
+    def time(cls, tree):
+        """
+        Returns the milliseconds of a time tree.
+        """
+        assert tree.data == 'time'
+        return cls.decode(tree, cls.decode_time, tree.child(0).value)
+
+    @staticmethod
+    def number_text(value):
+        """
+        Returns the text of a number without a leading plus.
+        """
+        if value[0] == '+':
+            return value[1:]
+        return value
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def decode_number(type, value):
+        if type == 'FLOAT':
+            return float(value)
+        return int(value)
+
+    @classmethod
+    def number(cls, tree):
+        """
+        Returns the int or float of a number tree.
+        """
+        token = tree.child(0)
+        return cls.decode_number(token.type, token.value)
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def decode_string(text):
+        """
+        Evaluates unicode escape codes like \\n or \\x12
+        """
+        try:
+            return bytes(text, 'utf-8').decode('unicode_escape')
+        except UnicodeError as e:
+            raise LiteralError('unicode_decode_error', reason=e.reason)
+
+    @classmethod
+    def string(cls, tree, text):
+        """
+        Returns the unescaped `text` of a string tree.
+        """
+        return cls.decode(tree, cls.decode_string, text)
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def decode_regular_expression(value):
+        """
+        Splits a regular expression into its pattern and flags.
+        """
+        match = Literals.regular_expression_parts.fullmatch(value)
+        assert match is not None
+        return match.group(1), match.group(2)
+
+    @classmethod
+    def regular_expression(cls, tree):
+        """
+        Returns the pattern and flags of a regular_expression tree.
+        """
+        return cls.decode_regular_expression(tree.child(0).value)
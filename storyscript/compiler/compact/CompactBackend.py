@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+from storyscript.compiler.Backend import Backend
+from storyscript.compiler.json.JSONBackend import JSONBackend
+from storyscript.exceptions import internal_assert
+
+
+class CompactBackend(Backend):
+    """
+    Compiles stories to a compact encoding of the JSON format.
+    Lines become arrays of their fields in the order of the JSON tree,
+    methods become codes and objects become arrays which start with the
+    code of their kind. The tables of fields and codes may only be
+    appended to, s.t. engines can keep reading older stories.
+    """
+
+    indent = None
+
+    line_fields = ['ln', 'method', 'col_start', 'col_end', 'output', 'name',
+                   'service', 'command', 'function', 'args', 'enter', 'exit',
+                   'parent', 'src', 'next']
+
+    methods = ['expression', 'execute', 'call', 'mutation', 'if', 'elif',
+               'else', 'for', 'while', 'function', 'when', 'try', 'catch',
+               'finally', 'return', 'throw', 'break', 'continue']
+
+    objects = [
+        ('int', ['int']),
+        ('float', ['float']),
+        ('string', ['string']),
+        ('boolean', ['boolean']),
+        ('time', ['ms']),
+        ('regexp', ['regexp', 'flags']),
+        ('path', ['paths']),
+        ('dot', ['dot']),
+        ('list', ['items']),
+        ('dict', ['items']),
+        ('range', ['range']),
+        ('expression', ['expression', 'values']),
+        ('type_cast', ['type', 'value']),
+        ('type', ['type', 'values']),
+        ('arg', ['name', 'arg']),
+        ('mutation', ['mutation', 'args']),
+    ]
+
+    method_codes = {method: code for code, method in enumerate(methods)}
+    object_codes = {kind: code for code, (kind, _) in enumerate(objects)}
+
+    @classmethod
+    def compile(cls, tree, story, module, features):
+        return cls.pack(JSONBackend.compile(tree, story, module, features))
+
+    @classmethod
+    def pack(cls, output):
+        """
+        Encodes the JSON output of a story. The tree is kept even if it's
+        empty and lines keep the positions of their fields, s.t. concise
+        stories have the same layout.
+        """
+        packed = {**output, 'format': 'compact'}
+        packed['tree'] = [cls.pack_line(line)
+                          for line in output.get('tree', {}).values()]
+        return packed
+
+    @classmethod
+    def pack_line(cls, line):
+        """
+        Encodes a line as an array of its fields without trailing nulls.
+        Only `next` may be missing, as the last line has none.
+        """
+        internal_assert(line.keys() <= set(cls.line_fields))
+        values = [cls.pack_value(line.get(field))
+                  for field in cls.line_fields]
+        values[1] = cls.method_codes[line['method']]
+        while values[-1] is None:
+            values.pop()
+        return values
+
+    @classmethod
+    def pack_value(cls, value):
+        """
+        Encodes the value of a line field.
+        """
+        if isinstance(value, dict):
+            kind = value.get('$OBJECT')
+            if kind is None:
+                return {k: cls.pack_value(v) for k, v in value.items()}
+            code = cls.object_codes[kind]
+            packed = [code]
+            # optional fields are the last ones of an object
+            for field in cls.objects[code][1]:
+                if field not in value:
+                    break
+                packed.append(cls.pack_value(value[field]))
+            internal_assert(len(packed) == len(value))
+            return packed
+        if isinstance(value, list):
+            # arrays starting with a code are objects
+            internal_assert(len(value) == 0 or type(value[0]) is not int)
+            return [cls.pack_value(v) for v in value]
+        return value
+
+    @classmethod
+    def unpack(cls, packed):
+        """
+        Restores the JSON output of a story from its compact output.
+        """
+        output = {k: v for k, v in packed.items() if k != 'format'}
+        tree = {}
+        for values in packed['tree']:
+            line = cls.unpack_line(values)
+            tree[line['ln']] = line
+        output['tree'] = tree
+        return output
+
+    @classmethod
+    def unpack_line(cls, values):
+        line = {}
+        for field, value in zip(cls.line_fields, values):
+            line[field] = cls.unpack_value(value)
+        for field in cls.line_fields[len(values):-1]:
+            line[field] = None
+        line['method'] = cls.methods[values[1]]
+        return line
+
+    @classmethod
+    def unpack_value(cls, value):
+        if isinstance(value, dict):
+            return {k: cls.unpack_value(v) for k, v in value.items()}
+        if isinstance(value, list):
+            if len(value) > 0 and type(value[0]) is int:
+                kind, fields = cls.objects[value[0]]
+                unpacked = {'$OBJECT': kind}
+                for field, v in zip(fields, value[1:]):
+                    unpacked[field] = cls.unpack_value(v)
+                return unpacked
+            return [cls.unpack_value(v) for v in value]
+        return value
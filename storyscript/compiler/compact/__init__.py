@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+from storyscript.compiler.compact.CompactBackend import CompactBackend
+
+__all__ = ['CompactBackend']
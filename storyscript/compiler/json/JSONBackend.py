@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+from storyscript.compiler.Backend import Backend
+
+from .JSONCompiler import JSONCompiler
+
+
+class JSONBackend(Backend):
+    """
+    Compiles stories to the JSON format of the engine.
+    """
+
+    @classmethod
+    def compile(cls, tree, story, module, features):
+        compiler = JSONCompiler(story, concise=features.concise)
+        return compiler.compile(tree, source_map=features.source_map)
@@ -2,21 +2,32 @@
 from contextlib import contextmanager
 
 from storyscript.Version import version
+from storyscript.compiler.visitors.Dispatcher import Dispatcher
 from storyscript.exceptions import StorySyntaxError
 from storyscript.exceptions import internal_assert
 from storyscript.parser import Tree
 
 from .Lines import Lines
 from .Objects import Objects
+from .SourceMap import SourceMap
 
 
-class JSONCompiler:
+class JSONCompiler(metaclass=Dispatcher):
 
     """
     Compiles Storyscript abstract syntax tree to JSON.
     """
-    def __init__(self, story):
-        self.lines = Lines(story)
+    # nodes which are compiled directly, all other nodes are traversed
+    dispatch_nodes = ['service_block', 'absolute_expression', 'assignment',
+                      'if_block', 'elseif_block', 'else_block',
+                      'foreach_block', 'function_block', 'when_block',
+                      'try_block', 'return_statement', 'arguments',
+                      'while_block', 'throw_statement', 'break_statement',
+                      'continue_statement', 'mutation_block',
+                      'indented_chain']
+
+    def __init__(self, story, concise=False):
+        self.lines = Lines(story, concise=concise)
         self.objects = Objects()
 
     @staticmethod
@@ -128,7 +139,7 @@ class JSONCompiler:
         if prev_line is not None:
             if prev_line['method'] != 'execute':
                 raise StorySyntaxError('arguments_noservice', tree=tree)
-            prev_args = prev_line['args']
+            prev_args = prev_line.get('args', [])
             prev_line['args'] = prev_args + self.objects.arguments(tree)
             return
         raise StorySyntaxError('arguments_noservice', tree=tree)
@@ -178,15 +189,12 @@ class JSONCompiler:
 
     def find_parent_with_output(self, tree, parent):
         """
-        Searches upword in the tree for a parent with an output field.
+        Finds the output of the nearest enclosing service with an output.
         """
         tree.expect(parent is not None, 'when_no_output_parent')
-        parent = self.lines.lines[parent]
-        if parent['output'] is not None and len(parent['output']) > 0 and \
-                parent['service'] is not None:
-            return parent['output']
-
-        return self.find_parent_with_output(tree, parent['parent'])
+        line = self.lines.output_parent(parent)
+        tree.expect(line is not None, 'when_no_output_parent')
+        return self.lines.lines[line]['output']
 
     def when(self, tree, nested_block, parent):
         """
@@ -333,7 +341,7 @@ class JSONCompiler:
         if prev_line is not None:
             if prev_line['method'] != 'mutation':
                 raise StorySyntaxError('arguments_nomutation', tree=tree)
-            prev_line['args'] = prev_line['args'] + \
+            prev_line['args'] = prev_line.get('args', []) + \
                 self.chained_mutations(tree)
             return
         raise StorySyntaxError('arguments_nomutation', tree=tree)
@@ -439,15 +447,9 @@ class JSONCompiler:
         Parses a subtree, checking whether it should be compiled directly
         or keep parsing for deeper trees.
         """
-        allowed_nodes = ['service_block', 'absolute_expression', 'assignment',
-                         'if_block', 'elseif_block', 'else_block',
-                         'foreach_block', 'function_block', 'when_block',
-                         'try_block', 'return_statement', 'arguments',
-                         'while_block', 'throw_statement', 'break_statement',
-                         'continue_statement', 'mutation_block',
-                         'indented_chain']
-        if tree.data in allowed_nodes:
-            getattr(self, tree.data)(tree, parent)
+        handler = self._dispatch_table.get(tree.data)
+        if handler is not None:
+            handler(self, tree, parent)
         else:
             self.parse_tree(tree, parent=parent)
 
@@ -459,12 +461,17 @@ class JSONCompiler:
             assert isinstance(item, Tree)
             self.subtree(item, parent=parent)
 
-    def compile(self, tree, debug=False):
+    def compile(self, tree, debug=False, source_map=False):
         """
         Compile an AST to JSON
         """
         self.parse_tree(tree)
         lines = self.lines
-        return {'tree': lines.lines, 'services': lines.get_services(),
-                'entrypoint': lines.entrypoint(), 'functions': lines.functions,
-                'version': version}
+        result = {'tree': lines.lines, 'services': lines.get_services(),
+                  'entrypoint': lines.entrypoint(),
+                  'functions': lines.functions, 'version': version}
+        if source_map:
+            result['source_map'] = SourceMap.build(tree, lines.order())
+        if lines.concise:
+            return {k: v for k, v in result.items() if v}
+        return result
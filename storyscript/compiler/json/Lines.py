@@ -5,15 +5,17 @@ from storyscript.exceptions import StorySyntaxError
 class Lines:
     """
     Holds compiled lines and provides methods for operation on lines.
+    Concise lines leave out their empty fields.
     """
-    def __init__(self, story):
+    def __init__(self, story, concise=False):
         self.story = story
+        self.concise = concise
         self.lines = {}
         self._lines = []  # sorted line nr (by insertion)
         self.variables = []
         self.services = []
         self.functions = {}
-        self.output_scopes = []
+        self.output_scopes = {}
         self.scopes = []
         self.previous_scope = None
         self.finished_scopes = []
@@ -27,6 +29,12 @@ class Lines:
             return None
         return self._lines[0]
 
+    def order(self):
+        """
+        Returns the line numbers in the order they were compiled.
+        """
+        return self._lines
+
     def first(self):
         """
         Gets the first line.
@@ -74,12 +82,29 @@ class Lines:
     def set_scope(self, line, parent, output):
         """
         Keeps track of output scopes so that defined outputs are recognized for
-        nested children.
+        nested children. Each scope holds the outputs of its enclosing
+        scopes and the nearest enclosing service line with an output, s.t.
+        lookups don't need to walk up the parents.
         """
         self.scopes.append(line)
         # initially a new scope starts without a next reference
         self.previous_scope = 'NO_NEXT'
-        self.output_scopes.append({line: {'parent': parent, 'output': output}})
+        enclosing = self.output_scopes.get(parent)
+        outputs = set(output)
+        output_parent = None
+        if enclosing is not None:
+            outputs.update(enclosing['outputs'])
+            output_parent = enclosing['output_parent']
+        scope_line = self.lines.get(line)
+        if scope_line is not None and scope_line.get('output') and \
+                scope_line.get('service') is not None:
+            output_parent = line
+        self.output_scopes[line] = {
+            'parent': parent,
+            'output': output,
+            'outputs': outputs,
+            'output_parent': output_parent,
+        }
 
     def finish_scope(self, line):
         """
@@ -88,22 +113,27 @@ class Lines:
         """
         self.previous_scope = self.scopes.pop()
         self.finished_scopes.append(self.previous_scope)
-        self.output_scopes.pop()
+        self.output_scopes.pop(self.previous_scope, None)
 
     def is_output(self, parent, service):
         """
         Checks whether a service has been defined as output for this block
         or for its parents.
         """
-        for output_scope in self.output_scopes:
-            if parent in output_scope:
-                scope = output_scope[parent]
-                if service in scope['output']:
-                    return True
-                if scope['parent']:
-                    assert scope['parent'] != parent
-                    return self.is_output(scope['parent'], service)
-        return False
+        scope = self.output_scopes.get(parent)
+        if scope is None:
+            return False
+        return service in scope['outputs']
+
+    def output_parent(self, parent):
+        """
+        Finds the nearest service line with an output which encloses this
+        block or None.
+        """
+        scope = self.output_scopes.get(parent)
+        if scope is None:
+            return None
+        return scope['output_parent']
 
     def make(self, method, position, name=None, args=None, service=None,
              command=None, function=None, output=None, enter=None, exit=None,
@@ -116,22 +146,25 @@ class Lines:
         col_start = self._as_none(position.column)
         col_end = self._as_none(position.end_column)
         raw_line = self.story.line(position.line)
-        self.lines[position.line] = {
-            'method': method,
-            'ln': position.line,
-            'col_start': col_start,
-            'col_end': col_end,
-            'output': output,
-            'name': name,
-            'service': service,
-            'command': command,
-            'function': function,
-            'args': args,
-            'enter': enter,
-            'exit': exit,
-            'parent': parent,
-            'src': raw_line,
-        }
+        fields = (
+            ('method', method),
+            ('ln', position.line),
+            ('col_start', col_start),
+            ('col_end', col_end),
+            ('output', output),
+            ('name', name),
+            ('service', service),
+            ('command', command),
+            ('function', function),
+            ('args', args),
+            ('enter', enter),
+            ('exit', exit),
+            ('parent', parent),
+            ('src', raw_line),
+        )
+        concise = self.concise
+        self.lines[position.line] = {k: v for k, v in fields
+                                     if v or not concise}
         # save insertion order
         self._lines.append(position.line)
 
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from lark.lexer import Token
 
+from storyscript.compiler.Literals import Literals
 from storyscript.compiler.lowering.utils import unicode_escape
 from storyscript.exceptions import internal_assert
 from storyscript.parser import Tree
@@ -65,60 +66,17 @@ class Objects:
         """
         Compiles a number tree
         """
-        token = tree.child(0)
-        if token.value[0] == '+':
-            token.value = token.value[1:]
-        if token.type == 'FLOAT':
-            return {'$OBJECT': 'float', 'float': float(token.value)}
-        return {'$OBJECT': 'int', 'int': int(token.value)}
+        value = Literals.number(tree)
+        if tree.child(0).type == 'FLOAT':
+            return {'$OBJECT': 'float', 'float': value}
+        return {'$OBJECT': 'int', 'int': value}
 
     @staticmethod
     def time(tree):
         """
         Compiles a time tree
         """
-        assert tree.data == 'time'
-        val = tree.child(0).value
-        assert len(val) > 0
-
-        ms_value = 0
-        prev_time = None
-        time_parts = split_into_time_parts(val)
-        for p, time_type in time_parts:
-            tree.expect(prev_time != time_type, 'time_value_duplicate',
-                        time_type=time_type)
-            if time_type == 'w':
-                tree.expect(prev_time is None, 'time_value_inconsistent_week')
-                ms_value += 604800000 * p
-            elif time_type == 'd':
-                tree.expect(prev_time is None or prev_time in 'w',
-                            'time_value_inconsistent',
-                            prev=prev_time, current=time_type)
-                ms_value += 86400000 * p
-            elif time_type == 'h':
-                tree.expect(prev_time is None or prev_time in 'wd',
-                            'time_value_inconsistent',
-                            prev=prev_time, current=time_type)
-                ms_value += 3600000 * p
-            elif time_type == 'm':
-                tree.expect(prev_time is None or prev_time in 'wdh',
-                            'time_value_inconsistent',
-                            prev=prev_time, current=time_type)
-                ms_value += 60000 * p
-            elif time_type == 's':
-                assert time_type == 's'
-                tree.expect(prev_time is None or prev_time in 'wdhm',
-                            'time_value_inconsistent',
-                            prev=prev_time, current=time_type)
-                ms_value += 1000 * p
-            else:
-                assert time_type == 'ms'
-                tree.expect(prev_time is None or prev_time in 'wdhms',
-                            'time_value_inconsistent',
-                            prev=prev_time, current=time_type)
-                ms_value += p
-            prev_time = time_type
-        return {'$OBJECT': 'time', 'ms': ms_value}
+        return {'$OBJECT': 'time', 'ms': Literals.time(tree)}
 
     @staticmethod
     def name_to_path(name):
@@ -199,11 +157,10 @@ class Objects:
         """
         Compiles a regexp object from a regular_expression tree
         """
-        value = tree.child(0).value
-        re_arr = value.split('/')[1:]
-        dictionary = {'$OBJECT': 'regexp', 'regexp': re_arr[0]}
-        if len(re_arr[1]) > 0:
-            dictionary['flags'] = re_arr[1]
+        regexp, flags = Literals.regular_expression(tree)
+        dictionary = {'$OBJECT': 'regexp', 'regexp': regexp}
+        if len(flags) > 0:
+            dictionary['flags'] = flags
         return dictionary
 
     @classmethod
@@ -309,29 +266,3 @@ class Objects:
         else:
             assert child.data == 'path'
             return self.path(child)
-
-
-def split_into_time_parts(value):
-    """
-    Splits a time string into its subparts.
-    Example: 1h5s = [(1, 'h'), (5, 's')]
-    """
-    num_buf = ''
-    i = 0
-    nr_values = len(value)
-    while i < nr_values:
-        c = value[i]
-        if c.isdigit():
-            num_buf += c
-        else:
-            # peek into the future for 'ms'
-            if c == 'm' and i + 1 < nr_values and value[i + 1] == 's':
-                i = i + 1
-                yield int(num_buf), 'ms'
-            else:
-                assert c in 'smhdw'
-                yield int(num_buf), c
-            num_buf = ''
-        i = i + 1
-
-    assert len(num_buf) == 0
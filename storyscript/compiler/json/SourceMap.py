@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+from bisect import bisect_right
+
+from lark.lexer import Token
+
+from storyscript.parser import Tree
+
+
+class SourceMap:
+    """
+    Maps compiled lines to the range of the source they were compiled from:
+    `[line, column, end_line, end_column]`, where the end column is exclusive.
+    Fake lines created while lowering (e.g. '12.1' for a string template
+    fragment) are mapped to the source of their tokens. Statements spanning
+    many source lines are mapped to all of them.
+    """
+
+    def __init__(self, lines):
+        # the ids of the compiled lines in the order of compilation
+        self.lines = lines
+        self.compiled = set(lines)
+        self.statements = sorted(int(line) for line in lines
+                                 if line.isdigit())
+        self.ranges = {}
+
+    @classmethod
+    def build(cls, tree, lines):
+        """
+        Builds the source map of the compiled `lines` of a lowered tree.
+        """
+        source_map = cls(lines)
+        for token in tree.scan_values(lambda v: isinstance(v, Token)):
+            source_map.add(token)
+        source_ranges = source_map.source_ranges()
+        for line in lines:
+            if line not in source_map.ranges:
+                source_map.add_statement(line, source_ranges)
+        return {line: source_map.ranges[line] for line in lines
+                if line in source_map.ranges}
+
+    def owner(self, token):
+        """
+        Returns the compiled line a token belongs to: its own line or the
+        closest compiled line before it, e.g. for the indented arguments of
+        a service.
+        """
+        line = str(token.line)
+        if line in self.compiled:
+            return line
+        index = bisect_right(self.statements, Tree.source_line(line))
+        if index == 0:
+            return None
+        return str(self.statements[index - 1])
+
+    def add(self, token):
+        """
+        Extends the range of the compiled line of a token over the token.
+        """
+        column = str(token.column)
+        if token.line is None or not column.isdigit():
+            return
+        line = self.owner(token)
+        if line is None:
+            return
+        start = (Tree.source_line(token.line), int(column))
+        end_column = str(token.end_column)
+        if end_column.isdigit():
+            end_line = start[0]
+            # tokens of string templates keep the end line of their snippet
+            if isinstance(token.end_line, int) and token.end_line > end_line:
+                end_line = token.end_line
+            end = (end_line, int(end_column))
+        else:
+            end = (start[0], start[1] + len(token.value))
+        previous = self.ranges.get(line)
+        if previous is not None:
+            start = min(start, tuple(previous[:2]))
+            end = max(end, tuple(previous[2:]))
+        self.ranges[line] = [*start, *end]
+
+    def source_ranges(self):
+        """
+        Merges the ranges of the compiled lines by their source line.
+        """
+        source_ranges = {}
+        for line, range_ in self.ranges.items():
+            source_line = Tree.source_line(line)
+            previous = source_ranges.get(source_line)
+            if previous is None:
+                source_ranges[source_line] = list(range_)
+            else:
+                source_ranges[source_line] = [
+                    *min(range_[:2], previous[:2]),
+                    *max(range_[2:], previous[2:])
+                ]
+        return source_ranges
+
+    def add_statement(self, line, source_ranges):
+        """
+        Maps a compiled line without tokens of its own (e.g. the assignment
+        of a call whose tokens were moved to a fake line) to the lines
+        compiled from the same source line.
+        """
+        source_range = source_ranges.get(Tree.source_line(line))
+        if source_range is not None:
+            self.ranges[line] = list(source_range)
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
+from storyscript.compiler.json.JSONBackend import JSONBackend
 from storyscript.compiler.json.JSONCompiler import JSONCompiler
 from storyscript.compiler.json.Lines import Lines
 from storyscript.compiler.json.Objects import Objects
 
-__all__ = ['JSONCompiler', 'Lines', 'Objects']
+__all__ = ['JSONBackend', 'JSONCompiler', 'Lines', 'Objects']
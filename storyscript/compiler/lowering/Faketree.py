@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from lark.lexer import Token
 
+from storyscript.FakeLine import FakeLine
 from storyscript.parser import Tree
 
 
@@ -14,6 +15,7 @@ class FakeTree:
     def __init__(self, block):
         self.block = block
         self.original_line = str(block.line())
+        self.source_line = Tree.source_line(self.original_line)
         self.new_lines = {}
         self._check_existing_fake_lines(block)
 
@@ -21,7 +23,7 @@ class FakeTree:
         for child in block.children:
             if child.path:
                 tok = child.path.find_first_token()
-                if isinstance(tok.line, str) and '.' in tok.line:
+                if isinstance(tok.line, FakeLine):
                     self.new_lines[tok.value] = False
 
     def line(self):
@@ -29,14 +31,9 @@ class FakeTree:
         Creates fake line numbers. The strings are decreasingly sorted,
         so that the resulting tree is compiled correctly.
         """
-        line = self.original_line
-        parts = line.split('.')
-        if len(parts) > 1:
-            line = '.'.join(parts[:-1])
         # We start at .1, s.t. lines from L1 are called L1.1 and not L1.0
         # to avoid any potential confusion
-        new_suffix = len(self.new_lines) + 1
-        fake_line = f'{line}.{new_suffix}'
+        fake_line = FakeLine(self.source_line, len(self.new_lines) + 1)
         self.new_lines[fake_line] = None
         return fake_line
 
@@ -147,7 +147,9 @@ class Lowering:
         inside_interpolation = False
         inside_unicode = UnicodeNameDecodeState.No
         buf = ''
-        for c in text:
+        # offset of the current string template in `text`
+        offset = 0
+        for i, c in enumerate(text):
             if preceding_slash:
                 if c == '{' or c == '}' or c == "\'" or c == '"':
                     # custom escapes
@@ -178,7 +180,8 @@ class Lowering:
                         tree.expect(len(buf) > 0, 'string_templates_empty')
                         yield {
                             '$OBJECT': 'code',
-                            'code': unicode_escape(tree, buf)
+                            'code': unicode_escape(tree, buf),
+                            'offset': offset
                         }
                         buf = ''
                     else:
@@ -194,6 +197,7 @@ class Lowering:
                         }
                         buf = ''
                     inside_interpolation = True
+                    offset = i + 1
                 elif c == '}':
                     tree.expect(0, 'string_templates_unopened')
                 else:
@@ -208,18 +212,34 @@ class Lowering:
                 'string': buf
             }
 
-    def eval(self, orig_node, code_string, fake_tree):
+    @staticmethod
+    def template_column(orig_node, offset):
+        """
+        Returns the column of a string template which starts at `offset` in
+        the text of the string `orig_node`. Fake lines can't span lines, so
+        string templates after a line break of a multi-line string are
+        located at the beginning of the string.
+        """
+        token = orig_node.child(0)
+        column = int(orig_node.column())
+        quotes = 3 if token.type == 'DOUBLE_QUOTED_HEREDOC' else 1
+        if '\n' in token.value[:offset]:
+            return column + quotes
+        return column + quotes + offset
+
+    def eval(self, orig_node, code_string, fake_tree, column):
         """
         Evaluates a string by parsing it to its AST representation.
         Inserts the AST expression as fake_node and returns the path
         reference to the inserted fake_node.
+        `column` is the column of `code_string` in the story.
         """
         line = orig_node.line()
-        column = int(orig_node.column()) + 1
         # add whitespace as padding to fixup the column location of the
         # resulting tokens.
         from storyscript.Story import Story
-        story = Story(' ' * column + code_string, features=self.features)
+        story = Story(' ' * (column - 1) + code_string,
+                      features=self.features)
         story.parse(self.parser, allow_single_quotes=True)
         new_node = story.tree
 
@@ -235,8 +255,10 @@ class Lowering:
         if new_node.data == 'service_block' and \
                 new_node.service_fragment is None:
             # it was a plain-old path initially
-            name = Token('NAME', code_string.strip(), line=line, column=column)
-            name.end_column = int(orig_node.end_column()) - 1
+            value = code_string.strip()
+            column += len(code_string) - len(code_string.lstrip())
+            name = Token('NAME', value, line=line, column=column)
+            name.end_column = column + len(value)
             return Tree('path', [name])
         if new_node.data == 'absolute_expression':
             new_node = new_node.children[0]
@@ -288,7 +310,8 @@ class Lowering:
                 # ignore newlines in string interpolation
                 code = ''.join(s['code'].split('\n'))
 
-                evaled_node = self.eval(orig_node, code, fake_tree)
+                column = self.template_column(orig_node, s['offset'])
+                evaled_node = self.eval(orig_node, code, fake_tree, column)
 
                 # cast to string (`as string`)
                 base_type = orig_node.create_token('STRING_TYPE', 'string')
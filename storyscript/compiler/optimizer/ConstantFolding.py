@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+import math
+import operator
+from functools import reduce
+
+from lark.lexer import Token
+
+from storyscript.compiler.Literals import Literals
+from storyscript.parser import Tree
+
+
+class Literal:
+    """
+    The value of a literal expression together with its kind:
+    'number', 'string', 'boolean' or 'time'.
+    """
+
+    def __init__(self, kind, value):
+        self.kind = kind
+        self.value = value
+
+    @classmethod
+    def from_expression(cls, tree):
+        """
+        Returns the literal of an expression or None if the expression isn't
+        a literal.
+        """
+        if len(tree.children) != 1:
+            return None
+        values = tree.child(0).child(0)
+        if not (isinstance(values, Tree) and values.data == 'values'):
+            return None
+        value = values.child(0)
+        if not isinstance(value, Tree):
+            return None
+        if value.data == 'number':
+            return cls('number', Literals.number(value))
+        elif value.data == 'string':
+            text = value.child(0).value
+            return cls('string', Literals.string(value, text))
+        elif value.data == 'boolean':
+            return cls('boolean', value.child(0).value == 'true')
+        elif value.data == 'time':
+            return cls('time', Literals.time(value))
+        return None
+
+    def token(self):
+        """
+        Returns the token of a value or None if it can't be represented in
+        a story.
+        """
+        if self.kind == 'number':
+            if isinstance(self.value, float):
+                if not math.isfinite(self.value):
+                    return None
+                return Token('FLOAT', repr(self.value))
+            # the runtime has 64-bit integers
+            if not -2 ** 63 <= self.value < 2 ** 63:
+                return None
+            return Token('INT', str(self.value))
+        elif self.kind == 'string':
+            # strings are unescaped when they are compiled
+            text = self.value.encode('unicode_escape').decode('ascii')
+            return Token('DOUBLE_QUOTED', text)
+        elif self.kind == 'boolean':
+            if self.value:
+                return Token('TRUE', 'true')
+            return Token('FALSE', 'false')
+        assert self.kind == 'time'
+        if self.value < 0:
+            return None
+        return Token('RAW_TIME', f'{self.value}ms')
+
+
+class ConstantFolding:
+    """
+    Folds expressions of literals into a single literal, e.g. `1 + 2 * 3`
+    to `7`, and joins adjacent strings of a concatenation, e.g. those of a
+    flattened string template. It runs after the semantic analysis, hence
+    all expressions are well-typed.
+    Divisions, modulus and powers are left to the runtime.
+    """
+
+    # operator -> (function, kinds of operands, kind of the result)
+    # the result has the kind of the operands if it's None
+    operators = {
+        'PLUS': (operator.add, ('number', 'string', 'time'), None),
+        'DASH': (operator.sub, ('number', 'time'), None),
+        'MULTIPLIER': (operator.mul, ('number',), None),
+        'EQUAL': (operator.eq, ('number', 'string', 'boolean', 'time'),
+                  'boolean'),
+        'LESSER': (operator.lt, ('number', 'time'), 'boolean'),
+        'LESSER_EQUAL': (operator.le, ('number', 'time'), 'boolean'),
+        'AND': (lambda a, b: a and b, ('boolean',), None),
+        'OR': (lambda a, b: a or b, ('boolean',), None),
+        'NOT': (operator.not_, ('boolean',), None),
+    }
+
+    def __init__(self):
+        # the number of tree nodes which were removed
+        self.eliminated = 0
+
+    def process(self, tree):
+        """
+        Folds all constant expressions of a tree and returns the number of
+        eliminated nodes.
+        """
+        self.visit(tree)
+        return self.eliminated
+
+    def visit(self, tree):
+        for child in tree.children:
+            if isinstance(child, Tree):
+                self.visit(child)
+        if tree.data == 'expression':
+            self.expression(tree)
+
+    @staticmethod
+    def size(tree):
+        return sum(1 for _ in tree.iter_subtrees())
+
+    @staticmethod
+    def operator(tree):
+        """
+        Returns the operator token of an expression or None.
+        """
+        if len(tree.children) == 2:
+            if tree.child(0).data == 'unary_operator':
+                return tree.child(0).child(0)
+            return None
+        if len(tree.children) >= 3:
+            return tree.child(1).child(0)
+        return None
+
+    @staticmethod
+    def operands(tree):
+        if len(tree.children) == 2:
+            return [tree.child(1)]
+        return [tree.child(0), *tree.children[2:]]
+
+    def expression(self, tree):
+        if len(tree.children) == 2 and tree.child(1).data == 'as_operator':
+            self.cast(tree)
+            return
+        op = self.operator(tree)
+        if op is None or op.type not in self.operators:
+            return
+        size = self.size(tree)
+        operands = self.operands(tree)
+        if op.type == 'PLUS':
+            operands = self.join_strings(tree, operands)
+        if len(operands) == 1 and op.type == 'PLUS':
+            # all strings were joined
+            tree.children = operands[0].children
+            tree.kind = operands[0].kind
+        else:
+            literal = self.fold(op, operands)
+            if literal is not None:
+                token = literal.token()
+                if token is not None:
+                    self.replace(tree, literal.kind, token)
+        self.eliminated += size - self.size(tree)
+
+    def cast(self, tree):
+        """
+        Folds the casts of integers to floats, which the semantic analysis
+        adds to arithmetic expressions of integers and floats.
+        """
+        literal = Literal.from_expression(tree.child(0))
+        if literal is None or literal.kind != 'number':
+            return
+        base_type = tree.child(1).child(0).child(0)
+        if not (isinstance(base_type, Tree) and
+                base_type.data == 'base_type' and
+                base_type.child(0).type == 'FLOAT_TYPE'):
+            return
+        size = self.size(tree)
+        token = Literal('number', float(literal.value)).token()
+        self.replace(tree, 'number', token)
+        self.eliminated += size - self.size(tree)
+
+    def fold(self, op, operands):
+        """
+        Evaluates an operation if all of its operands are literals of
+        kinds the operator allows.
+        """
+        function, kinds, result = self.operators[op.type]
+        literals = [Literal.from_expression(operand) for operand in operands]
+        if any(literal is None for literal in literals):
+            return None
+        kind = literals[0].kind
+        if kind not in kinds or \
+                any(literal.kind != kind for literal in literals):
+            return None
+        if len(literals) == 1:
+            value = function(literals[0].value)
+        else:
+            value = reduce(function, (literal.value for literal in literals))
+        return Literal(result or kind, value)
+
+    def join_strings(self, tree, operands):
+        """
+        Joins adjacent strings of a concatenation. A sum with a string
+        can only have strings, hence nested sums can be inlined too.
+        """
+        if not any(self.is_string(operand) for operand in operands):
+            return operands
+        flat = []
+        for operand in operands:
+            op = self.operator(operand)
+            if op is not None and op.type == 'PLUS' and \
+                    len(operand.children) >= 3:
+                flat.extend(self.operands(operand))
+            else:
+                flat.append(operand)
+        joined = []
+        for operand in flat:
+            if joined and self.is_string(operand) and \
+                    self.is_string(joined[-1]):
+                text = Literal.from_expression(joined[-1]).value + \
+                    Literal.from_expression(operand).value
+                token = Literal('string', text).token()
+                joined[-1] = self.literal_expression(joined[-1], 'string',
+                                                     token)
+            else:
+                joined.append(operand)
+        if len(joined) > 1:
+            tree.children = [joined[0], tree.child(1), *joined[1:]]
+        return joined
+
+    @staticmethod
+    def is_string(tree):
+        literal = Literal.from_expression(tree)
+        return literal is not None and literal.kind == 'string'
+
+    @staticmethod
+    def literal_expression(tree, kind, token):
+        """
+        Creates a literal expression at the position of `tree`.
+        """
+        position = tree.create_token(token.type, token.value)
+        expression = Tree('expression', [
+            Tree('entity', [
+                Tree('values', [
+                    Tree(kind, [position])
+                ])
+            ])
+        ])
+        expression.kind = 'primary_expression'
+        return expression
+
+    def replace(self, tree, kind, token):
+        """
+        Replaces an expression with a literal.
+        """
+        expression = self.literal_expression(tree, kind, token)
+        tree.children = expression.children
+        tree.kind = expression.kind
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+from collections import Counter
+
+from lark.lexer import Token
+
+from storyscript.compiler.Literals import Literals
+from storyscript.compiler.lowering.Faketree import FakeTree
+from storyscript.parser import Tree
+
+
+class DeadCodeElimination:
+    """
+    Removes code without effect from a checked tree: statements after a
+    `return`, `throw`, `break` or `continue`, assignments of pure values
+    to variables which are never read and fake temporaries of pure values
+    which are read only once. The latter are inlined into the statement
+    which reads them.
+    The tree is changed before it's compiled, hence the links between the
+    compiled lines stay consistent.
+    """
+
+    terminators = ('return_statement', 'throw_statement', 'break_statement',
+                   'continue_statement')
+
+    # nodes of values which might have side effects or fail at runtime
+    impure_nodes = ('service', 'call_expression', 'mutation',
+                    'mutation_fragment', 'inline_expression')
+    impure_operators = ('BSLASH', 'MODULUS')
+
+    def __init__(self):
+        # the number of tree nodes which were removed
+        self.eliminated = 0
+
+    def process(self, tree):
+        """
+        Removes dead code from a tree and returns the number of eliminated
+        nodes.
+        """
+        size = self.size(tree)
+        self.unreachable(tree)
+        while self.inline_temporaries(tree) or self.unused_assignments(tree):
+            pass
+        self.eliminated += size - self.size(tree)
+        return self.eliminated
+
+    @staticmethod
+    def size(tree):
+        return sum(1 for _ in tree.iter_subtrees())
+
+    @staticmethod
+    def statement_lists(tree):
+        """
+        Returns all lists of blocks, which are executed one after another.
+        """
+        return list(tree.find_pred(
+            lambda t: t.data in ('start', 'nested_block')))
+
+    @classmethod
+    def terminates(cls, block):
+        """
+        Checks whether a block ends the execution of its statement list.
+        """
+        rules = block.children[-1]
+        if not (isinstance(rules, Tree) and rules.data == 'rules'):
+            return False
+        statement = rules.child(0)
+        return isinstance(statement, Tree) and \
+            statement.data in cls.terminators
+
+    @staticmethod
+    def check(tree):
+        """
+        Reports the errors of removed code, which would be found when its
+        literals are compiled.
+        """
+        for node in tree.find_pred(lambda t: t.data in ('string', 'time')):
+            if node.data == 'string':
+                Literals.string(node, node.child(0).value)
+            else:
+                Literals.time(node)
+
+    def unreachable(self, tree):
+        """
+        Removes the blocks after a terminating statement. Statements at the
+        top of a story are kept, as they might be invalid there.
+        """
+        for statements in self.statement_lists(tree):
+            if statements.data == 'start':
+                continue
+            for i, block in enumerate(statements.children):
+                if self.terminates(block):
+                    for removed in statements.children[i + 1:]:
+                        self.check(removed)
+                    statements.children = statements.children[:i + 1]
+                    break
+
+    @staticmethod
+    def assigned_name(assignment):
+        """
+        Returns the name a plain assignment writes or None if it writes
+        to a property or index of a variable.
+        """
+        path = assignment.child(0)
+        if path.data != 'path' or len(path.children) != 1:
+            return None
+        return path.child(0)
+
+    @classmethod
+    def reads(cls, tree):
+        """
+        Counts the names read in a tree. All names except the targets of
+        plain assignments are considered to be read, e.g. argument names
+        too.
+        """
+        targets = set()
+        for assignment in tree.find_data('assignment'):
+            name = cls.assigned_name(assignment)
+            if name is not None:
+                targets.add(id(name))
+        return Counter(token.value for token in tree.scan_values(
+            lambda v: isinstance(v, Token) and v.type == 'NAME' and
+            id(v) not in targets))
+
+    @classmethod
+    def is_pure(cls, assignment):
+        """
+        Checks whether an assignment has a value without side effects,
+        which can't fail at runtime either.
+        """
+        value = assignment.assignment_fragment.base_expression.child(0)
+        if value.data not in ('expression', 'path'):
+            return False
+        for subtree in value.iter_subtrees():
+            if subtree.data in cls.impure_nodes:
+                return False
+            if subtree.data == 'path' and len(subtree.children) > 1:
+                # indexing might fail
+                return False
+            if subtree.data == 'as_operator' and \
+                    subtree.child(0).child(0).data != 'base_type':
+                return False
+            if subtree.data == 'base_type' and \
+                    subtree.child(0).type != 'STRING_TYPE':
+                # only casts to strings can't fail
+                return False
+            if subtree.data.endswith('_operator') and \
+                    isinstance(subtree.child(0), Token) and \
+                    subtree.child(0).type in cls.impure_operators:
+                return False
+        return True
+
+    @staticmethod
+    def is_temporary(node):
+        return isinstance(node, Tree) and node.data == 'assignment' and \
+            node.path.child(0).value.startswith(FakeTree.prefix)
+
+    def unused_assignments(self, tree):
+        """
+        Removes the pure assignments of variables which are never read.
+        Returns whether an assignment has been removed.
+        """
+        reads = self.reads(tree)
+
+        def is_unused(assignment):
+            name = self.assigned_name(assignment)
+            if name is None or reads[name.value] > 0 or \
+                    not self.is_pure(assignment):
+                return False
+            self.check(assignment)
+            return True
+
+        removed = False
+        for statements in self.statement_lists(tree):
+            blocks = {}
+            for block in statements.children:
+                blocks[id(block)] = [
+                    child for child in block.children
+                    if not (self.is_temporary(child) and is_unused(child))
+                    and not (child.data == 'rules' and
+                             child.child(0).data == 'assignment' and
+                             is_unused(child.child(0)))
+                ]
+            remaining = [block for block in statements.children
+                         if len(blocks[id(block)]) > 0]
+            if len(remaining) == 0 and statements.data == 'nested_block':
+                # nested blocks can't be empty
+                continue
+            for block in statements.children:
+                if len(blocks[id(block)]) < len(block.children):
+                    block.children = blocks[id(block)]
+                    removed = True
+            statements.children = remaining
+        return removed
+
+    @staticmethod
+    def find_read(tree, name):
+        """
+        Finds the expression which reads `name` or None if it's read in
+        another way.
+        """
+        for expression in tree.find_data('expression'):
+            if len(expression.children) != 1:
+                continue
+            entity = expression.child(0)
+            if entity.data != 'entity' or entity.child(0).data != 'path':
+                continue
+            path = entity.child(0)
+            if len(path.children) == 1 and path.child(0).value == name:
+                return expression
+        return None
+
+    def inline_temporaries(self, tree):
+        """
+        Inlines the pure fake temporaries which are read only once by the
+        following statement of their block, e.g. the expressions of string
+        templates.
+        Returns whether a temporary has been inlined.
+        """
+        reads = self.reads(tree)
+        inlined = False
+        for block in tree.find_data('block'):
+            i = 0
+            while i < len(block.children):
+                child = block.children[i]
+                name = child.path.child(0).value \
+                    if self.is_temporary(child) else None
+                if name is None or reads[name] != 1 or \
+                        not self.is_pure(child):
+                    i += 1
+                    continue
+                if self.inline(block, i, name):
+                    inlined = True
+                else:
+                    i += 1
+        return inlined
+
+    def inline(self, block, index, name):
+        """
+        Inlines the temporary at `index` of a block into its reader. Only
+        pure temporaries may be evaluated between them.
+        """
+        value = block.children[index].assignment_fragment.base_expression
+        for child in block.children[index + 1:]:
+            if child.data not in ('assignment', 'rules'):
+                # compound statements might evaluate the value many times
+                return False
+            expression = self.find_read(child, name)
+            if expression is not None:
+                self.replace(expression, value.child(0))
+                del block.children[index]
+                return True
+            if not (self.is_temporary(child) and self.is_pure(child)):
+                return False
+        return False
+
+    @staticmethod
+    def replace(expression, value):
+        """
+        Replaces the expression reading a temporary with its value.
+        """
+        if value.data == 'path':
+            expression.children = [Tree('entity', [value])]
+            expression.kind = 'primary_expression'
+        else:
+            expression.children = value.children
+            expression.kind = getattr(value, 'kind', None)
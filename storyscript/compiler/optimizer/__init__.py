@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+from storyscript.compiler.optimizer.ConstantFolding import ConstantFolding
+from storyscript.compiler.optimizer.DeadCodeElimination import \
+    DeadCodeElimination
+
+__all__ = ['ConstantFolding', 'DeadCodeElimination']
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+from storyscript.compiler.Literals import Literals
 from storyscript.compiler.lowering.utils import unicode_escape
 from storyscript.exceptions import internal_assert
 from storyscript.parser import Tree
@@ -72,12 +73,7 @@ class Objects:
         """
         Compiles a number tree
         """
-        token = tree.child(0)
-        if token.value[0] == '+':
-            token.value = token.value[1:]
-        if token.type == 'FLOAT':
-            return token.value
-        return token.value
+        return Literals.number_text(tree.child(0).value)
 
     def string(self, tree):
         """
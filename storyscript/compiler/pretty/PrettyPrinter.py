@@ -1,16 +1,25 @@
 # -*- coding: utf-8 -*-
 import contextlib
 
+from storyscript.compiler.visitors.Dispatcher import Dispatcher
 from storyscript.parser import Tree
 
 from .Objects import Objects
 
 
-class PrettyPrinter:
+class PrettyPrinter(metaclass=Dispatcher):
 
     """
     Formats a Storyscript abstract syntax tree back to Storyscript.
     """
+    # nodes which are formatted directly, all other nodes are traversed
+    dispatch_nodes = ['service_block', 'absolute_expression', 'assignment',
+                      'if_block', 'elseif_block', 'else_block',
+                      'foreach_block', 'function_block', 'when_block',
+                      'try_block', 'return_statement', 'arguments',
+                      'call_expression', 'while_block', 'throw_statement',
+                      'break_statement', 'mutation_block', 'indented_chain']
+
     def __init__(self):
         self.buf = ''
         self.indent_type = '  '
@@ -264,15 +273,9 @@ class PrettyPrinter:
         Parses a subtree, checking whether it should be compiled directly
         or keep parsing for deeper trees.
         """
-        allowed_nodes = ['service_block', 'absolute_expression', 'assignment',
-                         'if_block', 'elseif_block', 'else_block',
-                         'foreach_block', 'function_block', 'when_block',
-                         'try_block', 'return_statement', 'arguments',
-                         'call_expression',
-                         'imports', 'while_block', 'throw_statement',
-                         'break_statement', 'mutation_block', 'indented_chain']
-        if tree.data in allowed_nodes:
-            getattr(self, tree.data)(tree, parent)
+        handler = self._dispatch_table.get(tree.data)
+        if handler is not None:
+            handler(self, tree, parent)
         else:
             self.parse_tree(tree, parent=parent)
 
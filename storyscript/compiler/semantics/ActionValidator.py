@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+from weakref import WeakKeyDictionary
+
+from storyscript.compiler.semantics.types.Casting import implicit_type_cast
+from storyscript.hub.TypeMappings import TypeMappings
+
+
+class ActionValidator:
+    """
+    Checks the arguments of calls to a service action (or event) against
+    its arguments, which are looked up in the hub data only once.
+    """
+
+    # validators of each hub by (service name, action name), dropped
+    # together with their hub
+    validators = WeakKeyDictionary()
+
+    def __init__(self, action):
+        self.action = action
+        args = action.args()
+        self.required = [arg.name() for arg in args if arg.required()]
+        self.types = {arg.name(): TypeMappings.get_type_instance(var=arg)
+                      for arg in args}
+
+    @classmethod
+    def get(cls, hub, action, service_name, action_name):
+        """
+        Returns the cached validator of an action of `hub`. Services of
+        different stories may share the names of their outputs, hence a
+        validator is only reused for the same action.
+        """
+        validators = cls.validators.get(hub)
+        if validators is None:
+            validators = {}
+            cls.validators[hub] = validators
+        key = (service_name, action_name)
+        validator = validators.get(key)
+        if validator is None or validator.action is not action:
+            validator = cls(action)
+            validators[key] = validator
+        return validator
+
+    def check(self, tree, args, service_name, action_name):
+        """
+        Checks that all required arguments are given and that the given
+        arguments exist and can be cast to their types.
+        """
+        for arg_name in self.required:
+            tree.expect(arg_name in args, 'service_arg_required',
+                        service=service_name, action=action_name,
+                        arg=arg_name)
+
+        for arg, (sym, arg_node) in args.items():
+            target_type = self.types.get(arg)
+            tree.expect(target_type is not None, 'service_arg_invalid',
+                        service=service_name, action=action_name, arg=arg)
+            implicit_type_cast(tree, sym.type(), target_type,
+                               service_name, action_name, arg, arg_node)
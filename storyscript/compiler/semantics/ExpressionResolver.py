@@ -4,9 +4,11 @@ from contextlib import contextmanager
 
 from lark.lexer import Token
 
+from storyscript.compiler.Literals import Literals
+from storyscript.compiler.semantics.types.Lattice import Lattice
 from storyscript.compiler.semantics.types.Types import AnyType, BaseType, \
     BooleanType, FloatType, IntType, ListType, MapType, ObjectType, \
-    RegExpType, StringType, TimeType, explicit_cast
+    RegExpType, StringType, TimeType
 from storyscript.compiler.visitors.ExpressionVisitor import ExpressionVisitor
 from storyscript.exceptions import CompilerError
 from storyscript.parser import Tree
@@ -79,7 +81,7 @@ class SymbolExpressionVisitor(ExpressionVisitor):
         # check for compatibility
         t = self.visitor.types(tree.child(1).types)
         tree.expect(t.type() != ObjectType.instance(), 'object_no_as')
-        tree.expect(explicit_cast(expr.type(), t.type()),
+        tree.expect(Lattice.explicit_cast(expr.type(), t.type()),
                     'type_operation_cast_incompatible',
                     left=expr.type(), right=t.type())
         return t
@@ -128,7 +130,7 @@ class SymbolExpressionVisitor(ExpressionVisitor):
             assert len(types) <= 2
             # e.g. a < b
             if self.is_cmp(op.type):
-                target_type = types[0].cmp(types[1])
+                target_type = Lattice.cmp(types[0], types[1])
                 tree.expect(target_type, 'type_operation_cmp_incompatible',
                             left=types[0], right=types[1])
                 self.nary_args_implicit_cast(tree, target_type, types)
@@ -136,7 +138,7 @@ class SymbolExpressionVisitor(ExpressionVisitor):
 
             # e.g. a == b
             if self.is_equal(op.type):
-                target_type = types[0].equal(types[1])
+                target_type = Lattice.equal(types[0], types[1])
                 tree.expect(target_type,
                             'type_operation_equal_incompatible',
                             left=types[0], right=types[1])
@@ -158,7 +160,7 @@ class SymbolExpressionVisitor(ExpressionVisitor):
                     operator=op.type)
         target_type = types[0]
         for t in types[1:]:
-            new_target_type = target_type.binary_op(t, op)
+            new_target_type = Lattice.binary_op(target_type, t, op)
             tree.expect(new_target_type is not None,
                         'type_operation_incompatible',
                         left=target_type, right=t, op=op.value)
@@ -244,8 +246,6 @@ class ExpressionResolver:
         """
         assert tree.data == 'number'
         token = tree.child(0)
-        if token.value[0] == '+':
-            token.value = token.value[1:]
         if token.type == 'FLOAT':
             return base_symbol(FloatType.instance())
         return base_symbol(IntType.instance())
@@ -255,6 +255,7 @@ class ExpressionResolver:
         Compiles a time tree.
         """
         assert tree.data == 'time'
+        Literals.time(tree)
         return base_symbol(TimeType.instance())
 
     def string(self, tree):
@@ -262,6 +263,7 @@ class ExpressionResolver:
         Compiles a string tree.
         """
         assert tree.data == 'string'
+        Literals.string(tree, tree.child(0).value)
         return base_symbol(StringType.instance())
 
     def boolean(self, tree):
@@ -3,34 +3,31 @@ from storyscript.compiler.semantics.types.Types import NoneType, ObjectType
 from storyscript.parser import Tree
 
 from .ExpressionResolver import ExpressionResolver
-from .Visitors import ScopeSelectiveVisitor
-from .symbols.Scope import Scope
+from .Visitors import BaseVisitor
 from .symbols.Symbols import Symbol
 
 
-class FunctionResolver(ScopeSelectiveVisitor):
+class FunctionResolver(BaseVisitor):
     """
     Populate the table of all function symbols before checking their calls
-    in the next semantic run.
+    in the semantic run.
+    Functions can only be declared at the top-level of a story, thus only
+    the headers of the top-level function blocks are scanned.
     """
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.resolver = ExpressionResolver(module=self.module)
 
-    def block(self, tree, scope):
-        self.visit_children(tree, scope)
+    def visit(self, tree):
+        for block in tree.children:
+            for c in block.children:
+                if isinstance(c, Tree) and c.data == 'function_block':
+                    self.function_statement(c.function_statement)
 
-    def function_block(self, tree, scope):
-        tree.scope, return_type = self.function_statement(
-            tree.function_statement, scope
-        )
-
-    def function_statement(self, tree, scope):
+    def function_statement(self, tree):
         """
-        Create a new scope _without_ a parent scope for this function.
-        Prepopulate the scope with symbols from the function arguments.
+        Adds the signature of a function to the function table.
         """
-        scope = Scope.root()
         return_type = NoneType.instance()
         args = {}
         for c in tree.children[2:]:
@@ -38,7 +35,6 @@ class FunctionResolver(ScopeSelectiveVisitor):
                 name = c.child(0)
                 e_sym = self.resolver.types(c.types)
                 sym = Symbol.from_path(name, e_sym.type())
-                scope.insert(sym)
                 args[sym.name()] = sym
         # add function to the function table
         function_name = tree.child(1).value
@@ -50,7 +46,3 @@ class FunctionResolver(ScopeSelectiveVisitor):
             tree.expect(return_type != ObjectType.instance(),
                         'return_type_no_object')
         self.module.function_table.insert(function_name, args, return_type)
-        return scope, return_type
-
-    def start(self, tree, scope=None):
-        self.visit_children(tree, scope=tree.scope)
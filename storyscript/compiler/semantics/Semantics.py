@@ -15,9 +15,10 @@ class Semantics:
     Performs semantic analysis on the AST
     """
 
-    def __init__(self, features):
+    def __init__(self, features, services=None):
         root_scope = Scope.root()
-        service_typing = ServiceTyping()
+        service_typing = ServiceTyping(snapshot=features.hub_snapshot,
+                                       services=services)
 
         self.module = Module(
             symbol_resolver=SymbolResolver(scope=root_scope),
@@ -28,10 +29,11 @@ class Semantics:
             service_typing=service_typing,
         )
 
-    visitors = [FunctionResolver, TypeResolver]
-
     def process(self, tree):
-        for visitor in self.visitors:
-            v = visitor(module=self.module)
-            v.visit(tree)
+        """
+        Collects all function signatures and resolves all types of the tree
+        in a single traversal.
+        """
+        FunctionResolver(module=self.module).visit(tree)
+        TypeResolver(module=self.module).visit(tree)
         return self.module
@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
+from lark.lexer import Token
+
 from storyhub.sdk.service.Output import Output as ServiceOutput
 
-from storyscript.compiler.semantics.types.Casting import implicit_type_cast
-from storyscript.hub.Hub import story_hub
+from storyscript.hub.Hub import hub_snapshot, story_hub
 from storyscript.hub.TypeMappings import TypeMappings
 
+from .ActionValidator import ActionValidator
 from .types.Types import NoneType, ObjectType
 
 
@@ -13,8 +15,55 @@ class ServiceTyping:
     Handles interaction with the storyhub to grab typing
     information of services
     """
-    def __init__(self):
-        self.hub = story_hub()
+    def __init__(self, snapshot=None, services=None):
+        self.hub = self.find_hub(snapshot)
+        # service data prefetched for a whole bundle
+        if services is None:
+            services = {}
+        self.services = services
+
+    @staticmethod
+    def find_hub(snapshot):
+        """
+        Returns the hub snapshot of the `snapshot` path if there is one and
+        the storyhub otherwise.
+        """
+        if snapshot is None:
+            return story_hub()
+        return hub_snapshot(snapshot)
+
+    @staticmethod
+    def service_names(tree):
+        """
+        Finds the names of the services a parsed tree might use. The
+        services of string templates are only found when they are compiled.
+        """
+        names = set()
+        events = set()
+        outputs = set()
+        for subtree in tree.iter_subtrees_topdown():
+            if subtree.data == 'concise_when_block':
+                names.add(subtree.child(0).value)
+            elif subtree.data == 'when_block':
+                # a when block listens to the output of its parent service
+                events.add(id(subtree.service))
+            elif subtree.data == 'output':
+                outputs.update(subtree.scan_values(
+                    lambda v: isinstance(v, Token)))
+            elif subtree.data == 'service' and id(subtree) not in events:
+                if len(subtree.path.children) == 1:
+                    names.add(subtree.path.child(0).value)
+        return names - {output.value for output in outputs}
+
+    @classmethod
+    def prefetch(cls, names, snapshot=None):
+        """
+        Fetches the data of many services at once, s.t. the stories of a
+        bundle don't look up the same services in the hub again.
+        """
+        hub = cls.find_hub(snapshot)
+        return {name: hub.get(name, wrap_service=True)
+                for name in sorted(names)}
 
     def enforce_service_data(self, tree, service_name):
         """
@@ -22,7 +71,10 @@ class ServiceTyping:
         retrieve service data for a given service name and return it
         after doing a check for its existence.
         """
-        service_data = self.hub.get(service_name, wrap_service=True)
+        if service_name in self.services:
+            service_data = self.services[service_name]
+        else:
+            service_data = self.hub.get(service_name, wrap_service=True)
         tree.expect(service_data is not None,
                     'service_not_found', name=service_name)
         return service_data
@@ -32,21 +84,9 @@ class ServiceTyping:
         return action
 
     def check_action_args(self, tree, action, args, service_name, action_name):
-        required_args = (arg for arg in action.args() if arg.required())
-        for arg in required_args:
-            arg_name = arg.name()
-            tree.expect(args.get(arg_name) is not None, 'service_arg_required',
-                        service=service_name, action=action_name, arg=arg_name)
-
-        for arg, (sym, arg_node) in args.items():
-            action_arg = action.arg(arg)
-            tree.expect(action_arg is not None, 'service_arg_invalid',
-                        service=service_name, action=action_name, arg=arg)
-            target_type = TypeMappings.get_type_instance(var=action_arg)
-            source_type = sym.type()
-
-            implicit_type_cast(tree, source_type, target_type,
-                               service_name, action_name, arg, arg_node)
+        validator = ActionValidator.get(self.hub, action, service_name,
+                                        action_name)
+        validator.check(tree, args, service_name, action_name)
 
     def resolve_service(self, tree, service_name, action_name, args,
                         nested_block=False):
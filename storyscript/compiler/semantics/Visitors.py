@@ -1,9 +1,10 @@
 # -*- coding: utf-8 -*-
 
+from storyscript.compiler.visitors.Dispatcher import Dispatcher
 from storyscript.parser import Tree
 
 
-class BaseVisitor:
+class BaseVisitor(metaclass=Dispatcher):
     def __init__(self, module):
         self.module = module
 
@@ -14,8 +15,9 @@ class SelectiveVisitor(BaseVisitor):
     visit_children must be called explicitly.
     """
     def visit(self, tree):
-        if hasattr(self, tree.data):
-            return getattr(self, tree.data)(tree)
+        handler = self._dispatch_table.get(tree.data)
+        if handler is not None:
+            return handler(self, tree)
 
     def visit_children(self, tree):
         for c in tree.children:
@@ -29,8 +31,9 @@ class ScopeSelectiveVisitor(BaseVisitor):
     visit_children must be called explicitly.
     """
     def visit(self, tree, scope=None):
-        if hasattr(self, tree.data):
-            return getattr(self, tree.data)(tree, scope)
+        handler = self._dispatch_table.get(tree.data)
+        if handler is not None:
+            return handler(self, tree, scope)
 
     def visit_children(self, tree, scope):
         for c in tree.children:
@@ -15,7 +15,7 @@ class Mutation:
         self._args = args
         self._output = output
         self._base_type = base_type(ti)
-        self._arg_names = self.compute_arg_names_hash(args.keys())
+        self._arg_names = self.compute_arg_names_key(args.keys())
         self._cmp_name = name + ','.join(sorted(args.keys()))
 
     def instantiate(self, type_):
@@ -62,15 +62,15 @@ class Mutation:
         """
         return self._cmp_name
 
-    def arg_names_hash(self):
+    def arg_names_key(self):
         """
-        Returns the hashed argument names of this mutation
+        Returns the key of the argument names of this mutation
         """
         return self._arg_names
 
     @staticmethod
-    def compute_arg_names_hash(keys):
+    def compute_arg_names_key(keys):
         """
         Converts a list of argument names to a hashable key.
         """
-        return hash(tuple(sorted(keys)))
+        return frozenset(keys)
@@ -1,4 +1,5 @@
 from itertools import chain
+from weakref import WeakKeyDictionary
 
 from storyscript.compiler.semantics.functions.HubMutations import Hub
 from storyscript.compiler.semantics.functions.Mutation import Mutation
@@ -8,41 +9,45 @@ from storyscript.compiler.semantics.types.Types import AnyType
 class MutationOverloads:
     """
     Contains all overloads for a mutation of a specific name and type.
+    The overloads are indexed by their argument names and are shared by all
+    resolutions of the same mutation name and base type.
     """
 
-    def __init__(self, name, type_):
-        self._obj = {}
+    def __init__(self, name, type_, overloads, sorted_overloads):
+        self._obj = overloads
+        self._all = sorted_overloads
         self._name = name
         self._type = type_
 
-    def add_overloads(self, overloads):
-        for name, overload in overloads.items():
-            self.add_overload(name, overload)
-
-    def add_overload(self, name, overload):
-        if name not in self._obj:
-            self._obj[name] = []
-        self._obj[name].append(overload)
+    @staticmethod
+    def build_index(overloads):
+        """
+        Merges multiple `{arg_names: mutation}` dicts into an index of all
+        overloads with the same argument names and a sorted list of all
+        overloads.
+        """
+        index = {}
+        for overload in overloads:
+            for arg_names, mutation in overload.items():
+                if arg_names not in index:
+                    index[arg_names] = []
+                index[arg_names].append(mutation)
+        all_overloads = chain.from_iterable(index.values())
+        return index, sorted(all_overloads, key=lambda m: m.cmp_name())
 
     def all(self):
         """
-        Builds a sorted list of all available overloads.
+        Returns a sorted list of all available overloads.
         """
-        overloads = chain.from_iterable(self._obj.values())
-        return list(sorted(overloads, key=lambda m: m.cmp_name()))
+        return self._all
 
     def single(self):
         """
         If there's only one mutation overload, return this one.
         Otherwise return `None`.
         """
-        if len(self._obj) != 1:
-            return None
-
-        e = next(iter(self._obj.values()))  # get the only element
-        if len(e) == 1:
-            # there is only one overload -> return
-            return e[0]
+        if len(self._all) == 1:
+            return self._all[0]
 
         return None
 
@@ -51,12 +56,8 @@ class MutationOverloads:
         Finds the matching overload for an arg_names pair.
         Returns `None` if no match was found.
         """
-        arg_names = Mutation.compute_arg_names_hash(arg_names)
-        match = self._obj.get(arg_names, None)
-        if match is None:
-            return None
-
-        return match
+        arg_names = Mutation.compute_arg_names_key(arg_names)
+        return self._obj.get(arg_names, None)
 
     def type(self):
         """
@@ -77,6 +78,10 @@ class MutationTable:
     """
     def __init__(self):
         self.mutations = {}
+        # (type key, name) -> prebuilt overload index
+        self._indices = {}
+        # (type, name) -> MutationOverloads
+        self._resolved = {}
 
     def insert(self, mutation):
         """
@@ -88,7 +93,7 @@ class MutationTable:
             self.mutations[name] = {}
         muts = self.mutations[name]
         t = self.type_key(mutation.base_type())
-        arg_names = mutation.arg_names_hash()
+        arg_names = mutation.arg_names_key()
         match = muts.get(t, None)
         if match is not None:
             assert arg_names not in match, \
@@ -97,6 +102,9 @@ class MutationTable:
         else:
             muts[t] = {}
         muts[t][arg_names] = mutation
+        # invalidate all previous resolutions
+        self._indices = {}
+        self._resolved = {}
 
     @staticmethod
     def type_key(type_):
@@ -105,41 +113,71 @@ class MutationTable:
         """
         return type_.__name__
 
-    def _resolve_any(self, muts, name):
+    def index(self, type_, name):
         """
-        Searches for all potential type overloads on mutation.
+        Returns the prebuilt overload index of the mutation `name` for the
+        base type of `type_` or `None`.
+        Overloads on `any` are merged from all types.
         """
-        mo = MutationOverloads(name, AnyType.instance())
-        for overloads in muts.values():
-            mo.add_overloads(overloads)
-        return mo
+        t = self.type_key(type(type_))
+        key = (t, name)
+        if key in self._indices:
+            return self._indices[key]
 
-    def resolve(self, type_, name):
-        """
-        Returns the mutation `name` or `None`.
-        """
+        index = None
         muts = self.mutations.get(name, None)
-        if muts is None:
-            return None
+        if muts is not None:
+            if type_ == AnyType.instance():
+                index = MutationOverloads.build_index(muts.values())
+            elif t in muts:
+                index = MutationOverloads.build_index([muts[t]])
+        self._indices[key] = index
+        return index
 
+    def names(self, type_):
+        """
+        Returns the sorted names of all mutations for the base type of
+        `type_`.
+        """
         if type_ == AnyType.instance():
-            return self._resolve_any(muts, name)
-
+            return sorted(self.mutations.keys())
         t = self.type_key(type(type_))
-        overloads = muts.get(t, None)
-        if overloads is None:
-            return None
+        return sorted(name for name, muts in self.mutations.items()
+                      if t in muts)
 
-        mo = MutationOverloads(name, type_)
-        mo.add_overloads(overloads)
+    def resolve(self, type_, name):
+        """
+        Returns the mutation `name` or `None`.
+        """
+        cacheable = type_.cacheable()
+        key = (type_, name)
+        if cacheable and key in self._resolved:
+            return self._resolved[key]
+
+        mo = None
+        index = self.index(type_, name)
+        if index is not None:
+            mo = MutationOverloads(name, type_, *index)
+        if cacheable:
+            self._resolved[key] = mo
         return mo
 
     @classmethod
     def init(cls):
         """
-        Builds a list of all mutations of the Hub.
+        Returns the table of all mutations of the current Hub. It's built
+        once per Hub and shared by all stories.
         """
-        mi = cls()
-        for m in Hub.instance().mutations():
+        hub = Hub.instance()
+        mi = _hub_mutation_tables.get(hub)
+        if mi is not None:
+            return mi
+        mi = MutationTable()
+        for m in hub.mutations():
             mi.insert(m)
+        _hub_mutation_tables[hub] = mi
         return mi
+
+
+# hub -> mutation table (dropped together with its hub)
+_hub_mutation_tables = WeakKeyDictionary()
@@ -22,21 +22,56 @@ app_keyword = Symbol(name='app', type_=ObjectType(obj=app_props),
 
 class Scope:
     """
-    Manages an individual scope
+    Manages an individual scope.
+    Symbols resolved from parent scopes are memoized per scope. Every
+    insertion of a symbol name bumps its generation, which is shared by all
+    scopes of the same root scope, and thus invalidates the memoized
+    resolutions of this name in all scopes.
     """
 
     def __init__(self, parent=None):
         self._parent = parent
         self._symbols = Symbols()
+        # name -> (generation, symbol) of symbols resolved by parent scopes
+        self._resolved = {}
+        self._generations = None
+
+    def generations(self):
+        """
+        Returns the insertion counters of all symbol names. They are shared
+        with all scopes of the same root scope.
+        """
+        if self._generations is None:
+            if self._parent is None:
+                self._generations = {}
+            else:
+                self._generations = self._parent.generations()
+        return self._generations
 
     def insert(self, sym):
+        """
+        Inserts a symbol into this scope.
+        """
+        generations = self.generations()
+        name = sym.name()
+        generations[name] = generations.get(name, 0) + 1
         self._symbols.insert(sym)
 
     def resolve(self, path):
-        for scope in self.scopes():
-            p = scope._symbols.resolve(path)
-            if p:
-                return p
+        p = self._symbols.resolve(path)
+        if p:
+            return p
+        if self._parent is None:
+            return None
+
+        generation = self.generations().get(path, 0)
+        resolved = self._resolved.get(path, None)
+        if resolved is not None and resolved[0] == generation:
+            return resolved[1]
+
+        p = self._parent.resolve(path)
+        self._resolved[path] = (generation, p)
+        return p
 
     def symbols(self):
         """
@@ -1,5 +1,6 @@
 from storyscript.compiler.semantics.ExpressionResolver import \
     SymbolExpressionVisitor
+from storyscript.compiler.semantics.types.Lattice import Lattice
 from storyscript.compiler.semantics.types.Types import AnyType
 
 
@@ -24,7 +25,7 @@ def implicit_type_cast(tree, source_type, target_type,
         arg_node: Tree node pointing to the actual argument node
             inside the tree in question
     """
-    type_cast_result = target_type.can_be_assigned(source_type)
+    type_cast_result = Lattice.can_be_assigned(target_type, source_type)
     tree.expect(type_cast_result or source_type == AnyType.instance(),
                 'param_arg_type_mismatch',
                 fn_type=fn_type,
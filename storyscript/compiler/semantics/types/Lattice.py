@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+from storyscript.compiler.semantics.types.Types import BaseType, \
+    explicit_cast
+
+
+def memoize(fn):
+    """
+    Lazily memoizes a type operation on the identity of its arguments.
+    Operator tokens are keyed on their token type. Operations involving a type
+    which isn't cacheable are always computed from scratch.
+    """
+    cache = {}
+
+    def wrapped(*args):
+        key = []
+        for arg in args:
+            if isinstance(arg, BaseType):
+                if not arg.cacheable():
+                    return fn(*args)
+                key.append(arg)
+            else:
+                key.append(arg.type)
+        key = tuple(key)
+        if key not in cache:
+            cache[key] = fn(*args)
+        return cache[key]
+
+    wrapped.cache = cache
+    return wrapped
+
+
+class Lattice:
+    """
+    Memoized table of all operations and casts between types.
+    Entries are computed on their first lookup with the respective methods
+    of the types and reused afterwards.
+    """
+
+    @staticmethod
+    @memoize
+    def binary_op(left, right, op):
+        """
+        Returns the type resulting from `left` `op` `right` or `None`.
+        """
+        return left.binary_op(right, op)
+
+    @staticmethod
+    @memoize
+    def cmp(left, right):
+        """
+        Returns the type in which `left` and `right` can be compared or `None`.
+        """
+        return left.cmp(right)
+
+    @staticmethod
+    @memoize
+    def equal(left, right):
+        """
+        Returns the type in which `left` and `right` can be checked for
+        equality or `None`.
+        """
+        return left.equal(right)
+
+    @staticmethod
+    @memoize
+    def can_be_assigned(target, source):
+        """
+        Returns the type to which `source` is converted when being assigned
+        to `target` or `None`.
+        """
+        return target.can_be_assigned(source)
+
+    @staticmethod
+    @memoize
+    def explicit_cast(from_, to):
+        """
+        Returns `to` if `from_` can be explicitly cast to it or `None`.
+        """
+        return explicit_cast(from_, to)
@@ -134,6 +134,13 @@ class BaseType:
         """
         return True
 
+    def cacheable(self):
+        """
+        Returns whether results of operations on this type only depend on the
+        type itself and can thus be memoized.
+        """
+        return True
+
     def index(self, index_type, index_kind):
         """
         Returns the type resulting from an index operation with `index_type` of
@@ -153,6 +160,9 @@ class BooleanType(BaseType):
     def __eq__(self, other):
         return isinstance(other, BooleanType)
 
+    def __hash__(self):
+        return hash(str(self))
+
     def op(self, op):
         return IntType.instance()
 
@@ -191,6 +201,9 @@ class NoneType(BaseType):
     def __eq__(self, other):
         return isinstance(other, NoneType)
 
+    def __hash__(self):
+        return hash(str(self))
+
     def can_be_assigned(self, other):
         return False
 
@@ -228,6 +241,9 @@ class IntType(BaseType):
     def __eq__(self, other):
         return isinstance(other, IntType)
 
+    def __hash__(self):
+        return hash(str(self))
+
     def op(self, op):
         return self
 
@@ -283,6 +299,9 @@ class FloatType(BaseType):
     def __eq__(self, other):
         return isinstance(other, FloatType)
 
+    def __hash__(self):
+        return hash(str(self))
+
     def op(self, op):
         return self
 
@@ -325,6 +344,9 @@ class StringType(BaseType):
     def __eq__(self, other):
         return isinstance(other, StringType)
 
+    def __hash__(self):
+        return hash(str(self))
+
     def op(self, op):
         if op.type == 'PLUS':
             return self
@@ -367,6 +389,9 @@ class TimeType(BaseType):
     def __eq__(self, other):
         return isinstance(other, TimeType)
 
+    def __hash__(self):
+        return hash(str(self))
+
     def op(self, op):
         if op.type == 'PLUS' or op.type == 'DASH':
             return self
@@ -400,6 +425,9 @@ class RegExpType(BaseType):
     def __eq__(self, other):
         return isinstance(other, RegExpType)
 
+    def __hash__(self):
+        return hash(str(self))
+
     def op(self, op):
         # no operations allowed on RegExp
         return None
@@ -438,6 +466,9 @@ class RangeType(BaseType):
     def __eq__(self, other):
         return isinstance(other, RangeType)
 
+    def __hash__(self):
+        return hash(str(self))
+
     @singleton
     def instance():
         """
@@ -461,6 +492,9 @@ class ListType(BaseType):
         return isinstance(other, ListType) and \
             self.inner == other.inner
 
+    def __hash__(self):
+        return hash(('List', self.inner))
+
     def op(self, op):
         if op.type == 'PLUS':
             return self
@@ -495,6 +529,9 @@ class ListType(BaseType):
             return self.inner,
         return IntType.instance(), self.inner
 
+    def cacheable(self):
+        return self.inner.cacheable()
+
     def has_boolean(self):
         return False
 
@@ -533,6 +570,9 @@ class MapType(BaseType):
                self.key == other.key and \
                self.value == other.value
 
+    def __hash__(self):
+        return hash(('Map', self.key, self.value))
+
     def op(self, op):
         return None
 
@@ -563,6 +603,9 @@ class MapType(BaseType):
             return self.key,
         return self.key, self.value
 
+    def cacheable(self):
+        return self.key.cacheable() and self.value.cacheable()
+
     def has_boolean(self):
         return False
 
@@ -597,9 +640,16 @@ class ObjectType(BaseType):
     def __eq__(self, other):
         return isinstance(other, ObjectType)
 
+    def __hash__(self):
+        return hash(str(self))
+
     def object(self):
         return self._object
 
+    def cacheable(self):
+        # the wrapped object isn't part of the type's identity
+        return False
+
     def op(self, op):
         return None
 
@@ -637,6 +687,9 @@ class AnyType(BaseType):
     def __eq__(self, other):
         return isinstance(other, AnyType)
 
+    def __hash__(self):
+        return hash(str(self))
+
     def can_be_assigned(self, other):
         return True
 
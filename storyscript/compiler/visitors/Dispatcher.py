@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+from types import FunctionType
+
+
+class Dispatcher(type):
+    """
+    Metaclass for visitors which dispatch on the `data` of tree nodes.
+    Instead of looking up a handler with hasattr/getattr for every visited
+    node, a table from node names to handlers is built once per visitor class.
+
+    The handlers are restricted to `dispatch_nodes` if a class defines it.
+    Otherwise all public methods are handlers.
+
+    Tables are rebuilt whenever an attribute of a visitor class (or one of
+    its bases) is set or deleted, e.g. when a handler gets patched.
+    """
+
+    def __init__(cls, name, bases, attributes):
+        super().__init__(name, bases, attributes)
+        cls.update_dispatch_table()
+
+    def dispatch_table(cls):
+        """
+        Returns the table of all handlers of this class.
+        A handler takes the visitor as its first argument.
+        """
+        return cls._dispatch_table
+
+    def update_dispatch_table(cls):
+        """
+        Rebuilds the dispatch table of this class and all of its subclasses.
+        """
+        type.__setattr__(cls, '_dispatch_table', cls.build_dispatch_table())
+        for subclass in cls.__subclasses__():
+            subclass.update_dispatch_table()
+
+    def build_dispatch_table(cls):
+        attributes = {}
+        for klass in reversed(cls.__mro__):
+            attributes.update(klass.__dict__)
+
+        nodes = getattr(cls, 'dispatch_nodes', None)
+        if nodes is None:
+            nodes = [name for name, attribute in attributes.items()
+                     if not name.startswith('_') and
+                     Dispatcher.is_method(attribute)]
+
+        table = {}
+        for name in nodes:
+            if name in attributes:
+                table[name] = Dispatcher.handler(attributes[name])
+        return table
+
+    @staticmethod
+    def is_method(attribute):
+        return callable(attribute) or \
+            isinstance(attribute, (staticmethod, classmethod))
+
+    @staticmethod
+    def handler(attribute):
+        """
+        Converts a class attribute into a function taking the visitor as its
+        first argument.
+        """
+        if isinstance(attribute, FunctionType):
+            return attribute
+        if hasattr(attribute, '__get__'):
+            return lambda self, *args: \
+                attribute.__get__(self, type(self))(*args)
+        return lambda self, *args: attribute(*args)
+
+    def __setattr__(cls, name, value):
+        super().__setattr__(name, value)
+        cls.update_dispatch_table()
+
+    def __delattr__(cls, name):
+        super().__delattr__(name)
+        cls.update_dispatch_table()
@@ -8,6 +8,7 @@ from lark.exceptions import UnexpectedCharacters, UnexpectedToken
 from .CompilerError import CompilerError
 from .ProcessingError import ProcessingError
 from ..ErrorCodes import ErrorCodes
+from ..FakeLine import FakeLine
 from ..Intention import Intention
 
 
@@ -42,6 +43,8 @@ class StoryError(SyntaxError):
         Gets the error line as an integer
         """
         line = self.error.line
+        if isinstance(line, FakeLine):
+            return line.line
         if not isinstance(line, int):
             line = int(line.split('.')[0])
         return line
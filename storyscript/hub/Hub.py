@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from functools import lru_cache
 
+from storyhub.sdk.ServiceWrapper import ServiceWrapper
 from storyhub.sdk.StoryscriptHub import StoryscriptHub
 
 
@@ -10,3 +11,36 @@ def story_hub():
     Returns a cached instance of StoryscriptHub() from the hub sdk.
     """
     return StoryscriptHub()
+
+
+@lru_cache(maxsize=4)
+def hub_snapshot(path):
+    """
+    Returns a cached HubSnapshot of the services in a snapshot file.
+    """
+    return HubSnapshot.load(path)
+
+
+class HubSnapshot:
+    """
+    Serves the services of a snapshot file instead of the StoryscriptHub,
+    s.t. stories can be compiled offline.
+    """
+
+    def __init__(self, services):
+        self.services = services
+
+    @classmethod
+    def load(cls, path):
+        return cls(ServiceWrapper.from_json_file(path))
+
+    @staticmethod
+    def write(path, services):
+        """
+        Fetches `services` from the hub and writes them to a snapshot file.
+        """
+        ServiceWrapper(services).as_json_file(path)
+
+    def get(self, alias, wrap_service=True):
+        # services of a snapshot are always wrapped
+        return self.services.get(alias)
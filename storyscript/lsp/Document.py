@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+import re
+from copy import copy
+
+from lark.exceptions import UnexpectedInput
+from lark.lexer import Token
+
+from ..Features import Features
+from ..Story import Story
+from ..compiler.Compiler import Compiler
+from ..compiler.json.JSONCompiler import JSONCompiler
+from ..exceptions import CompilerError, StoryError, StorySyntaxError
+from ..parser import Tree
+
+
+keywords = ['if', 'else', 'foreach', 'while', 'function', 'returns',
+            'return', 'when', 'try', 'catch', 'finally', 'throw', 'break',
+            'continue', 'as', 'and', 'or', 'not', 'true', 'false', 'null']
+
+
+class CompletionKind:
+    """
+    Kinds of completion items of the Language Server Protocol.
+    """
+    method = 2
+    function = 3
+    variable = 6
+    keyword = 14
+
+
+class Document:
+    """
+    An open document of the language server. The parse tree, the lowered
+    tree and the module of the last compilation are kept, s.t. requests can
+    be answered without compiling the document again.
+    Documents are only compiled again after their source has changed and the
+    parse tree of the previous version is reused for incremental parsing.
+    """
+
+    def __init__(self, uri, source, version=None, features=None):
+        self.uri = uri
+        if isinstance(features, Features):
+            self.features = features
+        else:
+            self.features = Features(features)
+        self.source = None
+        self.version = None
+        self.story = None
+        self.tree = None
+        self.lowered = None
+        self.module = None
+        self.error = None
+        self.scopes = []
+        self.update(source, version)
+
+    def update(self, source, version=None):
+        """
+        Replaces the source of the document. It is compiled on the next
+        access to its compilation state.
+        """
+        self.version = version
+        if source != self.source:
+            self.source = source
+            self.dirty = True
+
+    def compile(self, parser):
+        """
+        Compiles the document if its source has changed since the last
+        compilation.
+        """
+        if not self.dirty:
+            return
+        self.dirty = False
+        self.story = Story(self.source, self.features)
+        self.error = None
+        try:
+            self.tree = parser.parse_incremental(self.source, self.tree)
+            if self.tree.data == 'empty':
+                self.lowered, self.module, self.scopes = None, None, []
+                return
+            # lowering modifies trees, but the parse tree is reused
+            tree = self.tree.shifted_copy(0, 0)
+            self.lowered, self.module = Compiler.generate(tree, self.features)
+            self.scopes = self.find_scopes(self.lowered)
+            JSONCompiler(self.story).compile(self.lowered)
+        except (CompilerError, StorySyntaxError, UnexpectedInput) as error:
+            self.error = self.story.error(error)
+        except Exception as error:
+            self.error = StoryError.internal_error(error)
+
+    def draft(self):
+        """
+        Returns a copy of the document which can be compiled while the
+        document itself is changed. The parse tree is only read by
+        compilations, hence the copy shares it.
+        """
+        return copy(self)
+
+    def accept(self, draft):
+        """
+        Takes over the compilation of a draft of this document. Returns
+        whether the draft is still up to date, i.e. neither the source nor
+        the version changed since it was made.
+        """
+        if draft.source != self.source or draft.version != self.version:
+            return False
+        if self.dirty:
+            self.__dict__.update(draft.__dict__)
+        return True
+
+    def find_scopes(self, tree):
+        """
+        Returns the lines of all trees with a scope in the order of their
+        nesting, i.e. the scopes of nested blocks come after their parents.
+        """
+        lines = self.source.split('\n')
+        scopes = []
+        for subtree in tree.iter_subtrees_topdown():
+            scope = subtree.__dict__.get('scope')
+            if scope is None:
+                continue
+            if subtree.data == 'start':
+                scopes.append(((1, len(lines)), scope))
+                continue
+            line_range = subtree.line_range()
+            if line_range is not None:
+                first, last = line_range
+                scopes.append(((first, self.block_end(lines, first, last)),
+                               scope))
+        return scopes
+
+    @staticmethod
+    def block_end(lines, first, last):
+        """
+        Extends the last line of a block over the following blank lines and
+        lines indented deeper than its first line, where the user is
+        likely to continue the block.
+        """
+        header = lines[first - 1]
+        indentation = len(header) - len(header.lstrip())
+        while last < len(lines):
+            line = lines[last]
+            if line.strip() != '' and \
+                    len(line) - len(line.lstrip()) <= indentation:
+                break
+            last += 1
+        return last
+
+    def diagnostics(self):
+        """
+        Returns the errors of the last compilation as diagnostics.
+        """
+        if self.error is None:
+            return []
+        error = self.error.error
+        line = 0
+        if hasattr(error, 'line') and str(error.line).isdigit():
+            line = self.error.int_line() - 1
+        start, end = self.columns(error, line)
+        return [{
+            'range': {
+                'start': {'line': line, 'character': start},
+                'end': {'line': line, 'character': end},
+            },
+            'severity': 1,
+            'source': 'storyscript',
+            'message': self.error.short_message(),
+        }]
+
+    def columns(self, error, line):
+        """
+        Returns the first and the last character of an error.
+        Columns of errors start at 1.
+        """
+        lines = self.source.split('\n')
+        text = lines[line] if line < len(lines) else ''
+        column = str(getattr(error, 'column', None))
+        if not column.isdigit():
+            return len(text) - len(text.lstrip()), len(text)
+        start = int(column) - 1
+        end = str(getattr(error, 'end_column', None))
+        if end.isdigit() and int(end) - 1 > start:
+            return start, int(end) - 1
+        return start, start + 1
+
+    def scope(self, line):
+        """
+        Returns the innermost scope of a line. Lines start at 1.
+        """
+        result = None
+        for (first, last), scope in self.scopes:
+            if first <= line <= last:
+                result = scope
+        return result
+
+    def token(self, line, character):
+        """
+        Returns the name token at a position. Lines and characters start at 0.
+        """
+        if self.lowered is None:
+            return None
+        line, column = line + 1, character + 1
+        for token in self.lowered.scan_values(
+                lambda v: isinstance(v, Token) and v.type == 'NAME'):
+            if not str(token.column).isdigit() or \
+                    Tree.source_line(token.line) != line:
+                continue
+            start = int(token.column)
+            end = str(token.end_column)
+            end = int(end) if end.isdigit() else start + len(token)
+            if start <= column < end:
+                return token
+        return None
+
+    def hover(self, line, character):
+        """
+        Returns the type of the symbol or function at a position.
+        """
+        token = self.token(line, character)
+        if token is None:
+            return None
+        name = token.value
+        scope = self.scope(line + 1)
+        symbol = scope.resolve(name) if scope is not None else None
+        if symbol is not None:
+            return f'{name}: {symbol.type()}'
+        function = self.module.function_table.resolve(name)
+        if function is not None:
+            return f'function {function.pretty()} returns {function.output()}'
+        return None
+
+    def completions(self, line, character):
+        """
+        Returns the completion items for a position.
+        After a variable, all mutations of its type are proposed. Otherwise,
+        all symbols in scope, functions and keywords are proposed.
+        """
+        lines = self.source.split('\n')
+        text = lines[line][:character] if line < len(lines) else ''
+        scope = self.scope(line + 1)
+        if scope is None:
+            return []
+
+        match = re.search(r'([a-zA-Z_][\w-]*) +([\w-]*)$', text)
+        if match is not None:
+            symbol = scope.resolve(match.group(1))
+            if symbol is not None:
+                names = self.module.mutation_table.names(symbol.type())
+                return self.items(names, match.group(2),
+                                  CompletionKind.method)
+
+        prefix = re.search(r'[\w-]*$', text).group(0)
+        symbols = {}
+        for parent in scope.scopes():
+            for name, symbol in parent.symbols()._symbols.items():
+                if not symbol.is_internal():
+                    symbols.setdefault(name, str(symbol.type()))
+        items = self.items(symbols, prefix, CompletionKind.variable)
+        functions = self.module.function_table.functions
+        items += self.items(functions, prefix, CompletionKind.function)
+        items += self.items(keywords, prefix, CompletionKind.keyword)
+        return items
+
+    @staticmethod
+    def items(names, prefix, kind):
+        """
+        Returns completion items for all names starting with prefix.
+        """
+        items = []
+        for name in sorted(names):
+            if name.startswith(prefix):
+                item = {'label': name, 'kind': kind}
+                if isinstance(names, dict) and isinstance(names[name], str):
+                    item['detail'] = names[name]
+                items.append(item)
+        return items
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+import json
+import threading
+import time
+
+from .Document import Document
+from ..Features import Features
+from ..parser import ParserPool
+
+
+class LanguageServer:
+    """
+    A language server speaking the Language Server Protocol over a pair of
+    binary streams (usually stdin and stdout).
+    Documents are compiled in a background thread once no change has been
+    received for `debounce` seconds. Requests on documents with pending
+    changes compile them right away.
+    """
+
+    methods = {
+        'initialize': 'initialize',
+        'shutdown': 'shutdown',
+        'exit': 'exit',
+        'textDocument/didOpen': 'did_open',
+        'textDocument/didChange': 'did_change',
+        'textDocument/didClose': 'did_close',
+        'textDocument/hover': 'hover',
+        'textDocument/completion': 'completion',
+    }
+
+    def __init__(self, reader, writer, features=None, debounce=0.2):
+        self.reader = reader
+        self.writer = writer
+        self.features = Features(features)
+        self.debounce = debounce
+        self.documents = {}
+        # uri -> time when the document is compiled
+        self.pending = {}
+        self.running = False
+        self.lock = threading.RLock()
+        self.changed = threading.Condition(self.lock)
+        self.write_lock = threading.Lock()
+
+    def read(self):
+        """
+        Reads a message or returns `None` at the end of the stream.
+        """
+        length = None
+        while True:
+            line = self.reader.readline()
+            if line == b'':
+                return None
+            line = line.strip()
+            if line == b'':
+                break
+            name, _, value = line.partition(b':')
+            if name.strip().lower() == b'content-length':
+                length = int(value)
+        if length is None:
+            return None
+        return json.loads(self.reader.read(length).decode('utf-8'))
+
+    def write(self, message):
+        """
+        Writes a message.
+        """
+        message['jsonrpc'] = '2.0'
+        body = json.dumps(message).encode('utf-8')
+        with self.write_lock:
+            self.writer.write(b'Content-Length: %d\r\n\r\n' % len(body))
+            self.writer.write(body)
+            self.writer.flush()
+
+    def notify(self, method, params):
+        self.write({'method': method, 'params': params})
+
+    def serve(self):
+        """
+        Handles messages until the stream ends or the client exits.
+        """
+        self.running = True
+        worker = threading.Thread(target=self.compile_pending, daemon=True)
+        worker.start()
+        while self.running:
+            message = self.read()
+            if message is None:
+                break
+            self.handle(message)
+        with self.changed:
+            self.running = False
+            self.changed.notify()
+        worker.join()
+
+    def handle(self, message):
+        """
+        Dispatches a request or a notification to its handler.
+        """
+        method = self.methods.get(message.get('method'))
+        is_request = 'id' in message
+        if method is None:
+            if is_request:
+                self.write({'id': message['id'], 'error': {
+                    'code': -32601,
+                    'message': f'Unknown method {message.get("method")}'}})
+            return
+        try:
+            result = getattr(self, method)(message.get('params') or {})
+        except Exception as e:
+            if is_request:
+                self.write({'id': message['id'],
+                            'error': {'code': -32603, 'message': str(e)}})
+            return
+        if is_request:
+            self.write({'id': message['id'], 'result': result})
+
+    def initialize(self, params):
+        return {
+            'capabilities': {
+                # the full text is sent on every change
+                'textDocumentSync': 1,
+                'hoverProvider': True,
+                'completionProvider': {'triggerCharacters': [' ', '.']},
+            },
+            'serverInfo': {'name': 'storyscript'},
+        }
+
+    def shutdown(self, params):
+        return None
+
+    def exit(self, params):
+        self.running = False
+
+    def did_open(self, params):
+        item = params['textDocument']
+        with self.lock:
+            self.documents[item['uri']] = Document(
+                item['uri'], item['text'], version=item.get('version'),
+                features=self.features)
+            self.schedule(item['uri'], delay=0)
+
+    def did_change(self, params):
+        item = params['textDocument']
+        with self.lock:
+            document = self.documents[item['uri']]
+            document.update(params['contentChanges'][-1]['text'],
+                            version=item.get('version'))
+            self.schedule(item['uri'], delay=self.debounce)
+
+    def did_close(self, params):
+        uri = params['textDocument']['uri']
+        with self.lock:
+            self.documents.pop(uri, None)
+            self.pending.pop(uri, None)
+        self.notify('textDocument/publishDiagnostics',
+                    {'uri': uri, 'diagnostics': []})
+
+    def hover(self, params):
+        document = self.compiled(params['textDocument']['uri'])
+        position = params['position']
+        with self.lock:
+            text = document.hover(position['line'], position['character'])
+        if text is None:
+            return None
+        return {'contents': {'kind': 'plaintext', 'value': text}}
+
+    def completion(self, params):
+        document = self.compiled(params['textDocument']['uri'])
+        position = params['position']
+        with self.lock:
+            items = document.completions(position['line'],
+                                         position['character'])
+        return {'isIncomplete': False, 'items': items}
+
+    def schedule(self, uri, delay):
+        """
+        Compiles a document after `delay` seconds. Later changes postpone the
+        compilation.
+        """
+        with self.changed:
+            self.pending[uri] = time.monotonic() + delay
+            self.changed.notify()
+
+    def compiled(self, uri):
+        """
+        Returns a document and compiles it if it has changed since its last
+        compilation.
+        """
+        with self.lock:
+            document = self.documents[uri]
+            self.pending.pop(uri, None)
+            if document.dirty:
+                self.compile(document)
+            return document
+
+    def compile(self, document):
+        """
+        Compiles a document and publishes its diagnostics.
+        """
+        document.compile(ParserPool.instance().get())
+        self.publish(document)
+
+    def publish(self, document):
+        self.notify('textDocument/publishDiagnostics', {
+            'uri': document.uri,
+            'version': document.version,
+            'diagnostics': document.diagnostics(),
+        })
+
+    def due_drafts(self):
+        """
+        Waits until the debounce time of documents has passed and returns
+        drafts of them, or `None` once the server stops. The lock must be
+        held by the caller.
+        """
+        while self.running:
+            now = time.monotonic()
+            due = [uri for uri, at in self.pending.items() if at <= now]
+            if len(due) > 0:
+                drafts = []
+                for uri in due:
+                    del self.pending[uri]
+                    drafts.append(self.documents[uri].draft())
+                return drafts
+            if len(self.pending) > 0:
+                timeout = min(self.pending.values()) - now
+                self.changed.wait(max(timeout, 0))
+            else:
+                self.changed.wait()
+        return None
+
+    def compile_pending(self):
+        """
+        Compiles all documents whose debounce time has passed until the
+        server stops. Drafts of the documents are compiled without holding
+        the lock, s.t. changes and requests are handled in the meantime.
+        Compilations of outdated drafts are dropped.
+        """
+        while True:
+            with self.changed:
+                drafts = self.due_drafts()
+            if drafts is None:
+                return
+            for draft in drafts:
+                draft.compile(ParserPool.instance().get())
+                with self.lock:
+                    document = self.documents.get(draft.uri)
+                    if document is not None and document.accept(draft):
+                        self.publish(document)
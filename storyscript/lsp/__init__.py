@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+from .Document import Document
+from .LanguageServer import LanguageServer
+
+
+__all__ = ['Document', 'LanguageServer']
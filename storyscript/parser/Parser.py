@@ -1,23 +1,39 @@
 # -*- coding: utf-8 -*-
 import io
+from collections import namedtuple
+from copy import copy
 
 from lark import Lark
 from lark.exceptions import VisitError
+from lark.lark import LarkOptions
+
+try:
+    from lark.parsers.lalr_parser import _Parser as LalrParser
+except ImportError:  # pragma: no cover
+    LalrParser = None
 
 from .Grammar import Grammar
 from .Indenter import CustomIndenter
-from .Transformer import Transformer
+from .Transformer import Transformer, TransformerCallbacks
 from .Tree import Tree
 
 
+IncrementalState = namedtuple('IncrementalState', [
+    'lines', 'length', 'spans', 'allow_single_quotes'])
+
+
 class Parser:
     """
     Wraps up the parser submodule and exposes parsing and lexing
     functionalities.
     """
+    multi_line_markers = ('###', '"""')
+
     def __init__(self, algo='lalr', ebnf=None):
         self.algo = algo
         self.ebnf = ebnf
+        self.callbacks = TransformerCallbacks(
+            self.transformer(allow_single_quotes=False))
         self.lark = self._lark()
 
     @staticmethod
@@ -43,8 +59,63 @@ class Parser:
     def _lark(self):
         """
         Get the grammar and initialize Lark.
+        With LALR, the transformer is called inline while parsing, s.t. the
+        Storyscript tree is built directly.
         """
-        return Lark(self.grammar(), parser=self.algo, postlex=self.indenter())
+        kwargs = {}
+        if self.algo == 'lalr':
+            kwargs['transformer'] = self.callbacks
+        return Lark(self.grammar(), parser=self.algo, postlex=self.indenter(),
+                    **kwargs)
+
+    def clone(self):
+        """
+        Returns a parser which shares the analyzed grammar of this parser, but
+        keeps its own parsing state. Thus, clones of a parser can be used by
+        different threads at the same time.
+        """
+        parser = copy(self)
+        parser.callbacks = TransformerCallbacks(
+            self.transformer(allow_single_quotes=False))
+        if self.algo == 'lalr' and self._can_clone_lark():
+            parser.lark = self._clone_lark(parser.callbacks)
+        else:
+            parser.lark = parser._lark()
+        return parser
+
+    def _can_clone_lark(self):
+        """
+        Checks whether the Lark instance has the internals _clone_lark relies
+        on. They are private to lark-parser, so with other versions than the
+        one pinned in setup.py, clones build a new Lark instance instead.
+        """
+        frontend = getattr(self.lark, 'parser', None)
+        return LalrParser is not None and \
+            hasattr(self.lark, '_parse_tree_builder') and \
+            hasattr(getattr(frontend, 'parser', None), '_parse_table')
+
+    def _clone_lark(self, transformer):
+        """
+        Copies the Lark instance with new callbacks, a new indenter and a new
+        lexer state, but reuses its LALR parse table.
+        """
+        postlex = self.indenter()
+        lark = copy(self.lark)
+        lark.options = LarkOptions(dict(self.lark.options.options,
+                                        transformer=transformer,
+                                        postlex=postlex))
+        lark.lexer_conf = copy(lark.lexer_conf)
+        lark.lexer_conf.postlex = postlex
+        lark._callbacks = lark._parse_tree_builder.create_callback(transformer)
+        frontend = copy(lark.parser)
+        frontend.lexer_conf = lark.lexer_conf
+        frontend.postlex = postlex
+        frontend.lexer = copy(frontend.lexer)
+        frontend.parser = copy(frontend.parser)
+        frontend.parser.parser = LalrParser(frontend.parser._parse_table,
+                                            lark._callbacks)
+        lark.parser = frontend
+        return lark
 
     def parse(self, source, allow_single_quotes=False):
         """
@@ -53,15 +124,142 @@ class Parser:
         if source == '':
             return Tree('empty', [])
         source = '{}\n'.format(source)
-        lark = self.lark
-        tree = lark.parse(source)
         try:
-            result = self.transformer(allow_single_quotes).transform(tree)
+            if self.algo == 'lalr':
+                self.callbacks.reset(allow_single_quotes)
+                result = self.lark.parse(source)
+                self.callbacks.raise_error()
+            else:
+                tree = self.lark.parse(source)
+                transformer = self.transformer(allow_single_quotes)
+                result = transformer.transform(tree)
         except VisitError as e:
             raise e.orig_exc
         result.parser = self
         return result
 
+    def parse_incremental(self, source, previous=None,
+                          allow_single_quotes=False):
+        """
+        Parses the source string, reusing the top-level blocks of `previous`
+        (a tree returned by an earlier call) which are outside of the changed
+        lines. Only the damaged region is lexed and parsed again, the
+        resulting tree is identical to the tree of a full parse.
+        Reused blocks are shared with `previous`, hence the returned trees
+        must not be modified.
+        """
+        lines = source.split('\n')
+        state = None
+        if previous is not None:
+            state = previous.__dict__.get('_incremental')
+        if state is None or source == '' or \
+                state.allow_single_quotes != allow_single_quotes:
+            return self._parse_full(source, lines, allow_single_quotes)
+
+        if lines == state.lines:
+            return previous
+
+        old_lines, blocks, spans = state.lines, previous.children, state.spans
+        head, tail = self._reusable_blocks(old_lines, lines, spans)
+        line_offset = len(lines) - len(old_lines)
+        start = spans[head - 1][1] if head > 0 else 0
+        end = len(lines)
+        if tail < len(blocks):
+            end = spans[tail][0] - 1 + line_offset
+        middle = '\n'.join(lines[start:end])
+        children, new_spans = blocks[:head], spans[:head]
+        if any(marker in middle for marker in self.multi_line_markers):
+            # multi-line comments or strings could extend beyond the region
+            return self._parse_full(source, lines, allow_single_quotes)
+        if middle != '':
+            try:
+                tree = self.parse(middle, allow_single_quotes)
+            except Exception:
+                # errors are reported with the positions of a full parse
+                return self._parse_full(source, lines, allow_single_quotes)
+            pos = sum(len(line) + 1 for line in lines[:start])
+            for block in tree.children:
+                block = block.shifted_copy(start, pos)
+                children.append(block)
+                new_spans.append(block.line_range())
+
+        pos_offset = len(source) - state.length
+        for block, (first, last) in zip(blocks[tail:], spans[tail:]):
+            children.append(block.shifted_copy(line_offset, pos_offset))
+            new_spans.append((first + line_offset, last + line_offset))
+        return self._incremental_result(Tree('start', children), source,
+                                        lines, allow_single_quotes, new_spans)
+
+    @classmethod
+    def _reusable_blocks(cls, old_lines, lines, spans):
+        """
+        Finds the blocks before and after the changed lines which can be
+        reused. Returns the number of reused blocks at the beginning and the
+        index of the first reused block at the end.
+        """
+        common = min(len(old_lines), len(lines))
+        prefix = 0
+        while prefix < common and old_lines[prefix] == lines[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < common - prefix and \
+                old_lines[-1 - suffix] == lines[-1 - suffix]:
+            suffix += 1
+
+        # the blocks next to the damaged region are parsed again as well, as
+        # they could be continued by the changed lines (e.g. with `else`)
+        head = 0
+        while head < len(spans) and spans[head][1] <= prefix:
+            head += 1
+        head = max(head - 1, 0)
+        while head > 0 and not cls._separated(old_lines, spans, head):
+            head -= 1
+        tail = len(spans)
+        while tail > head and spans[tail - 1][0] > len(old_lines) - suffix:
+            tail -= 1
+        tail = min(tail + 1, len(spans))
+        while tail < len(spans) and not cls._separated(old_lines, spans, tail):
+            tail += 1
+        return head, tail
+
+    @staticmethod
+    def _separated(lines, spans, index):
+        """
+        Checks whether the block at `index` starts on a new, unindented line
+        and is only preceded by blank or comment lines. Other lines between
+        blocks belong to the preceding block and can only be parsed in its
+        context.
+        """
+        end, start = spans[index - 1][1], spans[index][0]
+        if end >= start or lines[start - 1][:1].isspace():
+            return False
+        for line in lines[end:start - 1]:
+            line = line.strip()
+            if line != '' and not line.startswith('#'):
+                return False
+        return True
+
+    def _parse_full(self, source, lines, allow_single_quotes):
+        result = self.parse(source, allow_single_quotes)
+        if result.data != 'start':
+            return result
+        spans = [block.line_range() for block in result.children]
+        return self._incremental_result(result, source, lines,
+                                        allow_single_quotes, spans)
+
+    def _incremental_result(self, result, source, lines, allow_single_quotes,
+                            spans):
+        """
+        Remembers the line spans of the top-level blocks of a tree for
+        subsequent incremental parses.
+        """
+        if None in spans:
+            return result
+        result.parser = self
+        result._incremental = IncrementalState(lines, len(source), spans,
+                                               allow_single_quotes)
+        return result
+
     def lex(self, source):
         """
         Lexes the source string
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+import threading
+
+from .Parser import Parser
+
+
+class ParserPool:
+    """
+    Thread-safe pool of parsers, keyed by their grammar.
+    Every grammar is only analyzed once. Each thread gets its own clone of a
+    parser, s.t. stories can be parsed concurrently.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.parsers = {}
+        self.local = threading.local()
+
+    def get(self, ebnf=None):
+        """
+        Returns the parser of the current thread for a grammar.
+        """
+        parsers = getattr(self.local, 'parsers', None)
+        if parsers is None:
+            parsers = {}
+            self.local.parsers = parsers
+        parser = parsers.get(ebnf)
+        if parser is None:
+            parser = self.prototype(ebnf).clone()
+            parsers[ebnf] = parser
+        return parser
+
+    def prototype(self, ebnf):
+        """
+        Returns the parser from which all parsers of a grammar are cloned.
+        """
+        with self.lock:
+            if ebnf not in self.parsers:
+                self.parsers[ebnf] = Parser(ebnf=ebnf)
+            return self.parsers[ebnf]
+
+    @staticmethod
+    def instance():
+        """
+        Returns the default parser pool.
+        """
+        return pool
+
+
+pool = ParserPool()
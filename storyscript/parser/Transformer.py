@@ -24,6 +24,12 @@ class Transformer(LarkTransformer):
         'static', 'none', 'await', 'service', 'in', 'has', 'not', 'is', 'inf',
         'nan', 'unknown', 'import'
     ]
+    # the error of each keyword, s.t. names are checked with a single lookup
+    keyword_errors = {
+        **{keyword: 'future_reserved_keyword'
+           for keyword in future_reserved_keywords},
+        **{keyword: 'reserved_keyword' for keyword in reserved_keywords},
+    }
     operator_assignments = {
         'ADD_EQUALS': {
             'name': 'PLUS',
@@ -55,13 +61,9 @@ class Transformer(LarkTransformer):
         keyword = token.value
         if keyword is None:
             return
-        if keyword in cls.reserved_keywords:
-            raise StorySyntaxError('reserved_keyword',
-                                   token=token,
-                                   format_args={'keyword': keyword})
-        if keyword in cls.future_reserved_keywords:
-            raise StorySyntaxError('future_reserved_keyword',
-                                   token=token,
+        error = cls.keyword_errors.get(keyword)
+        if error is not None:
+            raise StorySyntaxError(error, token=token,
                                    format_args={'keyword': keyword})
         if keyword.startswith('__'):
             raise StorySyntaxError('path_name_internal', token=token)
@@ -586,3 +588,44 @@ class Transformer(LarkTransformer):
 
     def __getattr__(self, attribute, *args):
         return lambda matches: Tree(attribute, matches)
+
+
+class TransformerCallbacks:
+    """
+    Exposes the rules of a Transformer as inline callbacks of the LALR
+    parser, s.t. the Storyscript tree is built while parsing.
+    The first error raised by a rule is deferred until the entire source has
+    been parsed. Thus, syntax errors take precedence like they did when
+    transforming a completely parsed tree.
+    """
+    def __init__(self, transformer):
+        self.transformer = transformer
+        self.error = None
+
+    def reset(self, allow_single_quotes):
+        """
+        Prepares the callbacks for parsing a new source.
+        """
+        self.transformer.allow_single_quotes = allow_single_quotes
+        self.error = None
+
+    def raise_error(self):
+        """
+        Raises the first error of a rule since the last reset, if any.
+        """
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def __getattr__(self, rule):
+        callback = getattr(self.transformer, rule)
+
+        def wrapped(matches):
+            if self.error is None:
+                try:
+                    return callback(matches)
+                except Exception as e:
+                    self.error = e
+            return Tree(rule, matches)
+
+        return wrapped
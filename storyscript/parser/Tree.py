@@ -3,6 +3,7 @@ from lark.lexer import Token
 from lark.tree import Tree as LarkTree
 
 from .Position import Position
+from ..FakeLine import FakeLine
 from ..exceptions import CompilerError
 
 
@@ -133,6 +134,76 @@ class Tree(LarkTree):
         end_column = self.end_column()
         return Position(line, column, end_column)
 
+    def line_range(self):
+        """
+        Returns the first and the last line covered by the tokens of a tree
+        or `None` if the tree has no positioned tokens.
+        """
+        first, last = None, None
+        for token in self.scan_values(lambda v: isinstance(v, Token)):
+            if token.line is None:
+                continue
+            line = self.source_line(token.line)
+            end_line = line
+            if token.end_line is not None:
+                end_line = self.source_line(token.end_line)
+            if first is None or line < first:
+                first = line
+            if last is None or end_line > last:
+                last = end_line
+        if first is None:
+            return None
+        return first, last
+
+    @staticmethod
+    def source_line(line):
+        """
+        Returns the line in the source of a line number, which can be a fake
+        line (e.g. '4.1') of a tree created while lowering.
+        """
+        if line.__class__ is int:
+            return line
+        if line.__class__ is FakeLine:
+            return line.line
+        return int(str(line).split('.')[0])
+
+    @staticmethod
+    def _shift(position, offset):
+        """
+        Moves a positional attribute by `offset` and keeps its type.
+        """
+        if position.__class__ is int:
+            return position + offset
+        if position is None:
+            return None
+        return str(int(position) + offset)
+
+    def shifted_copy(self, lines, pos):
+        """
+        Copies a tree and moves all of its positions by `lines` lines and by
+        `pos` characters in the stream.
+        """
+        shift = self._shift
+        tree = Tree.__new__(Tree)
+        tree.__dict__.update(self.__dict__)
+        if '_line' in self.__dict__:
+            tree._line = shift(self._line, lines)
+        children = []
+        for child in self.children:
+            if isinstance(child, Token):
+                token = Token.__new__(Token, child.type, str(child))
+                token.value = child.value
+                token.pos_in_stream = shift(child.pos_in_stream, pos)
+                token.line = shift(child.line, lines)
+                token.column = child.column
+                token.end_line = shift(child.end_line, lines)
+                token.end_column = child.end_column
+                children.append(token)
+            else:
+                children.append(child.shifted_copy(lines, pos))
+        tree.children = children
+        return tree
+
     def insert(self, item):
         """
         Inserts an item into the current tree.
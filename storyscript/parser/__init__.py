@@ -2,10 +2,11 @@ from .Ebnf import Ebnf
 from .Grammar import Grammar
 from .Indenter import CustomIndenter
 from .Parser import Parser
+from .ParserPool import ParserPool
 from .Position import Position
 from .Transformer import Transformer
 from .Tree import Tree
 
 
-__all__ = ['CustomIndenter', 'Ebnf', 'Grammar', 'Parser', 'Position',
-           'Transformer', 'Tree', ]
+__all__ = ['CustomIndenter', 'Ebnf', 'Grammar', 'Parser', 'ParserPool',
+           'Position', 'Transformer', 'Tree', ]
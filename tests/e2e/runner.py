@@ -13,7 +13,6 @@ from pytest import fixture, mark
 
 import storyscript.hub.Hub as StoryHub
 from storyscript.Api import Api
-from storyscript.App import _clean_dict
 
 from tests.e2e.utils.Features import parse_features
 from tests.e2e.utils.StoryscriptHubFixture import StoryscriptHubFixture
@@ -23,14 +22,14 @@ test_dir = path.dirname(path.realpath(__file__))
 test_files = list(map(lambda e: path.relpath(e, test_dir),
                   glob(path.join(test_dir, '**', '*.story'), recursive=True)))
 
-features = {'globals': True}
+features = {'globals': True, 'concise': True}
 
 
 # compile a story and compare its tree with the expected tree
 def run_test_story(source, expected_story, features):
     s = Api.loads(source, features)
     s.check_success()
-    result = _clean_dict(s.result().output())
+    result = s.result().output()
     del result['version']
     assert expected_story == result
 
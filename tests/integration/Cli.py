@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+import json
+import os
 from unittest import mock
 
 from click.testing import CliRunner
@@ -180,6 +182,20 @@ def test_cli_lex(open_mock, runner):
     assert e.exit_code == 0
 
 
+def test_cli_lex_json(open_mock, runner):
+    """
+    Ensures that the lexer command prints the tokens of the indenter as JSON
+    """
+    mock.mock_open(open_mock, read_data='if a\n  b')
+    e = runner.invoke(Cli.lex, ['--json', '/lex/path'])
+    tokens = [json.loads(line) for line in e.output.splitlines()]
+    assert [token['type'] for token in tokens] == \
+        ['_IF', 'NAME', '_NL', '_INDENT', 'NAME', '_DEDENT']
+    assert tokens[4] == {'story': '/lex/path', 'type': 'NAME', 'value': 'b',
+                         'line': 2, 'column': 3}
+    assert e.exit_code == 0
+
+
 def test_cli_format(open_mock):
     """
     Ensures that compiler calls format properly
@@ -241,3 +257,51 @@ def test_cli_format_inplace(inplace_argument):
         with open('a.story', 'r') as f:
             story = f.read()
         assert story == 'a = 1'
+
+
+def test_cli_format_inplace_unchanged():
+    """
+    Ensures that in-place format doesn't write formatted stories.
+    """
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        with open('a.story', 'w') as f:
+            f.write('a = 1')
+        os.utime('a.story', (1, 1))
+        e = runner.invoke(Cli.format, ['-i', 'a.story'])
+        assert e.exit_code == 0
+        assert os.stat('a.story').st_mtime == 1
+
+
+def test_cli_format_directory():
+    """
+    Ensures that all stories of a directory can be checked and formatted
+    in parallel.
+    """
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        os.mkdir('sub')
+        stories = {'a.story': 'a=1', 'b.story': 'b = 1',
+                   'sub/c.story': 'if c==1\n  d=2'}
+        for path, source in stories.items():
+            with open(path, 'w') as f:
+                f.write(source)
+        args = ['.', '--jobs', '2', '--cache', 'cache']
+        e = runner.invoke(Cli.format, ['--check'] + args)
+        assert e.exit_code == 1
+        assert sorted(e.output.splitlines()) == [
+            '2 of 3 stories need reformatting',
+            'a.story needs reformatting',
+            'sub/c.story needs reformatting',
+        ]
+
+        e = runner.invoke(Cli.format, ['-i'] + args)
+        assert e.exit_code == 0
+        with open('sub/c.story') as f:
+            assert f.read() == 'if c == 1\n  d = 2'
+
+        e = runner.invoke(Cli.format, ['--check'] + args)
+        assert e.exit_code == 0
+        assert e.output == ''
+        with open('cache') as f:
+            assert len(json.load(f)['formatted']) == 3
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+import os
+
+from storyscript.Watcher import Watcher
+
+
+def write(tmpdir, name, source, mtime):
+    path = tmpdir.join(name)
+    path.write(source)
+    os.utime(str(path), ns=(mtime, mtime))
+
+
+def test_watcher_recompiles_changes(tmpdir, monkeypatch):
+    """
+    Ensures that only changed and added stories are compiled again and that
+    deleted stories are removed from the bundle.
+    """
+    monkeypatch.chdir(tmpdir)
+    write(tmpdir, 'a.story', 'a = 1', 1)
+    write(tmpdir, 'b.story', 'b = 2', 1)
+    watcher = Watcher('.')
+    cycle = watcher.compile()
+    assert sorted(cycle.changed) == ['a.story', 'b.story']
+    assert cycle.errors == []
+    assert watcher.compile() is None
+    b = watcher.bundle.stories['b.story']
+
+    write(tmpdir, 'a.story', 'a = 3', 2)
+    cycle = watcher.compile()
+    assert cycle.changed == ['a.story']
+    assert watcher.bundle.stories['b.story'] is b
+    tree = watcher.bundle.stories['a.story']['tree']
+    assert tree['1']['args'][0] == {'$OBJECT': 'int', 'int': 3}
+
+    tmpdir.join('b.story').remove()
+    write(tmpdir, 'c.story', 'c = ', 2)
+    cycle = watcher.compile()
+    assert cycle.changed == ['c.story']
+    assert cycle.deleted == ['b.story']
+    assert len(cycle.errors) == 1
+    assert list(watcher.bundle.stories) == ['a.story']
+
+    write(tmpdir, 'c.story', 'c = 4', 3)
+    cycle = watcher.compile()
+    assert cycle.errors == []
+    result = watcher.result()
+    assert sorted(result['stories']) == ['a.story', 'c.story']
+    assert result['entrypoint'] == list(watcher.mtimes)
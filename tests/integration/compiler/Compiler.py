@@ -120,3 +120,47 @@ def test_compiler_int_mutation_arguments(mocker):
                        'arg': {'$OBJECT': 'int', 'int': 2}}]
         }
     ]
+
+
+def test_compiler_source_map():
+    """
+    Ensures the source map maps compiled lines to their source, including
+    the fake lines of string templates and multi-line statements
+    """
+    source = ('b = 1\n'
+              'a = "x{b + 1}"\n'
+              'function fun a: string b: string returns string\n'
+              '    return a\n'
+              'fun(a: ""\n'
+              '    b: ""\n'
+              ')\n')
+    result = Api.loads(source, features={'source_map': True})
+    result.check_success()
+    result = result.result().output()
+    assert result['source_map'] == {
+        '1': [1, 1, 1, 6],
+        '2.1': [2, 8, 2, 13],
+        '2': [2, 1, 2, 15],
+        '3': [3, 1, 3, 48],
+        '4': [4, 5, 4, 13],
+        '5.1': [5, 1, 6, 10],
+        '5': [5, 1, 6, 10],
+    }
+
+
+def test_compiler_source_map_templates():
+    """
+    Ensures string templates are mapped to their code in the string
+    """
+    source = ('a = 1\n'
+              'b = "xxxx {a + 2} { a * 3 }"\n')
+    result = Api.loads(source, features={'source_map': True})
+    result.check_success()
+    source_map = result.result().output()['source_map']
+    assert source_map['2.1'] == [2, 12, 2, 17]
+    assert source_map['2.2'] == [2, 21, 2, 26]
+
+
+def test_compiler_source_map_disabled():
+    result = Api.loads('a = 1').result().output()
+    assert 'source_map' not in result
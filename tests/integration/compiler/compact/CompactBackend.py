@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+import json
+
+from pytest import mark
+
+from storyscript.Api import Api
+from storyscript.compiler.compact import CompactBackend
+
+
+@mark.parametrize('source', [
+    'a = 1 + 2\nb = [a, "x", {"k": a}]',
+    'a = "abc"\nif a == "x"\n    b = a[0:2]\nelse\n    b = "y"',
+    'a = /x/g\nb = "{a}" as string\nc = 1h',
+    'function f x:int returns int\n    return x\nf(x: 1)',
+    'while true\n    a = 1.5\n    break',
+    'a = [1, 2]\nforeach a as b\n    c = b * 2\n    d = {"k": c}',
+])
+def test_compact_backend_round_trip(source):
+    """
+    Ensures the compact output holds the same story as the JSON output.
+    """
+    expected = Api.loads(source).result().output()
+    compact = Api.loads(source, {'backend': 'compact'}).result().output()
+    packed = json.loads(json.dumps(compact))
+    assert CompactBackend.unpack(packed) == expected
+    assert len(json.dumps(compact)) < len(json.dumps(expected))
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+from pytest import mark
+
+from storyscript.Api import Api
+
+
+def compile_args(source, optimize=1, line='1'):
+    # reads `a`, s.t. it isn't eliminated
+    source = f'{source}\nf(x: a)\nfunction f x:any\n    return'
+    result = Api.loads(source, features={'optimize': optimize}).result()
+    return result.output()['tree'][line]['args']
+
+
+@mark.parametrize('source,expected', [
+    ('a = 1 + 2 * 3', {'$OBJECT': 'int', 'int': 7}),
+    ('a = 1 - 2.5', {'$OBJECT': 'float', 'float': -1.5}),
+    ('a = 2 > 1', {'$OBJECT': 'boolean', 'boolean': True}),
+    ('a = not (1 == 1)', {'$OBJECT': 'boolean', 'boolean': False}),
+    ('a = 1h + 30m', {'$OBJECT': 'time', 'ms': 5400000}),
+    ('a = "x" + "y\\n" + "z"', {'$OBJECT': 'string', 'string': 'xy\nz'}),
+])
+def test_constant_folding_expressions(source, expected):
+    assert compile_args(source) == [expected]
+
+
+def test_constant_folding_template():
+    args = compile_args('b = 0\na = "{b}" + "c" + "d"', line='2')
+    assert args[0]['values'][-1] == {'$OBJECT': 'string', 'string': 'cd'}
+
+
+@mark.parametrize('source', [
+    'a = 7 / 2',
+    'a = 2 ^ 3',
+    'a = 7 % 2',
+])
+def test_constant_folding_runtime_operators(source):
+    assert compile_args(source) == compile_args(source, optimize=0)
+
+
+def test_constant_folding_eliminated():
+    result = Api.loads('a = 1 + 2', features={'optimize': 1}).result()
+    assert result.eliminated() > 0
+    result = Api.loads('a = 1 + 2').result()
+    assert result.eliminated() == 0
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+from storyscript.Api import Api
+
+
+def compile_tree(source, optimize=1):
+    result = Api.loads(source, features={'optimize': optimize}).result()
+    return result.output()['tree']
+
+
+def test_dead_code_elimination_unreachable():
+    tree = compile_tree('while true\n    break\n    a = 1\nb = 0')
+    assert list(tree) == ['1', '2']
+    assert tree['1']['enter'] == '2'
+    assert tree['1'].get('next') is None
+    assert tree['1'].get('exit') is None
+
+
+def test_dead_code_elimination_unused_assignments():
+    source = 'a = 1\nb = a + 1\nc = b\nd = 2\nf(x: d)\n' \
+             'function f x:int\n    return'
+    tree = compile_tree(source)
+    assert list(tree) == ['4', '5.1', '5', '6', '7']
+    assert tree['4']['next'] == '5.1'
+
+
+def test_dead_code_elimination_keeps_effects():
+    source = 'a = 10 / 2\nb = f(x: 1)\nfunction f x:int returns int\n' \
+             '    return x'
+    tree = compile_tree(source)
+    assert tree['1']['name'] == ['a']
+    assert tree['2.1']['method'] == 'call'
+    assert '2' not in tree
+
+
+def test_dead_code_elimination_templates():
+    source = 'a = 1\nb = "{a + 1}"\nwhile b == ""\n    break'
+    tree = compile_tree(source)
+    assert list(tree) == ['1', '2', '3', '4']
+    assert tree['2']['args'] == [{
+        '$OBJECT': 'type_cast',
+        'type': {'$OBJECT': 'type', 'type': 'string'},
+        'value': {'$OBJECT': 'expression', 'expression': 'sum',
+                  'values': [{'$OBJECT': 'path', 'paths': ['a']},
+                             {'$OBJECT': 'int', 'int': 1}]}
+    }]
+    assert tree['1']['next'] == '2'
+
+
+def test_dead_code_elimination_nested_block():
+    tree = compile_tree('if true\n    a = 1\nb = 0')
+    assert list(tree) == ['1', '2']
+    assert tree['1']['enter'] == '2'
+
+
+def test_dead_code_elimination_errors():
+    result = Api.loads('while true\n    break\n    a = 1s1s',
+                       features={'optimize': 1})
+    assert result.errors()[0].error.error == 'time_value_duplicate'
+
+
+def test_dead_code_elimination_disabled():
+    assert list(compile_tree('a = 1\nb = 2', optimize=0)) == ['1', '2']
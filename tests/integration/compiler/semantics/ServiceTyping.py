@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+from pytest import mark
+
+from storyscript.Story import Story
+from storyscript.compiler.semantics.ServiceTyping import ServiceTyping
+
+
+@mark.parametrize('source,names', [
+    ('x = 0', set()),
+    ('a = yaml parse data: "a"\nslack bot', {'yaml', 'slack'}),
+    ('http server as client\n    client write content: "a"', {'http'}),
+    ('twitter stream\n    when tweet as t\n        x = 0', {'twitter'}),
+    ('twitter stream as s\n    when s tweet\n        x = 0', {'twitter'}),
+    ('when http server listen path: "/"\n    x = 0', {'http'}),
+    ('x = "{yaml parse data: y}"', set()),
+])
+def test_service_typing_service_names(source, names):
+    """
+    Ensures only services are found, not their outputs and events. Services
+    of string templates are fetched when they are compiled.
+    """
+    tree = Story(source, features=None).parse(parser=None).tree
+    assert ServiceTyping.service_names(tree) == names
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+from storyscript.Story import _parser
+from storyscript.lsp import Document
+
+
+source = """a = 1
+b = [a, 2]
+foreach b as x
+    c = x + a
+
+function f y:int returns int
+    return y
+z = f(y: 1)
+"""
+
+
+def compiled(source):
+    document = Document('uri', source)
+    document.compile(_parser())
+    return document
+
+
+def labels(items):
+    return [item['label'] for item in items]
+
+
+def test_document_hover():
+    document = compiled(source)
+    assert document.error is None
+    assert document.hover(1, 0) == 'b: List[int]'
+    assert document.hover(3, 8) == 'x: int'
+    assert document.hover(7, 4) == 'function f(y:`int`) returns int'
+    assert document.hover(1, 4) is None
+
+
+def test_document_completions():
+    document = compiled(source)
+    items = document.completions(4, 4)
+    assert labels(items)[:6] == ['a', 'app', 'b', 'c', 'x', 'z']
+    assert items[0] == {'label': 'a', 'kind': 6, 'detail': 'int'}
+    assert {'label': 'f', 'kind': 3} in items
+    assert labels(document.completions(0, 0))[:4] == ['a', 'app', 'b', 'z']
+    assert labels(document.completions(7, 5)) == \
+        ['f', 'false', 'finally', 'foreach', 'function']
+
+
+def test_document_diagnostics():
+    document = compiled(source + 'd = a + "b"\n')
+    diagnostics = document.diagnostics()
+    assert len(diagnostics) == 1
+    assert diagnostics[0]['range']['start']['line'] == 8
+    assert diagnostics[0]['message'].startswith('E0')
+
+
+def test_document_syntax_error():
+    document = compiled('a = (1\n')
+    diagnostics = document.diagnostics()
+    assert diagnostics[0]['range']['start'] == {'line': 0, 'character': 6}
+    assert diagnostics[0]['message'].startswith('E0')
+
+
+def test_document_recompile():
+    """
+    Ensures that changed documents are parsed incrementally and keep the
+    state of the last successful compilation on errors.
+    """
+    document = compiled(source)
+    tree, lowered = document.tree, document.lowered
+    document.update(source + 'd = (\n')
+    document.compile(_parser())
+    assert document.error is not None
+    assert document.lowered is lowered
+    document.update(source + 'd = 2\n')
+    document.compile(_parser())
+    assert document.error is None
+    assert document.tree.children[0] is tree.children[0]
+    assert document.hover(8, 0) == 'd: int'
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+
+from storyscript.lsp import LanguageServer
+
+
+def frame(message):
+    body = json.dumps(message).encode('utf-8')
+    return b'Content-Length: %d\r\n\r\n' % len(body) + body
+
+
+def session(*messages):
+    """
+    Runs a language server on messages and returns its responses
+    """
+    reader = io.BytesIO(b''.join(frame(message) for message in messages))
+    server = LanguageServer(reader, io.BytesIO(), debounce=0)
+    server.serve()
+    server.writer.seek(0)
+    # the responses are read with the framing of the server
+    reader = LanguageServer(server.writer, None)
+    responses = []
+    while True:
+        response = reader.read()
+        if response is None:
+            return responses
+        responses.append(response)
+
+
+def document(uri, text, version=1):
+    return {'uri': uri, 'text': text, 'version': version}
+
+
+def test_language_server_session():
+    responses = session(
+        {'id': 1, 'method': 'initialize', 'params': {}},
+        {'method': 'textDocument/didOpen',
+         'params': {'textDocument': document('a', 'a = 1\nb = a')}},
+        {'id': 2, 'method': 'textDocument/hover',
+         'params': {'textDocument': {'uri': 'a'},
+                    'position': {'line': 1, 'character': 0}}},
+        {'method': 'textDocument/didChange',
+         'params': {'textDocument': {'uri': 'a', 'version': 2},
+                    'contentChanges': [{'text': 'a = 1\nb = a + "c"'}]}},
+        {'id': 3, 'method': 'textDocument/completion',
+         'params': {'textDocument': {'uri': 'a'},
+                    'position': {'line': 1, 'character': 5}}},
+        {'id': 4, 'method': 'shutdown'},
+        {'method': 'exit'},
+    )
+    results = {r['id']: r['result'] for r in responses if 'id' in r}
+    assert results[1]['capabilities']['hoverProvider'] is True
+    assert results[2]['contents']['value'] == 'b: int'
+    assert [item['label'] for item in results[3]['items']][:3] == \
+        ['a', 'app', 'and']
+    assert results[4] is None
+    diagnostics = [r['params'] for r in responses
+                   if r.get('method') == 'textDocument/publishDiagnostics']
+    assert diagnostics[0] == {'uri': 'a', 'version': 1, 'diagnostics': []}
+    assert diagnostics[-1]['version'] == 2
+    assert len(diagnostics[-1]['diagnostics']) == 1
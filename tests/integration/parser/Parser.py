@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 from lark.lexer import Token
 
-from pytest import mark
+from pytest import mark, raises
 
 from storyscript.Story import _parser
 from storyscript.compiler.lowering.Lowering import Lowering
@@ -268,3 +268,72 @@ def test_parser_string_double_quoted():
     ar_exp = arith_exp(result)
     lhs = get_entity(ar_exp).values.string.child(0)
     assert lhs == r'"b\n.\\.\".c"'
+
+
+def positions(tree):
+    """
+    Returns the positions of all tokens of a tree
+    """
+    return [(t.type, t.value, t.pos_in_stream, t.line, t.column, t.end_line,
+             t.end_column)
+            for t in tree.scan_values(lambda v: isinstance(v, Token))]
+
+
+incremental_story = """a = 1
+if a > 0
+    b = "x"
+else
+    b = [1, 2]
+# comment
+foreach [1, 2] as i
+    c = i + 1
+
+d = {"k": 1}
+"""
+
+
+@mark.parametrize('old,new', [
+    ('a = 1', 'a = 12'),
+    ('a = 1', 'a = 1\nx = 2'),
+    ('a = 1\n', ''),
+    ('b = "x"', 'b = "xy"'),
+    ('    b = [1, 2]\n', '    b = [1, 2]\n    e = 3\n'),
+    ('if a > 0', 'x = 1\nif a > 1'),
+    ('# comment', 'e = 2'),
+    ('\nd = {"k": 1}', '\n    d = 1'),
+    ('\nd = {"k": 1}', ''),
+    ('d = {"k": 1}\n', 'd = 2\n\n\n###\ncomment\n###\n'),
+])
+def test_parser_parse_incremental(old, new):
+    """
+    Ensures that incremental parses are identical to full parses.
+    """
+    parser = _parser()
+    previous = parser.parse_incremental(incremental_story)
+    source = incremental_story.replace(old, new, 1)
+    tree = parser.parse_incremental(source, previous)
+    expected = parser.parse(source)
+    assert tree == expected
+    assert positions(tree) == positions(expected)
+    assert parser.parse_incremental(incremental_story, tree) == previous
+
+
+def test_parser_parse_incremental_reuse():
+    parser = _parser()
+    previous = parser.parse_incremental(incremental_story)
+    source = incremental_story.replace('c = i + 1', 'c = i + 2')
+    tree = parser.parse_incremental(source, previous)
+    assert tree.children[0] is previous.children[0]
+    assert tree.children[1] is not previous.children[1]
+    assert tree.children[3] == previous.children[3]
+
+
+def test_parser_parse_incremental_error():
+    parser = _parser()
+    previous = parser.parse_incremental(incremental_story)
+    source = incremental_story.replace('c = i + 1', 'c = (i + 1')
+    with raises(Exception) as e:
+        parser.parse(source)
+    with raises(type(e.value)) as incremental_error:
+        parser.parse_incremental(source, previous)
+    assert str(incremental_error.value) == str(e.value)
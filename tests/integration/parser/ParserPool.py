@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+from concurrent.futures import ThreadPoolExecutor
+
+from storyscript.Story import _parser
+from storyscript.parser import ParserPool
+
+
+sources = [
+    'a = 1\nb = "{a}"\n',
+    'foreach items as item\n    x = (item + 1) * 2\n',
+    'function f a:int returns int\n    return a\nf(a: 1)\n',
+    'if a == 1\n    b = 2\nelse\n    c = [1, 2, 3]\n',
+]
+
+
+def test_parser_clone():
+    parser = _parser()
+    clone = parser.clone()
+    assert clone.lark is not parser.lark
+    assert clone.lark.parser.parser._parse_table is \
+        parser.lark.parser.parser._parse_table
+    for source in sources:
+        assert clone.parse(source) == parser.parse(source)
+
+
+def test_parser_pool_concurrent():
+    """
+    Ensures that stories can be parsed concurrently.
+    """
+    expected = [_parser().parse(source) for source in sources]
+    parser_pool = ParserPool()
+
+    def parse(i):
+        source = sources[i % len(sources)]
+        return parser_pool.get().parse(source, allow_single_quotes=i % 2)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(parse, range(200)))
+    for i, result in enumerate(results):
+        assert result == expected[i % len(sources)]
+
+
+def test_parser_clone_without_lark_internals(monkeypatch):
+    """
+    Ensures a new Lark instance is built when lark's internals changed.
+    """
+    parser = _parser()
+    monkeypatch.delattr(parser.lark, '_parse_tree_builder')
+    clone = parser.clone()
+    assert clone.lark.parser.parser._parse_table is not \
+        parser.lark.parser.parser._parse_table
+    for source in sources:
+        assert clone.parse(source) == parser.parse(source)
@@ -36,7 +36,8 @@ def test_api_load(patch, magic):
     assert isinstance(Story.from_stream.call_args[0][1], Features)
     Story.from_stream().process.assert_called()
     story = Story.from_stream().process()
-    assert result == {stream.name: story, 'services': story['services']}
+    assert result == {stream.name: story,
+                      'services': story.get('services', [])}
 
 
 def test_api_load_map(patch, magic):
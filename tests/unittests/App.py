@@ -3,10 +3,11 @@ import json
 
 from pytest import fixture, raises
 
-import storyscript.App as AppModule
 from storyscript.App import App
 from storyscript.Bundle import Bundle
+from storyscript.Formatter import Formatter
 from storyscript.exceptions import StoryError
+from storyscript.hub.Hub import HubSnapshot
 from storyscript.parser import Grammar
 
 
@@ -66,18 +67,61 @@ def test_app_compile(patch, bundle):
     assert result == json.dumps()
 
 
+def test_app_compile_backend(patch, bundle):
+    patch.object(json, 'dumps')
+    App.compile('path', features={'backend': 'compact'})
+    json.dumps.assert_called_with(Bundle.from_path().bundle(), indent=None)
+
+
+def test_app_compile_backend_unknown(patch, bundle):
+    with raises(StoryError) as e:
+        App.compile('path', features={'backend': 'foo'})
+    assert e.value.message() == \
+        'E0079: Unknown backend `foo`. Available: compact, json.'
+    assert Bundle.from_path().bundle.call_count == 0
+
+
+def test_app_hub_snapshot(patch, bundle):
+    patch.object(HubSnapshot, 'write')
+    result = App.hub_snapshot('path', 'hub.json', ebnf='ebnf')
+    Bundle.from_path.assert_called_with('path', ignored_path=None,
+                                        features=None)
+    Bundle.from_path().bundle.assert_called_with(ebnf='ebnf')
+    services = Bundle.from_path().bundle().get('services', [])
+    HubSnapshot.write.assert_called_with('hub.json', services)
+    assert result == services
+
+
+def test_app_hub_snapshot_concise(patch, bundle):
+    """
+    Ensures concise bundles without services can be snapshotted
+    """
+    patch.object(HubSnapshot, 'write')
+    Bundle.from_path().bundle.return_value = {'stories': {'a.story': {}}}
+    result = App.hub_snapshot('path', 'hub.json',
+                              features={'concise': True})
+    HubSnapshot.write.assert_called_with('hub.json', [])
+    assert result == []
+
+
 def test_app_compile_concise(patch, bundle):
     patch.object(json, 'dumps')
-    patch.object(AppModule, '_clean_dict')
     result = App.compile('path', concise=True)
     Bundle.from_path.assert_called_with('path', ignored_path=None,
-                                        features=None)
+                                        features={'concise': True})
     Bundle.from_path().bundle.assert_called_with(ebnf=None)
-    AppModule._clean_dict.assert_called_with(Bundle.from_path().bundle())
-    json.dumps.assert_called_with(AppModule._clean_dict(), indent=2)
+    json.dumps.assert_called_with(Bundle.from_path().bundle(), indent=2)
     assert result == json.dumps()
 
 
+def test_app_concise():
+    assert App.concise(None, False) is None
+    assert App.concise({'globals': True}, False) == {'globals': True}
+    assert App.concise(None, True) == {'concise': True}
+    assert App.concise({'globals': True}, True) == {'globals': True,
+                                                    'concise': True}
+
+
 def test_app_compile_ignored_path(patch, bundle):
     patch.object(json, 'dumps')
     App.compile('path', ignored_path='ignored')
@@ -144,15 +188,27 @@ def test_app_grammar(patch):
     assert App.grammar() == Grammar().build()
 
 
-def test_app_clean_dict():
-    assert AppModule._clean_dict(0) == 0
-    assert AppModule._clean_dict('a') == 'a'
-    assert AppModule._clean_dict('') == ''
-    assert AppModule._clean_dict(True) is True
-    assert AppModule._clean_dict(False) is False
-    assert AppModule._clean_dict([0]) == [0]
-    assert AppModule._clean_dict([]) == []
-    assert AppModule._clean_dict({}) == {}
-    assert AppModule._clean_dict({'a': False}) == {}
-    assert AppModule._clean_dict({'a': None}) == {}
-    assert AppModule._clean_dict({'a': None, 'b': 1}) == {'b': 1}
+def test_app_dumps(patch):
+    patch.object(json, 'dumps')
+    result = App.dumps({'stories': {}})
+    json.dumps.assert_called_with({'stories': {}}, indent=2)
+    assert result == json.dumps()
+
+
+def test_app_dumps_first(patch):
+    patch.object(json, 'dumps')
+    App.dumps({'stories': {'my_story': 42}}, first=True)
+    json.dumps.assert_called_with(42, indent=2)
+
+
+def test_app_format_paths(patch):
+    patch.init(Formatter)
+    patch.many(Formatter, ['format', 'paths', 'save'])
+    result = App.format_paths('path', ignored_path='ignored', jobs=2,
+                              cache='cache')
+    Formatter.__init__.assert_called_with(ebnf=None, features=None, jobs=2,
+                                          cache='cache')
+    Formatter.paths.assert_called_with('path', ignored_path='ignored')
+    Formatter.format.assert_called_with(Formatter.paths())
+    Formatter.save.assert_called()
+    assert result == Formatter.format()
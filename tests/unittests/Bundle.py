@@ -8,7 +8,8 @@ from pytest import fixture
 from storyscript.Bundle import Bundle
 from storyscript.Features import Features
 from storyscript.Story import Story
-from storyscript.parser import Parser
+from storyscript.compiler.semantics.ServiceTyping import ServiceTyping
+from storyscript.parser import Parser, ParserPool
 
 
 @fixture
@@ -19,6 +20,7 @@ def bundle(patch):
 def test_bundle_init(bundle):
     assert bundle.stories == {}
     assert bundle.story_files == {}
+    assert bundle.service_data == {}
 
 
 def test_bundle_init_files():
@@ -190,6 +192,15 @@ def test_bundle_load_story_not_read(patch, bundle):
     assert bundle.story_files['one.story'] == Story.read()
 
 
+def test_bundle_remove_story(bundle):
+    bundle.story_files = {'one.story': 'a', 'two.story': 'b'}
+    bundle.stories = {'one.story': {}}
+    bundle.remove_story('one.story')
+    bundle.remove_story('three.story')
+    assert bundle.story_files == {'two.story': 'b'}
+    assert bundle.stories == {}
+
+
 def test_bundle_find_stories(patch, bundle):
     """
     Ensures Bundle.find_stories returns the list of loaded stories
@@ -210,6 +221,14 @@ def test_bundle_services_no_duplicates(bundle):
     assert result == ['one']
 
 
+def test_bundle_services_concise(bundle):
+    """
+    Ensures concise stories without services are supported
+    """
+    bundle.stories = {'a': {'services': ['one']}, 'b': {}}
+    assert bundle.services() == ['one']
+
+
 def test_bundle_parse(patch, bundle):
     parse = bundle.parse
     patch.many(Bundle, ['parse', 'load_story'])
@@ -221,17 +240,72 @@ def test_bundle_parse(patch, bundle):
 
 def test_bundle_compile(mocker, patch, bundle):
     compile = bundle.compile
-    patch.many(Bundle, ['compile', 'load_story'])
+    patch.many(Bundle, ['compile', 'load_story', 'prefetch'])
     patch.many(Story, ['parse'])
 
     compile(['one.story'], parser=None)
     Bundle.load_story.assert_called_with('one.story')
 
     story = Bundle.load_story()
-    story.compile.assert_called()
+    story.parse.assert_called_with(parser=None)
+    story.compile.assert_called_with(services=Bundle.prefetch())
     assert bundle.stories['one.story'] == story.compiled.output()
 
 
+def test_bundle_compile_prefetch(patch, magic, bundle):
+    stories = {'one.story': magic(), 'two.story': magic()}
+    patch.object(Bundle, 'load_story', side_effect=stories.get)
+    trees = []
+    patch.object(Bundle, 'prefetch', side_effect=lambda t: trees.extend(t))
+    bundle.compile(['one.story', 'two.story'], parser=None)
+    assert trees == [stories['one.story'].tree, stories['two.story'].tree]
+    assert list(bundle.stories) == ['one.story', 'two.story']
+
+
+def test_bundle_prefetch(patch, bundle):
+    names = {'one': {'http'}, 'two': {'http', 'slack'}}
+    patch.object(ServiceTyping, 'service_names', side_effect=names.get)
+    data = {'http': 'http data', 'slack': 'slack data'}
+    patch.object(ServiceTyping, 'prefetch', return_value=data)
+    result = bundle.prefetch(['one', 'two'])
+    ServiceTyping.prefetch.assert_called_with({'http', 'slack'},
+                                              snapshot=None)
+    assert result == data
+
+
+def test_bundle_prefetch_cached(patch, bundle):
+    """
+    Ensures found services aren't fetched again, while unknown services are
+    """
+    names = {'one': {'http', 'foo'}, 'two': {'http', 'foo', 'slack'}}
+    patch.object(ServiceTyping, 'service_names', side_effect=names.get)
+    patch.object(ServiceTyping, 'prefetch',
+                 return_value={'http': 'http data', 'foo': None})
+    bundle.prefetch(['one'])
+    ServiceTyping.prefetch.return_value = {'foo': None,
+                                           'slack': 'slack data'}
+    result = bundle.prefetch(['two'])
+    ServiceTyping.prefetch.assert_called_with({'foo', 'slack'},
+                                              snapshot=None)
+    assert result == {'http': 'http data', 'foo': None,
+                      'slack': 'slack data'}
+    assert bundle.service_data == {'http': 'http data',
+                                   'slack': 'slack data'}
+
+
+def test_bundle_prefetch_snapshot(patch):
+    patch.object(ServiceTyping, 'service_names', return_value={'http'})
+    patch.object(ServiceTyping, 'prefetch', return_value={})
+    Bundle(features={'hub_snapshot': 'hub.json'}).prefetch(['one'])
+    ServiceTyping.prefetch.assert_called_with({'http'}, snapshot='hub.json')
+
+
+def test_bundle_prefetch_nothing(patch, bundle):
+    patch.object(ServiceTyping, 'prefetch')
+    assert bundle.prefetch([]) == {}
+    ServiceTyping.prefetch.assert_not_called()
+
+
 def test_bundle_bundle(patch, bundle):
     patch.many(Bundle, ['find_stories', 'services', 'compile', 'parser'])
     result = bundle.bundle()
@@ -243,6 +317,21 @@ def test_bundle_bundle(patch, bundle):
     assert result == expected
 
 
+def test_bundle_result(patch, bundle):
+    patch.object(Bundle, 'services')
+    result = bundle.result(['one.story'])
+    expected = {'stories': bundle.stories, 'services': Bundle.services(),
+                'entrypoint': ['one.story']}
+    assert result == expected
+
+
+def test_bundle_result_concise(patch, bundle):
+    patch.object(Bundle, 'services', return_value=[])
+    bundle.features = Features({'concise': True})
+    result = bundle.result(['one.story'])
+    assert result == {'entrypoint': ['one.story']}
+
+
 def test_bundle_bundle_ebnf(patch, bundle):
     patch.many(Bundle, ['find_stories', 'services', 'compile', 'parser'])
     bundle.bundle(ebnf='ebnf')
@@ -274,26 +363,42 @@ def test_bundle_lex(patch, bundle):
     """
     Ensures Bundle.lex can lex a bundle
     """
-    patch.object(Story, 'from_file')
+    patch.object(Bundle, 'load_story')
     patch.object(Bundle, 'find_stories', return_value=['story'])
     patch.object(Bundle, 'parser')
     result = bundle.lex()
-    Story.from_file.assert_called_with('story', features=bundle.features)
+    assert Bundle.load_story.call_count == 0
+    result = list(result)
+    story = Bundle.load_story.return_value
+    Bundle.load_story.assert_called_with('story')
     Bundle.parser.assert_called_with(None)
-    Story.from_file().lex.assert_called_with(parser=Bundle.parser())
-    assert result['story'] == Story.from_file().lex()
+    story.lex.assert_called_with(parser=Bundle.parser())
+    assert result == [('story', story.lex())]
 
 
 def test_bundle_lex_ebnf(patch, bundle):
     """
     Ensures Bundle.lex supports specifying an ebnf file
     """
-    patch.object(Story, 'from_file')
+    patch.object(Bundle, 'load_story')
     patch.object(Bundle, 'find_stories', return_value=['story'])
     patch.object(Bundle, 'parser')
-    bundle.lex(ebnf='ebnf')
+    list(bundle.lex(ebnf='ebnf'))
     Bundle.parser.assert_called_with('ebnf')
-    Story.from_file().lex.assert_called_with(parser=Bundle.parser())
+
+
+def test_bundle_lex_loaded_story(patch):
+    """
+    Ensures Bundle.lex reuses the loaded stories, including the tokens of
+    the indenter
+    """
+    patch.object(Story, 'read')
+    bundle = Bundle(story_files={'one.story': 'if a\n  b'})
+    (story, tokens), = bundle.lex()
+    types = [token.type for token in tokens]
+    assert Story.read.call_count == 0
+    assert story == 'one.story'
+    assert types == ['_IF', 'NAME', '_NL', '_INDENT', 'NAME', '_DEDENT']
 
 
 def test_bundle_bundle_lower(patch, bundle, magic):
@@ -318,10 +423,9 @@ def test_bundle_parser_default(patch, bundle):
 
 def test_bundle_parser_ebnf(patch, bundle):
     """
-    Ensures Bundle.parser creates a new instance of a parser for custom
-    EBNF files
+    Ensures Bundle.parser uses the pooled parser for custom EBNF files
     """
-    patch.init(Parser)
+    patch.object(ParserPool, 'get')
     result = bundle.parser(ebnf='ebnf')
-    Parser.__init__.assert_called_with(ebnf='ebnf')
-    assert isinstance(result, Parser)
+    ParserPool.get.assert_called_with('ebnf')
+    assert result == ParserPool.get()
@@ -4,14 +4,18 @@ import io
 import click
 from click.testing import CliRunner
 
+from lark.lexer import Token
+
 from pytest import fixture, mark
 
+import storyscript.Cli as CliModule
 from storyscript.App import App
 from storyscript.Cli import Cli
 from storyscript.Project import Project
 from storyscript.Version import version
 from storyscript.exceptions.CompilerError import CompilerError
 from storyscript.exceptions.StoryError import StoryError
+from storyscript.lsp import LanguageServer
 
 
 @fixture
@@ -122,6 +126,30 @@ def test_cli_parse(runner, echo, app, tree):
     click.echo.assert_called_with(tree.pretty())
 
 
+def test_cli_parse_watch(patch, runner, app):
+    patch.object(CliModule, 'watch_parse')
+    runner.invoke(Cli.parse, ['--watch', '--lower', 'path'])
+    CliModule.watch_parse.assert_called_with('path', None, None, True, {},
+                                             False)
+    assert App.parse.call_count == 0
+
+
+def test_cli_watch_parse(patch, magic, echo, tree):
+    patch.object(CliModule, 'echo_tree')
+    watcher = magic()
+    patch.object(CliModule, 'Watcher', return_value=watcher)
+    error = magic()
+    cycle = magic(changed=['a', 'b'], errors=[error])
+    watcher.watch.return_value = [cycle]
+    watcher.bundle.stories = {'a': tree}
+    CliModule.watch_parse('path', None, None, False, {}, True)
+    CliModule.Watcher.assert_called_with('path', ignored_path=None,
+                                         ebnf=None, features={})
+    CliModule.echo_tree.assert_called_once_with('a', tree, True)
+    error.echo.assert_called()
+    click.echo.assert_called_with(cycle.summary(), err=True)
+
+
 def test_cli_parse_raw(runner, echo, app, tree):
     """
     Ensures the parse command supports raw trees
@@ -211,6 +239,24 @@ def test_cli_parse_features_unknown(runner, echo, app):
     )
 
 
+def test_cli_parse_features_hub_snapshot(runner, echo, app):
+    """
+    Ensures hub snapshots can't be set with preview flags
+    """
+    e = runner.invoke(Cli.parse, ['--preview=hub_snapshot'])
+    App.parse.assert_not_called()
+    assert e.exit_code == 1
+
+
+def test_cli_compile_features_concise(runner, echo, app):
+    """
+    Ensures concise output can't be set with preview flags
+    """
+    e = runner.invoke(Cli.compile, ['--preview=concise'])
+    App.compile.assert_not_called()
+    assert e.exit_code == 1
+
+
 def test_cli_parse_debug(runner, echo, app):
     """
     Ensures the parse command supports raises errors with debug=True
@@ -259,6 +305,57 @@ def test_cli_parse_not_found(runner, echo, app, patch):
     click.echo.assert_called_with(StoryError.message())
 
 
+def test_cli_compile_watch(patch, runner, app):
+    patch.object(CliModule, 'watch_compile')
+    runner.invoke(Cli.compile, ['--watch', '-j', 'path', 'out'])
+    CliModule.watch_compile.assert_called_with('path', 'out', True, False,
+                                               None, None, False, False, {})
+    assert App.compile.call_count == 0
+
+
+@fixture
+def watcher(patch, magic):
+    watcher = magic()
+    patch.object(CliModule, 'Watcher', return_value=watcher)
+    CliModule.Watcher.write = magic()
+    return watcher
+
+
+def test_cli_watch_compile(patch, magic, echo, watcher):
+    patch.object(App, 'dumps')
+    cycle = magic(errors=[])
+    watcher.watch.return_value = [cycle]
+    CliModule.watch_compile('path', 'out', True, False, None, None, True,
+                            False, {})
+    CliModule.Watcher.assert_called_with('path', ignored_path=None,
+                                         ebnf=None,
+                                         features={'concise': True})
+    watcher.watch.assert_called_with(watcher.compile)
+    App.dumps.assert_called_with(watcher.result(), first=False, indent=2)
+    CliModule.Watcher.write.assert_called_with('out', App.dumps())
+    click.echo.assert_called_with(cycle.summary(), err=True)
+
+
+def test_cli_watch_compile_errors(patch, magic, echo, watcher):
+    patch.object(App, 'dumps')
+    error = magic()
+    watcher.watch.return_value = [magic(errors=[error])]
+    CliModule.watch_compile('path', 'out', True, False, None, None, False,
+                            False, {})
+    error.echo.assert_called()
+    assert App.dumps.call_count == 0
+    assert CliModule.Watcher.write.call_count == 0
+
+
+def test_cli_watch_compile_stdout(patch, magic, echo, watcher):
+    patch.object(App, 'dumps')
+    watcher.watch.return_value = [magic(errors=[])]
+    CliModule.watch_compile('path', None, True, False, None, None, False,
+                            False, {})
+    click.echo.assert_any_call(App.dumps())
+    assert CliModule.Watcher.write.call_count == 0
+
+
 def test_cli_compile(patch, runner, echo, app):
     """
     Ensures the compile command compiles a story.
@@ -341,6 +438,64 @@ def test_cli_compile_features(runner, echo, app):
                                    first=False, features={'globals': True})
 
 
+def test_cli_compile_hub_snapshot(runner, echo, app, tmpdir):
+    snapshot = str(tmpdir.join('hub.json'))
+    tmpdir.join('hub.json').write('{}')
+    runner.invoke(Cli.compile, ['--preview=globals',
+                                '--hub-snapshot', snapshot])
+    features = {'globals': True, 'hub_snapshot': snapshot}
+    App.compile.assert_called_with('.', ebnf=None,
+                                   ignored_path=None, concise=False,
+                                   first=False, features=features)
+
+
+def test_cli_compile_hub_snapshot_missing(runner, app):
+    e = runner.invoke(Cli.compile, ['--hub-snapshot', '/no/hub.json'])
+    assert e.exit_code == 2
+    assert App.compile.call_count == 0
+
+
+def test_with_hub_snapshot():
+    assert CliModule.with_hub_snapshot({'globals': True}, None) == \
+        {'globals': True}
+    assert CliModule.with_hub_snapshot({}, 'hub.json') == \
+        {'hub_snapshot': 'hub.json'}
+
+
+@mark.parametrize('option', ['--optimize=1', '-O1'])
+def test_cli_compile_optimize(runner, echo, app, option):
+    runner.invoke(Cli.compile, [option])
+    App.compile.assert_called_with('.', ebnf=None,
+                                   ignored_path=None, concise=False,
+                                   first=False, features={'optimize': 1})
+
+
+def test_cli_compile_optimize_negative(runner, app):
+    e = runner.invoke(Cli.compile, ['-O', '-1'])
+    assert e.exit_code == 2
+    assert App.compile.call_count == 0
+
+
+def test_with_optimize():
+    assert CliModule.with_optimize({'globals': True}, 0) == {'globals': True}
+    assert CliModule.with_optimize({}, 1) == {'optimize': 1}
+
+
+@mark.parametrize('option', ['--backend=compact', '-bcompact'])
+def test_cli_compile_backend(runner, echo, app, option):
+    runner.invoke(Cli.compile, [option])
+    features = {'backend': 'compact'}
+    App.compile.assert_called_with('.', ebnf=None,
+                                   ignored_path=None, concise=False,
+                                   first=False, features=features)
+
+
+def test_with_backend():
+    assert CliModule.with_backend({'globals': True}, None) == \
+        {'globals': True}
+    assert CliModule.with_backend({}, 'compact') == {'backend': 'compact'}
+
+
 @mark.parametrize('option', ['--json', '-j'])
 def test_cli_compile_json(runner, echo, app, option):
     """
@@ -411,18 +566,31 @@ def test_cli_lex(patch, magic, runner, app, echo):
     Ensures the lex command outputs lexer tokens
     """
     token = magic(type='token', value='value')
-    patch.object(App, 'lex', return_value={'one.story': [token]})
+    patch.object(App, 'lex', return_value=iter([('one.story', [token])]))
     runner.invoke(Cli.lex, [])
     App.lex.assert_called_with('.', ebnf=None, features={})
     click.echo.assert_called_with('0 token value')
     assert click.echo.call_count == 2
 
 
+@mark.parametrize('option', ['--json', '-j'])
+def test_cli_lex_json(patch, magic, runner, app, echo, option):
+    """
+    Ensures the lex command can output tokens as lines of JSON
+    """
+    token = Token('NAME', 'a', line=1, column=2)
+    patch.object(App, 'lex', return_value=iter([('one.story', [token])]))
+    runner.invoke(Cli.lex, [option])
+    click.echo.assert_called_once_with(
+        '{"story":"one.story","type":"NAME","value":"a","line":1,'
+        '"column":2}')
+
+
 def test_cli_lex_path(patch, magic, runner, app):
     """
     Ensures the lex command path defaults to cwd
     """
-    patch.object(App, 'lex', return_value={'one.story': [magic()]})
+    patch.object(App, 'lex', return_value=iter([('one.story', [magic()])]))
     runner.invoke(Cli.lex, ['/path'])
     App.lex.assert_called_with('/path', ebnf=None, features={})
 
@@ -502,6 +670,43 @@ def test_cli_grammar(patch, runner, app, echo):
     click.echo.assert_called_with(app.grammar())
 
 
+def test_cli_hub_snapshot(patch, runner, echo):
+    patch.object(App, 'hub_snapshot', return_value=['http', 'slack'])
+    runner.invoke(Cli.main, ['hub', 'snapshot', 'stories', 'hub.json',
+                             '--ignore', 'ignored', '--preview=globals'])
+    App.hub_snapshot.assert_called_with('stories', 'hub.json',
+                                        ignored_path='ignored', ebnf=None,
+                                        features={'globals': True})
+    click.echo.assert_called_with('Wrote 2 services to hub.json')
+
+
+def test_cli_hub_snapshot_error(patch, runner, echo):
+    patch.object(StoryError, 'message')
+    patch.object(App, 'hub_snapshot',
+                 side_effect=StoryError(CompilerError(None), None))
+    e = runner.invoke(Cli.main, ['hub', 'snapshot', '.', 'hub.json'])
+    assert e.exit_code == 1
+    click.echo.assert_called_with(StoryError.message())
+
+
+def test_cli_hub_snapshot_ice(patch, runner, echo):
+    patch.object(App, 'hub_snapshot', side_effect=Exception('ICE'))
+    e = runner.invoke(Cli.main, ['hub', 'snapshot', '.', 'hub.json'])
+    assert e.exit_code == 1
+    click.echo.assert_called_with((
+        'E0001: Internal error occured: ICE\n'
+        'Please report at https://github.com/storyscript/storyscript/issues'))
+
+
+def test_cli_lsp(patch, runner):
+    patch.object(LanguageServer, '__init__', return_value=None)
+    patch.object(LanguageServer, 'serve')
+    runner.invoke(Cli.lsp, ['--debounce', '0.5', '--preview', 'globals'])
+    args, kwargs = LanguageServer.__init__.call_args
+    assert kwargs == {'features': {'globals': True}, 'debounce': 0.5}
+    assert LanguageServer.serve.call_count == 1
+
+
 def test_cli_new(patch, runner):
     """
     Ensures Cli.new uses Project.new
@@ -613,6 +818,75 @@ def test_cli_format_features(patch, runner):
                                   features={'globals': True})
 
 
+@fixture
+def formatted(patch, magic):
+    patch.object(App, 'format_paths')
+    results = [magic(error=None, changed=False, path='a.story', output='a'),
+               magic(error=None, changed=True, path='b.story', output='b')]
+    App.format_paths.return_value = results
+    return results
+
+
+@mark.parametrize('args', [['--check'], ['--jobs', '2'], ['-j', '2'],
+                           ['--cache', 'cache']])
+def test_cli_format_paths(patch, runner, echo, app, formatted, args):
+    """
+    Ensures the format command formats many stories with these options.
+    """
+    patch.object(CliModule, 'format_paths', return_value=True)
+    e = runner.invoke(Cli.format, ['path'] + args)
+    assert e.exit_code == 0
+    assert CliModule.format_paths.call_count == 1
+    assert App.format.call_count == 0
+
+
+def test_cli_format_directory(patch, runner, echo, app, formatted, tmpdir):
+    """
+    Ensures the format command formats all stories of a directory.
+    """
+    e = runner.invoke(Cli.format, [str(tmpdir), '--ignore', 'ignored'])
+    assert e.exit_code == 0
+    App.format_paths.assert_called_with(str(tmpdir), ignored_path='ignored',
+                                        ebnf=None, features={}, jobs=None,
+                                        cache=None)
+    click.echo.assert_any_call('File: a.story')
+    click.echo.assert_called_with('b')
+
+
+def test_cli_format_directory_inplace(runner, echo, app, formatted, tmpdir):
+    e = runner.invoke(Cli.format, [str(tmpdir), '-i'])
+    assert e.exit_code == 0
+    formatted[0].write.assert_called()
+    formatted[1].write.assert_called()
+    assert click.echo.call_count == 0
+
+
+def test_cli_format_check(runner, echo, app, formatted):
+    """
+    Ensures the format check lists the stories which need reformatting.
+    """
+    e = runner.invoke(Cli.format, ['path', '--check', '-i'])
+    assert e.exit_code == 1
+    click.echo.assert_any_call('b.story needs reformatting')
+    click.echo.assert_called_with('1 of 2 stories need reformatting',
+                                  err=True)
+    assert formatted[1].write.call_count == 0
+
+
+def test_cli_format_check_formatted(runner, echo, app, formatted):
+    formatted[1].changed = False
+    e = runner.invoke(Cli.format, ['path', '--check'])
+    assert e.exit_code == 0
+    assert click.echo.call_count == 0
+
+
+def test_cli_format_paths_error(runner, echo, app, formatted):
+    formatted[0].error = 'error'
+    e = runner.invoke(Cli.format, ['path', '--check'])
+    assert e.exit_code == 1
+    click.echo.assert_any_call('error')
+
+
 @mark.parametrize('option', ['--inplace', '-i'])
 def test_cli_format_inplace(runner, echo, app, option):
     """
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+import copy
+import json
+
+from storyscript.FakeLine import FakeLine
+
+
+def test_fakeline():
+    line = FakeLine(12, 3)
+    assert line == '12.3'
+    assert line.line == 12
+    assert line.index == 3
+    assert hash(line) == hash('12.3')
+    assert {'12.3': 1}[line] == 1
+
+
+def test_fakeline_str():
+    line = FakeLine(12, 3)
+    assert str(line) is line
+
+
+def test_fakeline_repr():
+    assert repr(FakeLine(12, 3)) == 'FakeLine(12, 3)'
+
+
+def test_fakeline_json():
+    line = FakeLine(12, 3)
+    assert json.dumps({line: line}) == '{"12.3": "12.3"}'
+
+
+def test_fakeline_copy():
+    line = FakeLine(12, 3)
+    for result in [copy.copy(line), copy.deepcopy(line)]:
+        assert result == '12.3'
+        assert (result.line, result.index) == (12, 3)
@@ -3,3 +3,27 @@ from storyscript.Features import Features
 
 def test_features_str():
     assert str(Features(None)).startswith('Features(')
+
+
+def test_features_hub_snapshot():
+    assert Features(None).hub_snapshot is None
+    assert Features({'hub_snapshot': 'hub.json'}).hub_snapshot == 'hub.json'
+
+
+def test_features_optimize():
+    assert Features(None).optimize == 0
+    assert Features({'optimize': 1}).optimize == 1
+
+
+def test_features_backend():
+    assert Features(None).backend == 'json'
+    assert Features({'backend': 'compact'}).backend == 'compact'
+
+
+def test_features_concise():
+    assert Features(None).concise is False
+    assert Features({'concise': True}).concise is True
+
+
+def test_features_flag_names():
+    assert Features.flag_names() == ['globals', 'debug', 'source_map']
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+
+from pytest import fixture
+
+import storyscript.Formatter as FormatterModule
+from storyscript.Bundle import Bundle
+from storyscript.Formatter import FormattedStory, Formatter, format_source
+from storyscript.Story import Story
+from storyscript.exceptions import StoryError
+
+
+@fixture
+def formatter():
+    return Formatter()
+
+
+def test_format_source(patch):
+    patch.init(Story)
+    patch.many(Story, ['parse'])
+    patch.object(Bundle, 'parser')
+    result = format_source('path', 'a=1', 'ebnf', {'globals': True})
+    Story.__init__.assert_called_with('a=1', {'globals': True}, path='path')
+    Bundle.parser.assert_called_with('ebnf')
+    Story.parse.assert_called_with(parser=Bundle.parser())
+    assert result == (Story.parse().format(), None)
+
+
+def test_format_source_error(patch):
+    patch.object(Story, 'parse', side_effect=StoryError(None, None))
+    patch.object(StoryError, 'message')
+    assert format_source('path', 'a', None, None) == \
+        (None, StoryError.message())
+
+
+def test_format_source_internal_error(patch):
+    patch.object(Story, 'parse', side_effect=Exception('ICE'))
+    patch.object(StoryError, 'internal_error')
+    assert format_source('path', 'a', None, None) == \
+        (None, StoryError.internal_error().message())
+
+
+def test_formatted_story_changed():
+    assert FormattedStory('a', 'x', 'y').changed is True
+    assert FormattedStory('a', 'x', 'x').changed is False
+    assert FormattedStory('a', 'x', error='error').changed is False
+
+
+def test_formatted_story_write(tmpdir):
+    path = tmpdir.join('a.story')
+    path.write('a=1')
+    FormattedStory(str(path), 'a=1', 'a = 1').write()
+    assert path.read() == 'a = 1'
+
+
+def test_formatted_story_write_unchanged(patch):
+    patch.object(FormatterModule, 'open', create=True)
+    FormattedStory('a.story', 'a = 1', 'a = 1').write()
+    assert FormatterModule.open.call_count == 0
+
+
+def test_formatter_init(formatter):
+    assert formatter.ebnf is None
+    assert formatter.jobs is None
+    assert formatter.cache is None
+    assert formatter.formatted == set()
+
+
+def test_formatter_init_ebnf():
+    assert Formatter(ebnf='ebnf', cache='cache').cache is None
+
+
+def test_formatter_load(tmpdir):
+    cache = tmpdir.join('cache')
+    cache.write(json.dumps({'formatted': ['a', 'b']}))
+    assert Formatter(cache=str(cache)).formatted == {'a', 'b'}
+
+
+def test_formatter_load_missing(tmpdir):
+    assert Formatter(cache=str(tmpdir.join('cache'))).formatted == set()
+
+
+def test_formatter_load_invalid(tmpdir):
+    cache = tmpdir.join('cache')
+    cache.write('{')
+    assert Formatter(cache=str(cache)).formatted == set()
+
+
+def test_formatter_save(tmpdir):
+    cache = tmpdir.join('cache')
+    formatter = Formatter(cache=str(cache))
+    formatter.formatted = {'b', 'a'}
+    formatter.save()
+    assert json.loads(cache.read()) == {'formatted': ['a', 'b']}
+
+
+def test_formatter_save_no_cache(patch, formatter):
+    patch.object(json, 'dump')
+    formatter.save()
+    assert json.dump.call_count == 0
+
+
+def test_formatter_key(formatter):
+    assert formatter.key('a') == formatter.key('a')
+    assert formatter.key('a') != formatter.key('b')
+    assert formatter.key('a') != Formatter(features={'globals': True}).key('a')
+
+
+def test_formatter_format(patch, formatter):
+    sources = {'a': 'a = 1', 'b': 'b=1', 'c': 'c = 1'}
+    patch.object(Story, 'read', side_effect=lambda path: sources[path])
+    patch.object(Formatter, 'run',
+                 return_value=[('a = 1', None), ('b = 1', None)])
+    formatter.formatted = {formatter.key('c = 1')}
+    results = formatter.format(['a', 'b', 'c'])
+    stories = Formatter.run.call_args[0][0]
+    assert [story.path for story in stories] == ['a', 'b']
+    assert [result.output for result in results] == ['a = 1', 'b = 1',
+                                                     'c = 1']
+    assert [result.changed for result in results] == [False, True, False]
+    assert formatter.formatted == {formatter.key('a = 1'),
+                                   formatter.key('c = 1')}
+
+
+def test_formatter_format_error(patch, formatter):
+    patch.object(Story, 'read', side_effect=StoryError(None, None))
+    patch.object(StoryError, 'message')
+    patch.object(Formatter, 'run', return_value=[])
+    result, = formatter.format(['a'])
+    assert result.error == StoryError.message()
+    assert result.output is None
+
+
+def test_formatter_run(patch, formatter):
+    patch.object(FormatterModule, 'format_source', return_value=('b', None))
+    patch.object(FormatterModule, 'ProcessPoolExecutor')
+    result = formatter.run([FormattedStory('a', 'a')])
+    FormatterModule.format_source.assert_called_with('a', 'a', None, None)
+    assert result == [('b', None)]
+    assert FormatterModule.ProcessPoolExecutor.call_count == 0
+
+
+def test_formatter_run_pool(patch, formatter):
+    patch.object(FormatterModule, 'ProcessPoolExecutor')
+    pool = FormatterModule.ProcessPoolExecutor().__enter__()
+    pool.map.return_value = iter(['result'])
+    formatter.jobs = 2
+    stories = [FormattedStory('a', 'x'), FormattedStory('b', 'y')]
+    assert formatter.run(stories) == ['result']
+    FormatterModule.ProcessPoolExecutor.assert_called_with(max_workers=2)
+    pool.map.assert_called_with(FormatterModule.format_source, ['a', 'b'],
+                                ['x', 'y'], [None, None], [None, None],
+                                chunksize=Formatter.chunksize)
+
+
+def test_formatter_run_single_job(patch, formatter):
+    patch.object(FormatterModule, 'ProcessPoolExecutor')
+    patch.object(FormatterModule, 'format_source')
+    formatter.jobs = 1
+    formatter.run([FormattedStory('a', 'x'), FormattedStory('b', 'y')])
+    assert FormatterModule.format_source.call_count == 2
+    assert FormatterModule.ProcessPoolExecutor.call_count == 0
+
+
+def test_formatter_paths(patch):
+    patch.object(os.path, 'isdir', return_value=False)
+    assert Formatter.paths('path') == ['path']
+
+
+def test_formatter_paths_directory(patch):
+    patch.object(os.path, 'isdir', return_value=True)
+    patch.object(Bundle, 'parse_directory')
+    result = Formatter.paths('path', ignored_path='ignored')
+    Bundle.parse_directory.assert_called_with('path', ignored_path='ignored')
+    assert result == Bundle.parse_directory()
@@ -127,10 +127,17 @@ def test_story_parse_error(patch, story, parser, error):
 
 def test_story_compile(patch, story, compiler):
     story.compile()
-    Compiler.compile.assert_called_with(story.tree, story=story, features=None)
+    Compiler.compile.assert_called_with(story.tree, story=story, features=None,
+                                        services=None)
     assert story.compiled == Compiler.compile()
 
 
+def test_story_compile_services(patch, story, compiler):
+    story.compile(services={'http': 'data'})
+    Compiler.compile.assert_called_with(story.tree, story=story, features=None,
+                                        services={'http': 'data'})
+
+
 @mark.parametrize('error', [StorySyntaxError('error'), CompilerError('error')])
 def test_story_compiler_error(patch, story, compiler, error):
     """
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+
+from pytest import fixture, raises
+
+from storyscript.Bundle import Bundle
+from storyscript.Watcher import WatchCycle, Watcher
+from storyscript.compiler.semantics.ServiceTyping import ServiceTyping
+from storyscript.exceptions import StoryError
+
+
+@fixture
+def watcher(patch):
+    patch.object(Bundle, 'parser')
+    return Watcher('path')
+
+
+def test_watch_cycle_summary():
+    cycle = WatchCycle(['a', 'b'], ['c'], [], 0.0123)
+    assert cycle.summary() == '2 changed, 1 deleted, 0 failed stories in ' \
+        '12.3ms'
+
+
+def test_watcher_init(watcher):
+    Bundle.parser.assert_called_with(None)
+    assert watcher.path == 'path'
+    assert watcher.ignored_path is None
+    assert watcher.parser == Bundle.parser()
+    assert watcher.bundle.stories == {}
+    assert watcher.mtimes == {}
+    assert watcher.errors == {}
+
+
+def test_watcher_init_ebnf(patch):
+    patch.object(Bundle, 'parser')
+    Watcher('path', ebnf='ebnf')
+    Bundle.parser.assert_called_with('ebnf')
+
+
+def test_watcher_paths(patch, watcher):
+    patch.object(os.path, 'isdir', return_value=False)
+    assert watcher.paths() == ['path']
+
+
+def test_watcher_paths_directory(patch, watcher):
+    patch.object(os.path, 'isdir', return_value=True)
+    patch.object(Bundle, 'parse_directory')
+    watcher.ignored_path = 'ignored'
+    result = watcher.paths()
+    Bundle.parse_directory.assert_called_with('path', ignored_path='ignored')
+    assert result == Bundle.parse_directory()
+
+
+def test_watcher_scan(patch, magic, watcher):
+    patch.object(Watcher, 'paths', return_value=['a', 'b'])
+
+    def stat(path):
+        if path == 'b':
+            raise FileNotFoundError()
+        return magic(st_mtime_ns=1, st_size=2)
+
+    patch.object(os, 'stat', side_effect=stat)
+    assert watcher.scan() == {'a': (1, 2)}
+
+
+def test_watcher_update_unchanged(patch, magic, watcher):
+    patch.object(Watcher, 'scan', return_value={'a': (1, 2)})
+    watcher.mtimes = {'a': (1, 2)}
+    process = magic()
+    assert watcher.update(process) is None
+    assert process.call_count == 0
+
+
+def test_watcher_update(patch, magic, watcher):
+    patch.object(Watcher, 'scan',
+                 return_value={'a': (1, 2), 'b': (3, 4), 'c': (1, 1)})
+    patch.object(Bundle, 'remove_story')
+    watcher.mtimes = {'a': (1, 2), 'b': (1, 4), 'd': (1, 1)}
+    process = magic()
+    cycle = watcher.update(process)
+    assert cycle.changed == ['b', 'c']
+    assert cycle.deleted == ['d']
+    assert cycle.errors == []
+    assert watcher.mtimes == Watcher.scan()
+    Bundle.remove_story.assert_any_call('d')
+    Bundle.remove_story.assert_any_call('b')
+    process.assert_any_call(['b'], parser=watcher.parser)
+    process.assert_called_with(['c'], parser=watcher.parser)
+
+
+def test_watcher_update_errors(patch, magic, watcher):
+    patch.object(Watcher, 'scan', return_value={'a': (1, 2), 'b': (1, 2)})
+    error = StoryError(None, None)
+    watcher.mtimes = {'a': (1, 2)}
+    watcher.errors = {'a': error}
+
+    def process(stories, parser):
+        raise error
+
+    cycle = watcher.update(process)
+    assert watcher.errors == {'a': error, 'b': error}
+    assert cycle.errors == [error, error]
+
+
+def test_watcher_update_errors_fixed(patch, magic, watcher):
+    patch.object(Watcher, 'scan', return_value={'a': (2, 2)})
+    watcher.mtimes = {'a': (1, 2), 'b': (1, 2)}
+    watcher.errors = {'a': magic(), 'b': magic()}
+    cycle = watcher.update(magic())
+    assert watcher.errors == {}
+    assert cycle.errors == []
+
+
+def test_watcher_compile(patch, watcher):
+    patch.object(Watcher, 'update')
+    result = watcher.compile()
+    Watcher.update.assert_called_with(watcher.bundle.compile)
+    assert result == Watcher.update()
+
+
+def test_watcher_compile_services(patch, watcher):
+    """
+    Ensures services are only fetched once while watching
+    """
+    patch.object(Bundle, 'load_story')
+    patch.object(ServiceTyping, 'service_names', return_value={'http'})
+    patch.object(ServiceTyping, 'prefetch', return_value={'http': 'data'})
+    patch.object(Watcher, 'scan', side_effect=[{'a': 1}, {'a': 2}])
+    watcher.compile()
+    watcher.compile()
+    ServiceTyping.prefetch.assert_called_once_with({'http'}, snapshot=None)
+    Bundle.load_story().compile.assert_called_with(services={'http': 'data'})
+
+
+def test_watcher_parse(patch, watcher):
+    patch.object(Bundle, 'parse')
+
+    def update(process):
+        process(['a'], parser='parser')
+
+    patch.object(Watcher, 'update', side_effect=update)
+    watcher.parse(lower=True)
+    Bundle.parse.assert_called_with(['a'], parser='parser', lower=True)
+
+
+def test_watcher_result(patch, watcher):
+    patch.object(Bundle, 'result')
+    watcher.mtimes = {'a': (1, 1), 'b': (1, 1), 'c': (1, 1)}
+    watcher.bundle.stories = {'c': 3, 'a': 1}
+    result = watcher.result()
+    Bundle.result.assert_called_with(['a', 'b', 'c'])
+    assert result == Bundle.result()
+    assert list(watcher.bundle.stories.items()) == [('a', 1), ('c', 3)]
+
+
+def test_watcher_watch(patch, magic, watcher):
+    patch.object(time, 'sleep')
+    cycle = magic()
+    update = magic(side_effect=[None, cycle, None])
+    assert list(watcher.watch(update, cycles=3)) == [cycle]
+    assert update.call_count == 3
+    time.sleep.assert_called_with(watcher.interval)
+    assert time.sleep.call_count == 2
+
+
+def test_watcher_write(tmpdir):
+    path = tmpdir.join('out.json')
+    Watcher.write(str(path), 'hello')
+    assert path.read() == 'hello'
+    assert os.stat(str(path)).st_mode & 0o777 == 0o644
+    assert tmpdir.listdir() == [path]
+
+
+def test_watcher_write_existing(tmpdir):
+    path = tmpdir.join('out.json')
+    path.write('old')
+    os.chmod(str(path), 0o600)
+    Watcher.write(str(path), 'new')
+    assert path.read() == 'new'
+    assert os.stat(str(path)).st_mode & 0o777 == 0o600
+
+
+def test_watcher_write_error(patch, tmpdir):
+    path = tmpdir.join('out.json')
+    path.write('old')
+    patch.object(os, 'replace', side_effect=OSError())
+    with raises(OSError):
+        Watcher.write(str(path), 'new')
+    assert path.read() == 'old'
+    assert tmpdir.listdir() == [path]
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+from pytest import raises
+
+from storyscript.compiler.Backend import Backend
+
+
+def test_backend_compile():
+    class TextBackend(Backend):
+        @classmethod
+        def compile(cls, tree, story, module, features):
+            return 'text'
+
+    assert TextBackend.indent == 2
+    assert TextBackend.compile('tree', 'story', 'module', 'features') == \
+        'text'
+
+
+def test_backend_without_compile():
+    with raises(TypeError):
+        class TextBackend(Backend):
+            pass
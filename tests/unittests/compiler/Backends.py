@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import pkg_resources
+
+from pytest import fixture, raises
+
+from storyscript.compiler.Backends import Backends
+from storyscript.compiler.compact import CompactBackend
+from storyscript.compiler.json import JSONBackend
+from storyscript.exceptions import CompilerError
+
+
+@fixture
+def entry_points(patch, magic):
+    """
+    Installs a package with a `bytecode` backend.
+    """
+    entry_point = magic()
+    entry_point.name = 'bytecode'
+    shadowing = magic()
+    shadowing.name = 'json'
+    patch.object(pkg_resources, 'iter_entry_points',
+                 return_value=[entry_point, shadowing])
+    patch.object(Backends, '_entry_points', None)
+    return entry_point
+
+
+def test_backends_get_builtins():
+    assert Backends.get('json') == JSONBackend
+    assert Backends.get('compact') == CompactBackend
+
+
+def test_backends_entry_points(entry_points):
+    assert Backends.entry_points() == {'bytecode': entry_points}
+    pkg_resources.iter_entry_points.assert_called_with('storyscript.backends')
+    Backends.entry_points()
+    assert pkg_resources.iter_entry_points.call_count == 1
+
+
+def test_backends_names(entry_points):
+    assert Backends.names() == ['bytecode', 'compact', 'json']
+
+
+def test_backends_get_entry_point(entry_points):
+    assert Backends.get('bytecode') == entry_points.load()
+    assert Backends.get('json') == JSONBackend
+
+
+def test_backends_get_unknown(entry_points):
+    with raises(CompilerError) as e:
+        Backends.get('foo')
+    assert e.value.error == 'backend_unknown'
+    assert e.value.format_args['backend'] == 'foo'
+    assert e.value.format_args['backends'] == 'bytecode, compact, json'
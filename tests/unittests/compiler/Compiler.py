@@ -1,20 +1,28 @@
 # -*- coding: utf-8 -*-
 
+from storyscript.Features import Features
 from storyscript.compiler import Compiler
+from storyscript.compiler.compact import CompactBackend
 from storyscript.compiler.json import JSONCompiler
 from storyscript.compiler.lowering import Lowering
+from storyscript.compiler.optimizer import ConstantFolding, \
+    DeadCodeElimination
 from storyscript.compiler.semantics import Semantics
 
 
 def test_compiler_generate(patch, magic):
     patch.init(Lowering)
     patch.object(Lowering, 'process')
+    patch.init(Semantics)
     patch.object(Semantics, 'process')
     patch.many(JSONCompiler, ['compile'])
     tree = magic()
-    result = Compiler.generate(tree, features=None)
-    Lowering.__init__.assert_called_with(parser=tree.parser, features=None)
+    features = Features(None)
+    result = Compiler.generate(tree, features=features)
+    Lowering.__init__.assert_called_with(parser=tree.parser,
+                                         features=features)
     Lowering.process.assert_called_with(tree)
+    Semantics.__init__.assert_called_with(features=features, services=None)
     Semantics.process.assert_called_with(Lowering.process())
     assert result == (Lowering.process(), Semantics.process())
 
@@ -23,9 +31,77 @@ def test_compiler_compile(patch, magic):
     patch.object(Compiler, 'generate', return_value=('tree', 'sem'))
     patch.object(JSONCompiler, 'compile')
     tree = magic()
-    result = Compiler.compile(tree, story=None, features=None)
-    Compiler.generate.assert_called_with(tree, None)
-    JSONCompiler.compile.assert_called_with('tree')
+    features = Features(None)
+    result = Compiler.compile(tree, story=None, features=features)
+    Compiler.generate.assert_called_with(tree, features, services=None)
+    JSONCompiler.compile.assert_called_with('tree', source_map=False)
     assert result.output() == JSONCompiler.compile()
     assert result.module() == 'sem'
     assert result.backend == 'json'
+    assert result.eliminated() == 0
+
+
+def test_compiler_optimize(patch):
+    patch.object(ConstantFolding, 'process', return_value=5)
+    patch.object(DeadCodeElimination, 'process', return_value=2)
+    features = Features({'optimize': 1})
+    assert Compiler.optimize('tree', features) == 7
+    ConstantFolding.process.assert_called_with('tree')
+    DeadCodeElimination.process.assert_called_with('tree')
+
+
+def test_compiler_optimize_disabled(patch):
+    patch.object(ConstantFolding, 'process')
+    patch.object(DeadCodeElimination, 'process')
+    assert Compiler.optimize('tree', Features(None)) == 0
+    assert ConstantFolding.process.call_count == 0
+    assert DeadCodeElimination.process.call_count == 0
+
+
+def test_compiler_compile_optimize(patch, magic):
+    patch.object(Compiler, 'generate', return_value=('tree', 'sem'))
+    patch.object(Compiler, 'optimize', return_value=5)
+    patch.object(JSONCompiler, 'compile')
+    features = Features({'optimize': 1})
+    result = Compiler.compile(magic(), story=None, features=features)
+    Compiler.optimize.assert_called_with('tree', features)
+    assert result.eliminated() == 5
+
+
+def test_compiler_compile_source_map(patch, magic):
+    patch.object(Compiler, 'generate', return_value=('tree', 'sem'))
+    patch.object(JSONCompiler, 'compile')
+    features = Features({'source_map': True})
+    Compiler.compile(magic(), story=None, features=features)
+    JSONCompiler.compile.assert_called_with('tree', source_map=True)
+
+
+def test_compiler_compile_services(patch, magic):
+    patch.object(Compiler, 'generate', return_value=('tree', 'sem'))
+    patch.object(JSONCompiler, 'compile')
+    tree = magic()
+    features = Features(None)
+    Compiler.compile(tree, story=None, features=features,
+                     services={'http': 'data'})
+    Compiler.generate.assert_called_with(tree, features,
+                                         services={'http': 'data'})
+
+
+def test_compiler_compile_backend(patch, magic):
+    patch.object(Compiler, 'generate', return_value=('tree', 'sem'))
+    patch.object(CompactBackend, 'compile')
+    tree = magic()
+    features = Features({'backend': 'compact'})
+    result = Compiler.compile(tree, story='story', features=features)
+    CompactBackend.compile.assert_called_with('tree', story='story',
+                                              module='sem', features=features)
+    assert result.output() == CompactBackend.compile()
+    assert result.backend == 'compact'
+
+
+def test_compiler_compile_backend_argument(patch, magic):
+    patch.object(Compiler, 'generate', return_value=('tree', 'sem'))
+    patch.object(CompactBackend, 'compile')
+    Compiler.compile(magic(), story=None, features=Features(None),
+                     backend='compact')
+    assert CompactBackend.compile.call_count == 1
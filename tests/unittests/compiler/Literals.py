@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+from lark.lexer import Token
+
+from pytest import mark, raises
+
+from storyscript.compiler.Literals import LiteralError, Literals
+from storyscript.exceptions import CompilerError
+from storyscript.parser import Tree
+
+
+def time(value):
+    return Tree('time', [Token('RAW_TIME', value, line=1, column=1)])
+
+
+@mark.parametrize('example,expected', [
+    ('1h5s', [(1, 'h'), (5, 's')]),
+    ('1s', [(1, 's')]),
+    ('001s', [(1, 's')]),
+    ('2d3h4s', [(2, 'd'), (3, 'h'), (4, 's')]),
+    ('1h5ms', [(1, 'h'), (5, 'ms')]),
+    ('2d3s4ms', [(2, 'd'), (3, 's'), (4, 'ms')]),
+])
+def test_split_by_time(example, expected):
+    """
+    Test whether time splitting works correctly.
+    """
+    assert Literals.time_parts(example) == expected
+
+
+@mark.parametrize('value,ms', [
+    ('5ms', 5),
+    ('1s', 1000),
+    ('2m', 120000),
+    ('1h', 3600000),
+    ('1d', 86400000),
+    ('1w', 604800000),
+    ('1w2d3h4m5s6ms', 788645006),
+])
+def test_literals_decode_time(value, ms):
+    assert Literals.decode_time(value) == ms
+
+
+@mark.parametrize('value,error,format_args', [
+    ('1s1s', 'time_value_duplicate', {'time_type': 's'}),
+    ('1d1w', 'time_value_inconsistent_week', {}),
+    ('1s1h', 'time_value_inconsistent', {'prev': 's', 'current': 'h'}),
+    ('1ms1s', 'time_value_inconsistent', {'prev': 'ms', 'current': 's'}),
+])
+def test_literals_decode_time_errors(value, error, format_args):
+    with raises(LiteralError) as e:
+        Literals.decode_time(value)
+    assert e.value.error == error
+    assert e.value.format_args == format_args
+
+
+def test_literals_time():
+    assert Literals.time(time('1s')) == 1000
+
+
+def test_literals_time_error():
+    with raises(CompilerError) as e:
+        Literals.time(time('1s1s'))
+    assert e.value.error == 'time_value_duplicate'
+
+
+def test_literals_time_cached(patch):
+    Literals.decode_time.cache_clear()
+    patch.object(Literals, 'time_parts', return_value=[(1, 's')])
+    Literals.decode_time('1s')
+    Literals.decode_time('1s')
+    assert Literals.time_parts.call_count == 1
+    Literals.decode_time.cache_clear()
+
+
+@mark.parametrize('value,text', [
+    ('+1', '1'),
+    ('-1', '-1'),
+    ('1.5', '1.5'),
+])
+def test_literals_number_text(value, text):
+    assert Literals.number_text(value) == text
+
+
+@mark.parametrize('kind,value,expected', [
+    ('INT', '1', 1),
+    ('INT', '+1', 1),
+    ('INT', '-1', -1),
+    ('FLOAT', '1.2', 1.2),
+    ('FLOAT', '+1.2', 1.2),
+])
+def test_literals_number(kind, value, expected):
+    token = Token(kind, value)
+    result = Literals.number(Tree('number', [token]))
+    assert result == expected
+    assert type(result) is type(expected)
+    assert token.value == value
+
+
+def test_literals_decode_string():
+    assert Literals.decode_string('a\\nb') == 'a\nb'
+
+
+def test_literals_decode_string_error():
+    with raises(LiteralError) as e:
+        Literals.decode_string('\\N{FOO BAR}')
+    assert e.value.error == 'unicode_decode_error'
+
+
+def test_literals_string():
+    tree = Tree('string', [Token('DOUBLE_QUOTED', '\\N{FOO BAR}', line=1,
+                                 column=1)])
+    with raises(CompilerError) as e:
+        Literals.string(tree, tree.child(0).value)
+    assert e.value.error == 'unicode_decode_error'
+
+
+@mark.parametrize('value,expected', [
+    ('/regexp/', ('regexp', '')),
+    ('/regexp/gi', ('regexp', 'gi')),
+    ('//', ('', '')),
+])
+def test_literals_regular_expression(value, expected):
+    tree = Tree('regular_expression', [Token('REGEXP', value)])
+    assert Literals.regular_expression(tree) == expected
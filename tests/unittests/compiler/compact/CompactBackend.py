@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+from pytest import mark, raises
+
+from storyscript.compiler.compact import CompactBackend
+from storyscript.compiler.json import JSONBackend
+from storyscript.exceptions import InternalCompilerError
+
+
+def line(**fields):
+    result = {field: None for field in CompactBackend.line_fields[:-1]}
+    result.update(fields)
+    return result
+
+
+def test_compact_backend_compile(patch):
+    patch.object(JSONBackend, 'compile')
+    patch.object(CompactBackend, 'pack')
+    result = CompactBackend.compile('tree', 'story', 'module', 'features')
+    JSONBackend.compile.assert_called_with('tree', 'story', 'module',
+                                           'features')
+    CompactBackend.pack.assert_called_with(JSONBackend.compile())
+    assert result == CompactBackend.pack()
+
+
+def test_compact_backend_indent():
+    assert CompactBackend.indent is None
+
+
+def test_compact_backend_pack():
+    output = {
+        'tree': {
+            '1': line(ln='1', method='expression', name=['a'], next='2'),
+            '2': line(ln='2', method='return', src='return')
+        },
+        'services': ['http'], 'entrypoint': '1', 'functions': {},
+        'version': '0.0.0'
+    }
+    packed = CompactBackend.pack(output)
+    assert packed == {
+        'tree': [
+            ['1', 0, None, None, None, ['a'], None, None, None, None, None,
+             None, None, None, '2'],
+            ['2', 14, None, None, None, None, None, None, None, None, None,
+             None, None, 'return'],
+        ],
+        'services': ['http'], 'entrypoint': '1', 'functions': {},
+        'version': '0.0.0', 'format': 'compact'
+    }
+    assert CompactBackend.unpack(packed) == output
+
+
+def test_compact_backend_pack_concise():
+    """
+    Ensures concise stories keep their tree and the positions of the fields
+    of their lines.
+    """
+    assert CompactBackend.pack({'version': '0.0.0'}) == {
+        'tree': [], 'version': '0.0.0', 'format': 'compact'
+    }
+    packed = CompactBackend.pack_line({'ln': '1', 'method': 'return',
+                                       'src': 'return'})
+    assert packed == ['1', 14, None, None, None, None, None, None, None,
+                      None, None, None, None, 'return']
+
+
+def test_compact_backend_pack_line_unknown_field():
+    with raises(InternalCompilerError):
+        CompactBackend.pack_line(line(ln='1', method='if', foo=1))
+
+
+@mark.parametrize('value,packed', [
+    ({'$OBJECT': 'int', 'int': 1}, [0, 1]),
+    ({'$OBJECT': 'regexp', 'regexp': 'a'}, [5, 'a']),
+    ({'$OBJECT': 'regexp', 'regexp': 'a', 'flags': 'g'}, [5, 'a', 'g']),
+    ({'$OBJECT': 'arg', 'name': 'x', 'arg': None}, [14, 'x', None]),
+    ({'$OBJECT': 'path', 'paths': ['a', {'$OBJECT': 'dot', 'dot': 'b'}]},
+     [6, ['a', [7, 'b']]]),
+    ({'$OBJECT': 'range', 'range': {'start': {'$OBJECT': 'int', 'int': 1}}},
+     [10, {'start': [0, 1]}]),
+    ([None, 'a'], [None, 'a']),
+    ('a', 'a'),
+])
+def test_compact_backend_pack_value(value, packed):
+    assert CompactBackend.pack_value(value) == packed
+    assert CompactBackend.unpack_value(packed) == value
+
+
+def test_compact_backend_pack_value_code_list():
+    """
+    Ensures arrays which would be read as objects aren't emitted.
+    """
+    with raises(InternalCompilerError):
+        CompactBackend.pack_value([1, 2])
+
+
+def test_compact_backend_pack_value_unknown_field():
+    with raises(InternalCompilerError):
+        CompactBackend.pack_value({'$OBJECT': 'int', 'int': 1, 'foo': 2})
@@ -5,6 +5,7 @@ from pytest import fixture, mark, raises
 
 from storyscript.Version import version
 from storyscript.compiler.json import JSONCompiler, Lines, Objects
+from storyscript.compiler.json.SourceMap import SourceMap
 from storyscript.exceptions import StorySyntaxError
 from storyscript.parser import Tree
 
@@ -308,86 +309,43 @@ def test_compiler_service_syntax_error(patch, compiler, lines, tree):
 
 
 def test_compiler_find_parent_with_output_parent_none(patch, compiler, lines,
-                                                      tree, magic):
+                                                      tree):
     """
     test end when parent is none
     """
     patch.object(tree, 'expect')
     tree.expect.side_effect = Exception('.error.')
-    parent = None
-    # only do the recursion once
-    orig_method = compiler.find_parent_with_output
-    patch.object(compiler, 'find_parent_with_output')
     with raises(Exception) as e:
-        orig_method(tree, parent)
+        compiler.find_parent_with_output(tree, None)
     assert str(e.value) == '.error.'
-    compiler.find_parent_with_output.assert_not_called()
+    lines.output_parent.assert_not_called()
     tree.expect.assert_called_with(0, 'when_no_output_parent')
 
 
-def test_compiler_find_parent_with_output_parent_returned(patch, compiler,
-                                                          lines, tree, magic):
+def test_compiler_find_parent_with_output(patch, compiler, lines, tree):
     """
-    Test whether the parent's output gets correctly returned
+    Test whether the output of the nearest output parent gets returned
     """
-    patch.object(Tree, 'expect')
-    parent = '1'
+    lines.output_parent.return_value = '1'
     lines.lines = {'1': {'output': ['.output.'], 'service': 'my_service'}}
-    # only do the recursion once
-    orig_method = compiler.find_parent_with_output
-    patch.object(compiler, 'find_parent_with_output')
-    result = orig_method(tree, parent)
-    compiler.find_parent_with_output.assert_not_called()
+    result = compiler.find_parent_with_output(tree, '2')
+    lines.output_parent.assert_called_with('2')
+    tree.expect.assert_called_with(True, 'when_no_output_parent')
     assert result == ['.output.']
 
 
-def test_compiler_find_parent_with_output(patch, compiler, lines, tree, magic):
+def test_compiler_find_parent_with_output_missing(patch, compiler, lines,
+                                                  tree):
     """
-    Test continue to look upword in the tree
+    Test that an error is raised when no parent has an output
     """
-    patch.object(Tree, 'expect')
-    parent = magic()
-    lines.lines = {parent: {'parent': '0', 'output': None}}
-    # only do the recursion once
-    orig_method = compiler.find_parent_with_output
-    patch.object(compiler, 'find_parent_with_output')
-    result = orig_method(tree, parent)
-    compiler.find_parent_with_output.assert_called_with(tree, '0')
-    assert result == compiler.find_parent_with_output()
-
-
-def test_compiler_find_parent_with_output_empty(patch, compiler, lines, tree,
-                                                magic):
-    """
-    Test continue to look upword in the tree when output is empty
-    """
-    patch.object(Tree, 'expect')
-    parent = '1'
-    lines.lines = {'1': {'output': [], 'parent': '0'}}
-    # only do the recursion once
-    orig_method = compiler.find_parent_with_output
-    patch.object(compiler, 'find_parent_with_output')
-    result = orig_method(tree, parent)
-    compiler.find_parent_with_output.assert_called_with(tree, '0')
-    assert result == compiler.find_parent_with_output()
-
-
-def test_compiler_find_parent_with_no_service(patch, compiler, lines, tree,
-                                              magic):
-    """
-    Test continue to look upword in the tree when no service is defined
-    """
-    patch.object(Tree, 'expect')
-    parent = '1'
-    lines.lines = {'1': {
-        'output': ['.output.'], 'parent': '0', 'service': None}
-    }
-    # only do the recursion once
-    orig_method = compiler.find_parent_with_output
-    patch.object(compiler, 'find_parent_with_output')
-    result = orig_method(tree, parent)
-    compiler.find_parent_with_output.assert_called_with(tree, '0')
-    assert result == compiler.find_parent_with_output()
+    patch.object(tree, 'expect')
+    tree.expect.side_effect = [None, Exception('.error.')]
+    lines.output_parent.return_value = None
+    with raises(Exception) as e:
+        compiler.find_parent_with_output(tree, '2')
+    assert str(e.value) == '.error.'
+    tree.expect.assert_called_with(False, 'when_no_output_parent')
 
 
 def test_compiler_when(patch, compiler, lines, tree):
@@ -835,3 +793,22 @@ def test_compiler_compile(patch, magic):
                 'services': lines.get_services(), 'functions': lines.functions,
                 'entrypoint': lines.entrypoint()}
     assert result == expected
+
+
+def test_compiler_compile_concise(patch, magic):
+    patch.many(JSONCompiler, ['parse_tree'])
+    patch.object(Lines, 'entrypoint', return_value=None)
+    compiler = JSONCompiler(story=None, concise=True)
+    assert compiler.lines.concise is True
+    result = compiler.compile(magic())
+    assert result == {'version': version}
+
+
+def test_compiler_compile_source_map(patch, magic):
+    patch.many(JSONCompiler, ['parse_tree'])
+    patch.object(SourceMap, 'build')
+    tree = magic()
+    compiler = JSONCompiler(story=None)
+    result = compiler.compile(tree, source_map=True)
+    SourceMap.build.assert_called_with(tree, compiler.lines.order())
+    assert result['source_map'] == SourceMap.build()
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+from storyscript.Features import Features
+from storyscript.compiler.json import JSONBackend, JSONCompiler
+
+
+def test_json_backend_compile(patch):
+    patch.init(JSONCompiler)
+    patch.object(JSONCompiler, 'compile')
+    features = Features({'source_map': True})
+    result = JSONBackend.compile('tree', 'story', 'module', features)
+    JSONCompiler.__init__.assert_called_with('story', concise=False)
+    JSONCompiler.compile.assert_called_with('tree', source_map=True)
+    assert result == JSONCompiler.compile()
+
+
+def test_json_backend_compile_concise(patch):
+    patch.init(JSONCompiler)
+    patch.object(JSONCompiler, 'compile')
+    features = Features({'concise': True})
+    JSONBackend.compile('tree', 'story', 'module', features)
+    JSONCompiler.__init__.assert_called_with('story', concise=True)
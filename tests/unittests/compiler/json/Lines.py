@@ -19,7 +19,13 @@ def test_lines_init(lines):
     assert lines.variables == []
     assert lines.services == []
     assert lines.functions == {}
-    assert lines.output_scopes == []
+    assert lines.output_scopes == {}
+    assert lines.concise is False
+
+
+def test_lines_order(lines):
+    lines._lines = ['1', '1.1']
+    assert lines.order() == ['1', '1.1']
 
 
 def test_lines_first(patch, lines):
@@ -57,43 +63,89 @@ def test_lines_set_next(patch, lines):
 
 
 def test_lines_set_scope(patch, lines):
-    lines.output_scopes = []
     lines.set_scope('2', '1', [])
-    assert lines.output_scopes[0]['2'] == {'parent': '1', 'output': []}
+    assert lines.scopes == ['2']
+    assert lines.previous_scope == 'NO_NEXT'
+    assert lines.output_scopes['2'] == {'parent': '1', 'output': [],
+                                        'outputs': set(),
+                                        'output_parent': None}
 
 
 def test_lines_set_scope_output(lines):
-    lines.output_scopes = []
     lines.set_scope('2', '1', output=['x'])
-    assert lines.output_scopes[0]['2']['output'] == ['x']
+    assert lines.output_scopes['2']['output'] == ['x']
+    assert lines.output_scopes['2']['outputs'] == {'x'}
+
+
+def test_lines_set_scope_nested(lines):
+    """
+    Ensures nested scopes inherit the outputs of their enclosing scopes.
+    """
+    lines.set_scope('1', None, ['a'])
+    lines.set_scope('2', '1', ['b'])
+    assert lines.output_scopes['2']['outputs'] == {'a', 'b'}
+    assert lines.output_scopes['1']['outputs'] == {'a'}
+
+
+def test_lines_set_scope_output_parent(lines):
+    """
+    Ensures scopes remember the nearest enclosing service with an output.
+    """
+    lines.lines = {
+        '1': {'output': ['client'], 'service': 'http'},
+        '2': {'output': [], 'service': None},
+        '3': {'output': ['item'], 'service': None},
+    }
+    lines.set_scope('1', None, ['client'])
+    lines.set_scope('2', '1', [])
+    lines.set_scope('3', '2', ['item'])
+    assert lines.output_scopes['1']['output_parent'] == '1'
+    assert lines.output_scopes['2']['output_parent'] == '1'
+    assert lines.output_scopes['3']['output_parent'] == '1'
 
 
 def test_lines_finish_scope(lines):
-    lines.scopes = ['1', '2']
-    lines.output_scopes = [1, 2]
+    lines.set_scope('1', None, [])
+    lines.set_scope('2', '1', [])
     lines.finish_scope('.')
     assert lines.finished_scopes == ['2']
+    assert list(lines.output_scopes) == ['1']
     lines.finish_scope('.')
     assert lines.finished_scopes == ['2', '1']
+    assert lines.output_scopes == {}
 
 
 def test_lines_is_output(lines):
-    lines.output_scopes = [{'1': {'parent': None, 'output': ['service']}}]
+    lines.set_scope('1', None, ['service'])
     assert lines.is_output('1', 'service') is True
 
 
 def test_lines_is_output_from_parent(lines):
-    lines.output_scopes = [{
-        '2': {'parent': '1', 'output': []},
-        '1': {'output': ['service']}
-    }]
+    lines.set_scope('1', None, ['service'])
+    lines.set_scope('2', '1', [])
     assert lines.is_output('2', 'service') is True
 
 
+def test_lines_is_output_finished_scope(lines):
+    lines.set_scope('1', None, ['service'])
+    lines.finish_scope('1')
+    assert lines.is_output('1', 'service') is False
+
+
 def test_lines_is_output_false(lines):
     assert lines.is_output('1', 'service') is False
 
 
+def test_lines_output_parent(lines):
+    lines.lines = {'1': {'output': ['client'], 'service': 'http'}}
+    lines.set_scope('1', None, ['client'])
+    assert lines.output_parent('1') == '1'
+
+
+def test_lines_output_parent_none(lines):
+    assert lines.output_parent('1') is None
+
+
 def test_lines_make(lines):
     expected = {'1': {'method': 'method',
                       'ln': '1', 'col_start': '2', 'col_end': '3',
@@ -107,6 +159,14 @@ def test_lines_make(lines):
     assert lines.lines == expected
 
 
+def test_lines_make_concise(magic):
+    lines = Lines(story=magic(), concise=True)
+    lines.make('method', position_fixed, args=[], output=None, parent='0')
+    assert lines.lines == {'1': {'method': 'method', 'ln': '1',
+                                 'col_start': '2', 'col_end': '3',
+                                 'parent': '0', 'src': lines.story.line()}}
+
+
 @mark.parametrize('keywords', ['service', 'command', 'function', 'output',
                                'args', 'enter', 'exit', 'parent', 'name'])
 def test_lines_make_keywords(lines, keywords):
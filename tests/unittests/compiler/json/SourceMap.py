@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+from lark.lexer import Token
+
+from storyscript.compiler.json.SourceMap import SourceMap
+from storyscript.parser import Tree
+
+
+def token(line, column, end_column='None', end_line=None, value='a'):
+    token = Token('NAME', value, line=line, column=column)
+    token.end_line = end_line
+    token.end_column = end_column
+    return token
+
+
+def test_sourcemap_init():
+    source_map = SourceMap(['2.1', '2', '10'])
+    assert source_map.lines == ['2.1', '2', '10']
+    assert source_map.compiled == {'2.1', '2', '10'}
+    assert source_map.statements == [2, 10]
+    assert source_map.ranges == {}
+
+
+def test_sourcemap_owner():
+    source_map = SourceMap(['2.1', '2', '5'])
+    assert source_map.owner(token('2.1', 1)) == '2.1'
+    assert source_map.owner(token(2, 1)) == '2'
+    assert source_map.owner(token(4, 1)) == '2'
+    assert source_map.owner(token('4.1', 1)) == '2'
+    assert source_map.owner(token(7, 1)) == '5'
+    assert source_map.owner(token(1, 1)) is None
+
+
+def test_sourcemap_add():
+    source_map = SourceMap(['1'])
+    source_map.add(token(1, 5, end_column=7, end_line=1))
+    assert source_map.ranges == {'1': [1, 5, 1, 7]}
+    source_map.add(token(1, 1, end_column=2))
+    source_map.add(token(2, 3, value='abc'))
+    assert source_map.ranges == {'1': [1, 1, 2, 6]}
+
+
+def test_sourcemap_add_multi_line():
+    source_map = SourceMap(['1'])
+    source_map.add(token(1, 5, end_column=4, end_line=3))
+    assert source_map.ranges == {'1': [1, 5, 3, 4]}
+
+
+def test_sourcemap_add_template():
+    """
+    Ensures the end line of tokens evaluated from a string template is
+    ignored
+    """
+    source_map = SourceMap(['4.1', '4'])
+    source_map.add(token('4.1', 7, end_column=8, end_line=1))
+    assert source_map.ranges == {'4.1': [4, 7, 4, 8]}
+
+
+def test_sourcemap_add_no_position():
+    source_map = SourceMap(['1'])
+    source_map.add(token(None, 1))
+    source_map.add(token(1, 'None'))
+    source_map.add(token(1, None))
+    assert source_map.ranges == {}
+
+
+def test_sourcemap_source_ranges():
+    source_map = SourceMap(['4.1', '4.2', '4', '6'])
+    source_map.ranges = {'4.1': [4, 5, 4, 9], '4.2': [4, 1, 5, 2],
+                         '6': [6, 1, 6, 3]}
+    assert source_map.source_ranges() == {4: [4, 1, 5, 2], 6: [6, 1, 6, 3]}
+
+
+def test_sourcemap_add_statement():
+    source_map = SourceMap(['4.1', '4.2', '4'])
+    source_map.add_statement('4', {4: [4, 1, 5, 2]})
+    assert source_map.ranges['4'] == [4, 1, 5, 2]
+
+
+def test_sourcemap_add_statement_no_ranges():
+    source_map = SourceMap(['4'])
+    source_map.add_statement('4', {})
+    assert source_map.ranges == {}
+
+
+def test_sourcemap_build():
+    tree = Tree('start', [
+        Tree('a', [token('2.1', 5, end_column=6)]),
+        Tree('b', [token(2, 1, end_column=2), token(3, 3, end_column=5)]),
+        Tree('c', [token(None, 1)]),
+    ])
+    result = SourceMap.build(tree, ['2.1', '2', '7'])
+    assert result == {'2.1': [2, 5, 2, 6], '2': [2, 1, 3, 5]}
+    assert list(result) == ['2.1', '2']
@@ -3,21 +3,29 @@ from lark.lexer import Token
 
 from pytest import fixture
 
+from storyscript.FakeLine import FakeLine
 from storyscript.compiler.lowering import FakeTree
 from storyscript.parser import Tree
 
 
 @fixture
 def fake_tree(block):
+    block.line.return_value = '1'
     return FakeTree(block)
 
 
 def test_faketree_init(block, fake_tree):
     assert fake_tree.block == block
     assert fake_tree.original_line == str(block.line())
+    assert fake_tree.source_line == 1
     assert fake_tree.new_lines == {}
 
 
+def test_faketree_init_fake_line(block):
+    block.line.return_value = FakeLine(4, 2)
+    assert FakeTree(block).source_line == 4
+
+
 def test_faketree_check_existing_empty(block, fake_tree):
     """
     Checks checking for fake lines with an empty block
@@ -45,7 +53,7 @@ def test_faketree_check_existing_with_fake(block, fake_tree):
     block.children = [
         Tree('assignment', [Tree('path', [Token('NAME', 'foo', line='1')])]),
         Tree('assignment', [Tree('path',
-             [Token('NAME', '__p-bar', line='1.1')])]),
+             [Token('NAME', '__p-bar', line=FakeLine(1, 1))])]),
     ]
     fake_tree._check_existing_fake_lines(block)
     assert fake_tree.new_lines == {'__p-bar': False}
@@ -57,13 +65,13 @@ def test_faketree_check_existing_multiple_fake(block, fake_tree):
     """
     block.children = [
         Tree('assignment', [Tree('path',
-             [Token('NAME', '__p-bar1', line='1.1')])]),
+             [Token('NAME', '__p-bar1', line=FakeLine(1, 1))])]),
         Tree('assignment', [Tree('path', [Token('NAME', 'foo', line='1')])]),
         Tree('assignment', [Tree('path',
-             [Token('NAME', '__p-bar2', line='2.1')])]),
+             [Token('NAME', '__p-bar2', line=FakeLine(2, 1))])]),
         Tree('assignment', [Tree('path', [Token('NAME', 'foo', line='2')])]),
         Tree('assignment', [Tree('path',
-             [Token('NAME', '__p-bar3', line='3.1')])]),
+             [Token('NAME', '__p-bar3', line=FakeLine(3, 1))])]),
     ]
     fake_tree._check_existing_fake_lines(block)
     assert fake_tree.new_lines == {
@@ -76,17 +84,18 @@ def test_faketree_line(patch, fake_tree):
     """
     Ensures FakeTree.line can create a fake line number
     """
-    fake_tree.original_line = '1'
+    fake_tree.source_line = 1
     result = fake_tree.line()
     assert fake_tree.new_lines == {'1.1': None}
     assert result == '1.1'
+    assert (result.line, result.index) == (1, 1)
 
 
 def test_faketree_line_successive(patch, fake_tree):
     """
     Ensures FakeTree.line takes into account FakeTree.new_lines
     """
-    fake_tree.original_line = '1.1'
+    fake_tree.source_line = 1
     fake_tree.new_lines = {'1.1': None}
     assert fake_tree.line() == '1.2'
 
@@ -343,14 +343,14 @@ def test_objects_flatten_template_no_templates(patch, tree):
 
 def test_objects_flatten_template_only_templates(patch, tree):
     result = list(Lowering.flatten_template(tree, '{hello}'))
-    assert result == [{'$OBJECT': 'code', 'code': 'hello'}]
+    assert result == [{'$OBJECT': 'code', 'code': 'hello', 'offset': 1}]
 
 
 def test_objects_flatten_template_mixed(patch, tree):
     result = list(Lowering.flatten_template(tree, 'a{hello}b'))
     assert result == [
         flatten_to_string('a'),
-        {'$OBJECT': 'code', 'code': 'hello'},
+        {'$OBJECT': 'code', 'code': 'hello', 'offset': 2},
         flatten_to_string('b')
     ]
 
@@ -380,11 +380,22 @@ def test_objects_flatten_template_escapes4(patch, tree):
     result = list(Lowering.flatten_template(tree, r'\\{\\}\\'))
     assert result == [
         flatten_to_string(r'\\'),
-        {'$OBJECT': 'code', 'code': '\\'},
+        {'$OBJECT': 'code', 'code': '\\', 'offset': 3},
         flatten_to_string(r'\\')
     ]
 
 
+def test_objects_template_column(magic):
+    tree = magic()
+    tree.column.return_value = '5'
+    tree.child(0).type = 'DOUBLE_QUOTED'
+    tree.child(0).value = 'ab {a}\n{b}'
+    assert Lowering.template_column(tree, 4) == 10
+    assert Lowering.template_column(tree, 8) == 6
+    tree.child(0).type = 'DOUBLE_QUOTED_HEREDOC'
+    assert Lowering.template_column(tree, 4) == 12
+
+
 def test_objects_flatten_template_escapes_newlines(patch, tree):
     result = list(Lowering.flatten_template(tree, r'\n\n'))
     assert result == [
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+from lark.lexer import Token
+
+from pytest import mark
+
+from storyscript.compiler.optimizer.ConstantFolding import ConstantFolding, \
+    Literal
+from storyscript.parser import Tree
+
+
+def literal(kind, type, value):
+    return Tree('expression', [
+        Tree('entity', [
+            Tree('values', [
+                Tree(kind, [Token(type, value, line=1, column=5)])
+            ])
+        ])
+    ])
+
+
+def path(name):
+    return Tree('expression', [
+        Tree('entity', [
+            Tree('path', [Token('NAME', name, line=1, column=5)])
+        ])
+    ])
+
+
+def nary(op, *operands):
+    operator = Tree('arith_operator', [Token(op, op, line=1, column=7)])
+    return Tree('expression', [operands[0], operator, *operands[1:]])
+
+
+def value_token(tree):
+    return tree.entity.values.child(0).child(0)
+
+
+@mark.parametrize('kind,type,value,result', [
+    ('number', 'INT', '12', 12),
+    ('number', 'INT', '-12', -12),
+    ('number', 'FLOAT', '1.5', 1.5),
+    ('string', 'DOUBLE_QUOTED', 'a\\n', 'a\n'),
+    ('boolean', 'TRUE', 'true', True),
+    ('boolean', 'FALSE', 'false', False),
+    ('time', 'RAW_TIME', '1s', 1000),
+])
+def test_literal_from_expression(kind, type, value, result):
+    literal_ = Literal.from_expression(literal(kind, type, value))
+    assert literal_.kind == kind
+    assert literal_.value == result
+
+
+def test_literal_from_expression_path():
+    assert Literal.from_expression(path('a')) is None
+
+
+def test_literal_from_expression_nary():
+    tree = nary('PLUS', literal('number', 'INT', '1'),
+                literal('number', 'INT', '2'))
+    assert Literal.from_expression(tree) is None
+
+
+@mark.parametrize('kind,value,token', [
+    ('number', 7, ('INT', '7')),
+    ('number', 2.5, ('FLOAT', '2.5')),
+    ('number', 2 ** 63, None),
+    ('number', float('inf'), None),
+    ('string', 'a\n"', ('DOUBLE_QUOTED', 'a\\n"')),
+    ('boolean', True, ('TRUE', 'true')),
+    ('boolean', False, ('FALSE', 'false')),
+    ('time', 1500, ('RAW_TIME', '1500ms')),
+    ('time', -1, None),
+])
+def test_literal_token(kind, value, token):
+    result = Literal(kind, value).token()
+    if token is None:
+        assert result is None
+    else:
+        assert (result.type, result.value) == token
+
+
+def test_constant_folding_init():
+    assert ConstantFolding().eliminated == 0
+
+
+def test_constant_folding_process(patch):
+    patch.object(ConstantFolding, 'visit')
+    folding = ConstantFolding()
+    folding.eliminated = 3
+    assert folding.process('tree') == 3
+    ConstantFolding.visit.assert_called_with('tree')
+
+
+def test_constant_folding_sum():
+    tree = nary('PLUS', literal('number', 'INT', '1'),
+                literal('number', 'INT', '2'),
+                literal('number', 'INT', '3'))
+    folding = ConstantFolding()
+    folding.process(tree)
+    token = value_token(tree)
+    assert (token.type, token.value) == ('INT', '6')
+    assert token.line == '1'
+    assert tree.kind == 'primary_expression'
+    assert folding.eliminated == 10
+
+
+def test_constant_folding_nested():
+    inner = nary('MULTIPLIER', literal('number', 'INT', '2'),
+                 literal('number', 'INT', '3'))
+    tree = nary('DASH', literal('number', 'INT', '1'), inner)
+    ConstantFolding().process(tree)
+    assert value_token(tree).value == '-5'
+
+
+@mark.parametrize('op,operands,result', [
+    ('EQUAL', [('string', 'DOUBLE_QUOTED', 'a'),
+               ('string', 'DOUBLE_QUOTED', 'a')], ('TRUE', 'true')),
+    ('LESSER', [('time', 'RAW_TIME', '1m'),
+                ('time', 'RAW_TIME', '1s')], ('FALSE', 'false')),
+    ('OR', [('boolean', 'FALSE', 'false'),
+            ('boolean', 'TRUE', 'true')], ('TRUE', 'true')),
+    ('PLUS', [('time', 'RAW_TIME', '1s'),
+              ('time', 'RAW_TIME', '5ms')], ('RAW_TIME', '1005ms')),
+])
+def test_constant_folding_operators(op, operands, result):
+    tree = nary(op, *(literal(*operand) for operand in operands))
+    ConstantFolding().process(tree)
+    token = value_token(tree)
+    assert (token.type, token.value) == result
+
+
+def test_constant_folding_not():
+    not_ = Token('NOT', 'not', line=1, column=1)
+    operator = Tree('unary_operator', [not_])
+    tree = Tree('expression', [operator, literal('boolean', 'TRUE', 'true')])
+    ConstantFolding().process(tree)
+    assert value_token(tree).type == 'FALSE'
+
+
+@mark.parametrize('op', ['BSLASH', 'MODULUS', 'POWER'])
+def test_constant_folding_runtime_operators(op):
+    tree = nary(op, literal('number', 'INT', '7'),
+                literal('number', 'INT', '2'))
+    folding = ConstantFolding()
+    folding.process(tree)
+    assert len(tree.children) == 3
+    assert folding.eliminated == 0
+
+
+def test_constant_folding_path():
+    tree = nary('PLUS', path('a'), literal('number', 'INT', '2'))
+    ConstantFolding().process(tree)
+    assert len(tree.children) == 3
+
+
+def test_constant_folding_cast():
+    cast = Tree('as_operator', [
+        Tree('types', [
+            Tree('base_type', [Token('FLOAT_TYPE', 'float')])
+        ])
+    ])
+    tree = Tree('expression', [literal('number', 'INT', '2'), cast])
+    ConstantFolding().process(tree)
+    token = value_token(tree)
+    assert (token.type, token.value) == ('FLOAT', '2.0')
+
+
+def test_constant_folding_cast_string():
+    cast = Tree('as_operator', [
+        Tree('types', [
+            Tree('base_type', [Token('STRING_TYPE', 'string')])
+        ])
+    ])
+    tree = Tree('expression', [literal('number', 'INT', '2'), cast])
+    ConstantFolding().process(tree)
+    assert tree.child(1) == cast
+
+
+def test_constant_folding_join_strings():
+    """
+    Ensures adjacent strings of a flattened template are joined.
+    """
+    inner = nary('PLUS', literal('string', 'DOUBLE_QUOTED', 'a'), path('b'))
+    tree = nary('PLUS', inner, literal('string', 'DOUBLE_QUOTED', 'c'),
+                literal('string', 'DOUBLE_QUOTED', 'd'))
+    ConstantFolding().process(tree)
+    assert tree.child(0) == inner.child(0)
+    assert tree.child(2) == path('b')
+    assert value_token(tree.child(3)).value == 'cd'
+    assert len(tree.children) == 4
+
+
+def test_constant_folding_join_strings_escapes():
+    """
+    Ensures escape codes aren't merged across strings.
+    """
+    tree = nary('PLUS', literal('string', 'DOUBLE_QUOTED', '\\1'),
+                literal('string', 'DOUBLE_QUOTED', '2'))
+    ConstantFolding().process(tree)
+    assert value_token(tree).value == '\\x012'
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+from lark.lexer import Token
+
+from pytest import fixture, mark, raises
+
+from storyscript.compiler.optimizer.DeadCodeElimination import \
+    DeadCodeElimination
+from storyscript.exceptions import CompilerError
+from storyscript.parser import Tree
+
+
+def name(value):
+    return Token('NAME', value, line=1, column=1)
+
+
+def path(value):
+    return Tree('path', [name(value)])
+
+
+def read(value):
+    return Tree('expression', [Tree('entity', [path(value)])])
+
+
+def number(value):
+    token = Token('INT', value, line=1, column=5)
+    return Tree('expression', [
+        Tree('entity', [Tree('values', [Tree('number', [token])])])
+    ])
+
+
+def assignment(target, value):
+    fragment = Tree('assignment_fragment', [
+        Token('EQUALS', '='),
+        Tree('base_expression', [value])
+    ])
+    return Tree('assignment', [target, fragment])
+
+
+def rules(statement):
+    return Tree('block', [Tree('rules', [statement])])
+
+
+def cast(value, type, name):
+    base_type = Tree('base_type', [Token(type, name)])
+    return Tree('expression', [
+        value,
+        Tree('as_operator', [Tree('types', [base_type])])
+    ])
+
+
+def statement(data):
+    return rules(Tree(data, [Token(data.upper(), data)]))
+
+
+@fixture
+def dce():
+    return DeadCodeElimination()
+
+
+def test_dead_code_elimination_init(dce):
+    assert dce.eliminated == 0
+
+
+def test_dead_code_elimination_process(patch, dce):
+    patch.many(DeadCodeElimination, ['unreachable', 'inline_temporaries',
+                                     'unused_assignments'])
+    DeadCodeElimination.inline_temporaries.return_value = False
+    DeadCodeElimination.unused_assignments.return_value = False
+    tree = Tree('start', [])
+    assert dce.process(tree) == 0
+    DeadCodeElimination.unreachable.assert_called_with(tree)
+
+
+@mark.parametrize('data', ['return_statement', 'throw_statement',
+                           'break_statement', 'continue_statement'])
+def test_dead_code_elimination_terminates(data):
+    assert DeadCodeElimination.terminates(statement(data))
+
+
+def test_dead_code_elimination_terminates_assignment():
+    block = rules(assignment(path('a'), number('1')))
+    assert DeadCodeElimination.terminates(block) is False
+
+
+def test_dead_code_elimination_unreachable(dce):
+    nested = Tree('nested_block', [
+        statement('break_statement'),
+        rules(assignment(path('a'), number('1')))
+    ])
+    dce.unreachable(Tree('start', [nested]))
+    assert len(nested.children) == 1
+
+
+def test_dead_code_elimination_unreachable_start(dce):
+    """
+    Ensures statements at the top of a story are kept.
+    """
+    tree = Tree('start', [
+        statement('throw_statement'),
+        statement('break_statement')
+    ])
+    dce.unreachable(tree)
+    assert len(tree.children) == 2
+
+
+def test_dead_code_elimination_unreachable_check(dce):
+    """
+    Ensures errors of unreachable code are still reported.
+    """
+    time = Tree('time', [Token('RAW_TIME', '1s1s', line=1, column=1)])
+    nested = Tree('nested_block', [
+        statement('break_statement'),
+        rules(assignment(path('a'), time))
+    ])
+    with raises(CompilerError):
+        dce.unreachable(Tree('start', [nested]))
+
+
+def test_dead_code_elimination_assigned_name():
+    a = path('a')
+    assert DeadCodeElimination.assigned_name(assignment(a, number('1'))) == \
+        a.child(0)
+
+
+def test_dead_code_elimination_assigned_name_property():
+    target = Tree('path', [name('a'), Tree('path_fragment', [name('b')])])
+    assert DeadCodeElimination.assigned_name(
+        assignment(target, number('1'))) is None
+
+
+def test_dead_code_elimination_reads():
+    tree = Tree('start', [
+        rules(assignment(path('a'), read('b'))),
+        rules(assignment(path('b'), read('b'))),
+    ])
+    assert DeadCodeElimination.reads(tree) == {'b': 2}
+
+
+@mark.parametrize('value,pure', [
+    (number('1'), True),
+    (read('a'), True),
+    (path('a'), True),
+    (Tree('expression', [number('1'),
+                         Tree('mul_operator', [Token('BSLASH', '/')]),
+                         number('2')]), False),
+    (cast(read('a'), 'INTEGER_TYPE', 'int'), False),
+    (cast(number('1'), 'STRING_TYPE', 'string'), True),
+    (Tree('expression', [Tree('entity', [
+        Tree('path', [name('a'), Tree('path_fragment', [name('b')])])
+    ])]), False),
+    (Tree('service', [path('http')]), False),
+    (Tree('call_expression', [path('f')]), False),
+])
+def test_dead_code_elimination_is_pure(value, pure):
+    assert DeadCodeElimination.is_pure(assignment(path('a'), value)) is pure
+
+
+def test_dead_code_elimination_is_temporary():
+    assert DeadCodeElimination.is_temporary(
+        assignment(path('__p-1.1'), number('1')))
+    assert not DeadCodeElimination.is_temporary(
+        assignment(path('a'), number('1')))
+    assert not DeadCodeElimination.is_temporary(Tree('rules', []))
+
+
+def test_dead_code_elimination_unused_assignments(dce):
+    used = rules(assignment(path('a'), number('1')))
+    unused = rules(assignment(path('b'), number('2')))
+    reader = rules(Tree('return_statement', [read('a')]))
+    tree = Tree('start', [used, unused, reader])
+    assert dce.unused_assignments(tree)
+    assert tree.children == [used, reader]
+    assert dce.unused_assignments(tree) is False
+
+
+def test_dead_code_elimination_unused_assignments_nested(dce):
+    """
+    Ensures nested blocks aren't emptied.
+    """
+    nested = Tree('nested_block', [rules(assignment(path('a'), number('1')))])
+    tree = Tree('start', [nested])
+    assert dce.unused_assignments(tree) is False
+    assert len(nested.children) == 1
+
+
+def test_dead_code_elimination_unused_temporary(dce):
+    temporary = assignment(path('__p-1.1'), number('1'))
+    statement = Tree('rules', [Tree('return_statement', [])])
+    block = Tree('block', [temporary, statement])
+    tree = Tree('start', [block])
+    assert dce.unused_assignments(tree)
+    assert block.children == [statement]
+
+
+def test_dead_code_elimination_find_read():
+    expression = read('a')
+    tree = Tree('rules', [Tree('return_statement', [expression])])
+    assert DeadCodeElimination.find_read(tree, 'a') == expression
+    assert DeadCodeElimination.find_read(tree, 'b') is None
+
+
+def test_dead_code_elimination_inline_temporaries(dce):
+    temporary = assignment(path('__p-1.1'), number('1'))
+    reader = read('__p-1.1')
+    statement = Tree('rules', [assignment(path('a'), reader)])
+    block = Tree('block', [temporary, statement])
+    assert dce.inline_temporaries(Tree('start', [block]))
+    assert block.children == [statement]
+    assert reader == number('1')
+
+
+def test_dead_code_elimination_inline_temporaries_impure(dce):
+    """
+    Ensures temporaries aren't moved past temporaries with side effects.
+    """
+    temporary = assignment(path('__p-1.1'), number('1'))
+    call = assignment(path('__p-1.2'), Tree('call_expression', [path('f')]))
+    statement = Tree('rules', [assignment(path('a'), read('__p-1.1'))])
+    block = Tree('block', [temporary, call, statement])
+    assert dce.inline_temporaries(Tree('start', [block])) is False
+    assert block.children == [temporary, call, statement]
+
+
+def test_dead_code_elimination_inline_temporaries_compound(dce):
+    """
+    Ensures temporaries aren't inlined into compound statements, which
+    might evaluate them many times.
+    """
+    temporary = assignment(path('__p-1.1'), number('1'))
+    loop = Tree('while_block', [read('__p-1.1')])
+    block = Tree('block', [temporary, loop])
+    assert dce.inline_temporaries(Tree('start', [block])) is False
+
+
+def test_dead_code_elimination_replace_path():
+    expression = read('__p-1.1')
+    DeadCodeElimination.replace(expression, path('a'))
+    assert expression == read('a')
+    assert expression.kind == 'primary_expression'
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+import gc
+from weakref import WeakKeyDictionary
+
+from pytest import fixture
+
+import storyscript.compiler.semantics.ActionValidator as ValidatorModule
+from storyscript.compiler.semantics.ActionValidator import ActionValidator
+from storyscript.hub.TypeMappings import TypeMappings
+
+
+@fixture
+def action(magic):
+    action = magic()
+    first, second = magic(), magic()
+    first.name.return_value = 'a'
+    first.required.return_value = True
+    second.name.return_value = 'b'
+    second.required.return_value = False
+    action.args.return_value = [first, second]
+    return action
+
+
+@fixture
+def validators(patch):
+    patch.object(ActionValidator, 'validators', WeakKeyDictionary())
+    return ActionValidator.validators
+
+
+def test_action_validator_init(patch, action):
+    patch.object(TypeMappings, 'get_type_instance',
+                 side_effect=lambda var: var.name())
+    validator = ActionValidator(action)
+    assert validator.action == action
+    assert validator.required == ['a']
+    assert validator.types == {'a': 'a', 'b': 'b'}
+
+
+def test_action_validator_get(patch, magic, action, validators):
+    patch.init(ActionValidator)
+    hub = magic()
+    validator = ActionValidator.get(hub, action, 'http', 'fetch')
+    ActionValidator.__init__.assert_called_with(action)
+    validator.action = action
+    assert ActionValidator.get(hub, action, 'http', 'fetch') is validator
+    assert ActionValidator.__init__.call_count == 1
+    assert validators[hub] == {('http', 'fetch'): validator}
+
+
+def test_action_validator_get_other_action(patch, magic, validators):
+    hub = magic()
+    first = ActionValidator.get(hub, magic(), 'client', 'write')
+    second = ActionValidator.get(hub, magic(), 'client', 'write')
+    assert first is not second
+    assert validators[hub] == {('client', 'write'): second}
+
+
+def test_action_validator_get_other_hub(patch, magic, action, validators):
+    """
+    Ensures validators aren't shared by hubs and are dropped with their hub.
+    """
+    patch.init(ActionValidator)
+    first, second = magic(), magic()
+    validator = ActionValidator.get(first, action, 'http', 'fetch')
+    assert ActionValidator.get(second, action, 'http', 'fetch') is not \
+        validator
+    del first
+    gc.collect()
+    assert list(validators) == [second]
+
+
+def test_action_validator_check(patch, magic, action):
+    patch.object(TypeMappings, 'get_type_instance',
+                 side_effect=lambda var: var.name())
+    patch.object(ValidatorModule, 'implicit_type_cast')
+    tree, sym, node = magic(), magic(), magic()
+    ActionValidator(action).check(tree, {'a': (sym, node)}, 'http', 'fetch')
+    tree.expect.assert_any_call(True, 'service_arg_required',
+                                service='http', action='fetch', arg='a')
+    tree.expect.assert_called_with(True, 'service_arg_invalid',
+                                   service='http', action='fetch', arg='a')
+    ValidatorModule.implicit_type_cast.assert_called_with(
+        tree, sym.type(), 'a', 'http', 'fetch', 'a', node)
+
+
+def test_action_validator_check_missing(patch, magic, action):
+    patch.object(TypeMappings, 'get_type_instance')
+    tree = magic()
+    ActionValidator(action).check(tree, {}, 'http', 'fetch')
+    tree.expect.assert_called_with(False, 'service_arg_required',
+                                   service='http', action='fetch', arg='a')
+
+
+def test_action_validator_check_invalid(patch, magic, action):
+    patch.object(TypeMappings, 'get_type_instance')
+    patch.object(ValidatorModule, 'implicit_type_cast')
+    tree = magic()
+    args = {'a': (magic(), magic()), 'c': (magic(), magic())}
+    ActionValidator(action).check(tree, args, 'http', 'fetch')
+    tree.expect.assert_called_with(False, 'service_arg_invalid',
+                                   service='http', action='fetch', arg='c')
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+from lark.lexer import Token
+
+import storyscript.compiler.semantics.ServiceTyping as ServiceTypingModule
+from storyscript.compiler.semantics.ActionValidator import ActionValidator
+from storyscript.compiler.semantics.ServiceTyping import ServiceTyping
+from storyscript.parser import Tree
+
+
+def service(name, *fragments):
+    path = Tree('path', [Token('NAME', name)])
+    return Tree('service', [path, Tree('service_fragment', list(fragments))])
+
+
+def test_service_typing_init(patch):
+    patch.object(ServiceTyping, 'find_hub')
+    service_typing = ServiceTyping()
+    ServiceTyping.find_hub.assert_called_with(None)
+    assert service_typing.hub == ServiceTyping.find_hub()
+    assert service_typing.services == {}
+
+
+def test_service_typing_init_services(patch):
+    patch.object(ServiceTyping, 'find_hub')
+    service_typing = ServiceTyping(snapshot='hub.json',
+                                   services={'http': 'data'})
+    ServiceTyping.find_hub.assert_called_with('hub.json')
+    assert service_typing.services == {'http': 'data'}
+
+
+def test_service_typing_find_hub(patch):
+    patch.many(ServiceTypingModule, ['story_hub', 'hub_snapshot'])
+    hub = ServiceTyping.find_hub(None)
+    assert hub == ServiceTypingModule.story_hub()
+    assert ServiceTypingModule.hub_snapshot.call_count == 0
+
+
+def test_service_typing_find_hub_snapshot(patch):
+    patch.many(ServiceTypingModule, ['story_hub', 'hub_snapshot'])
+    hub = ServiceTyping.find_hub('hub.json')
+    ServiceTypingModule.hub_snapshot.assert_called_with('hub.json')
+    assert hub == ServiceTypingModule.hub_snapshot()
+    assert ServiceTypingModule.story_hub.call_count == 0
+
+
+def test_service_typing_service_names():
+    output = Tree('output', [Token('NAME', 'client')])
+    when = Tree('when_block', [service('client', Token('NAME', 'listen'))])
+    concise = Tree('concise_when_block', [Token('NAME', 'twitter'),
+                                          Token('NAME', 'stream')])
+    tree = Tree('block', [
+        service('http', Token('NAME', 'server'), output), when, concise,
+        service('client', Token('NAME', 'write')),
+        Tree('service', [Tree('path', [Token('NAME', 'a'),
+                                       Token('NAME', 'b')])]),
+    ])
+    assert ServiceTyping.service_names(tree) == {'http', 'twitter'}
+
+
+def test_service_typing_prefetch(patch, magic):
+    hub = magic()
+    patch.object(ServiceTyping, 'find_hub', return_value=hub)
+    result = ServiceTyping.prefetch({'slack', 'http'}, snapshot='hub.json')
+    ServiceTyping.find_hub.assert_called_with('hub.json')
+    hub.get.assert_any_call('http', wrap_service=True)
+    hub.get.assert_any_call('slack', wrap_service=True)
+    assert hub.get.call_count == 2
+    assert result == {'http': hub.get(), 'slack': hub.get()}
+
+
+def test_service_typing_enforce_service_data(patch, magic):
+    patch.object(ServiceTyping, 'find_hub')
+    tree = magic()
+    service_typing = ServiceTyping()
+    result = service_typing.enforce_service_data(tree, 'http')
+    service_typing.hub.get.assert_called_with('http', wrap_service=True)
+    tree.expect.assert_called_with(True, 'service_not_found', name='http')
+    assert result == service_typing.hub.get()
+
+
+def test_service_typing_enforce_service_data_prefetched(patch, magic):
+    patch.object(ServiceTyping, 'find_hub')
+    tree = magic()
+    service_typing = ServiceTyping(services={'http': 'data', 'nope': None})
+    assert service_typing.enforce_service_data(tree, 'http') == 'data'
+    service_typing.enforce_service_data(tree, 'nope')
+    tree.expect.assert_called_with(False, 'service_not_found', name='nope')
+    assert service_typing.hub.get.call_count == 0
+
+
+def test_service_typing_check_action_args(patch, magic):
+    patch.object(ServiceTyping, 'find_hub')
+    patch.object(ActionValidator, 'get')
+    tree, action = magic(), magic()
+    service_typing = ServiceTyping()
+    service_typing.check_action_args(tree, action, {}, 'http', 'fetch')
+    ActionValidator.get.assert_called_with(service_typing.hub, action,
+                                           'http', 'fetch')
+    ActionValidator.get().check.assert_called_with(tree, {}, 'http', 'fetch')
@@ -26,3 +26,27 @@ def test_a_selective_visitor():
     visitor = TestVisitor()
     visitor.visit(tree)
     assert visitor._node == 2
+
+
+def test_selective_visitor_dispatch():
+    """
+    Dispatch is resolved once per visitor class and respects inheritance.
+    """
+
+    class BaseTestVisitor(SelectiveVisitor):
+        def a(self, tree):
+            return 'a'
+
+    class TestVisitor(BaseTestVisitor):
+        def b(self, tree):
+            return 'b'
+
+    visitor = TestVisitor(module=None)
+    assert visitor.visit(Tree('a', [])) == 'a'
+    assert visitor.visit(Tree('b', [])) == 'b'
+    assert visitor.visit(Tree('c', [])) is None
+    table = TestVisitor.dispatch_table()
+    assert table['a'] is BaseTestVisitor.__dict__['a']
+    assert table['b'] is TestVisitor.__dict__['b']
+    assert 'c' not in table
+    assert BaseTestVisitor(module=None).visit(Tree('b', [])) is None
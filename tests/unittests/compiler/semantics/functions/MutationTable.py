@@ -0,0 +1,136 @@
+import gc
+import weakref
+
+from storyscript.compiler.semantics.functions.HubMutations import Hub
+from storyscript.compiler.semantics.functions.Mutation import Mutation
+from storyscript.compiler.semantics.functions.MutationBuilder import \
+    mutation_builder
+from storyscript.compiler.semantics.functions.MutationTable import \
+    MutationOverloads, MutationTable
+from storyscript.compiler.semantics.types.Types import AnyType, IntType, \
+    ListType, ObjectType, StringType
+
+
+mutations = [
+    'int increment -> int',
+    'int add a:int -> int',
+    'int add b:int c:int -> int',
+    'string add a:string -> string',
+    'List[A] length -> int',
+]
+
+
+def table():
+    mt = MutationTable()
+    for m in mutations:
+        mt.insert(mutation_builder(m))
+    return mt
+
+
+def test_compute_arg_names_key():
+    assert Mutation.compute_arg_names_key(['a', 'b']) == \
+        Mutation.compute_arg_names_key(['b', 'a'])
+    assert Mutation.compute_arg_names_key(['a', 'b']) != \
+        Mutation.compute_arg_names_key(['a'])
+
+
+def test_mutation_table_resolve():
+    mo = table().resolve(IntType.instance(), 'add')
+    assert mo.name() == 'add'
+    assert mo.type() == IntType.instance()
+    assert [m.cmp_name() for m in mo.all()] == ['adda', 'addb,c']
+    assert mo.single() is None
+    assert mo.match(['c', 'b'])[0].cmp_name() == 'addb,c'
+    assert mo.match(['b']) is None
+
+
+def test_mutation_table_resolve_single():
+    mo = table().resolve(IntType.instance(), 'increment')
+    assert mo.single().name() == 'increment'
+
+
+def test_mutation_table_resolve_unknown():
+    mt = table()
+    assert mt.resolve(IntType.instance(), 'foo') is None
+    assert mt.resolve(StringType.instance(), 'increment') is None
+
+
+def test_mutation_table_resolve_any():
+    mo = table().resolve(AnyType.instance(), 'add')
+    assert mo.type() == AnyType.instance()
+    assert len(mo.all()) == 3
+    assert len(mo.match(['a'])) == 2
+
+
+def test_mutation_table_resolve_cached(patch):
+    mt = table()
+    patch.object(MutationOverloads, 'build_index',
+                 side_effect=MutationOverloads.build_index)
+    mo = mt.resolve(IntType.instance(), 'add')
+    assert mt.resolve(IntType(), 'add') is mo
+    assert MutationOverloads.build_index.call_count == 1
+
+
+def test_mutation_table_resolve_generic():
+    mt = table()
+    l1 = mt.resolve(ListType(IntType.instance()), 'length')
+    l2 = mt.resolve(ListType(StringType.instance()), 'length')
+    assert l1.type() == ListType(IntType.instance())
+    assert l2.type() == ListType(StringType.instance())
+    assert l1.all() is l2.all()
+
+
+def test_mutation_table_resolve_not_cacheable():
+    mt = table()
+    obj = ListType(ObjectType(obj='.obj.'))
+    assert mt.resolve(obj, 'length').type().inner.object() == '.obj.'
+    assert mt._resolved == {}
+
+
+def test_mutation_table_insert_invalidates():
+    mt = table()
+    assert mt.resolve(StringType.instance(), 'increment') is None
+    mt.insert(mutation_builder('string increment -> string'))
+    assert mt.resolve(StringType.instance(), 'increment') is not None
+
+
+def test_mutation_table_names():
+    mt = table()
+    assert mt.names(IntType.instance()) == ['add', 'increment']
+    assert mt.names(ListType(IntType.instance())) == ['length']
+    assert mt.names(ObjectType(None)) == []
+    assert mt.names(AnyType.instance()) == ['add', 'increment', 'length']
+
+
+def test_mutation_table_init_cached(patch):
+    hub = Hub('int increment -> int')
+    patch.object(Hub, 'instance', return_value=hub)
+    mt = MutationTable.init()
+    assert MutationTable.init() is mt
+    assert mt.resolve(IntType.instance(), 'increment') is not None
+
+
+def test_mutation_table_init_hub_swapped(patch):
+    """
+    Ensures a new table is built when the Hub is replaced.
+    """
+    patch.object(Hub, 'instance', return_value=Hub('int increment -> int'))
+    first = MutationTable.init()
+    Hub.instance.return_value = Hub('int decrement -> int')
+    second = MutationTable.init()
+    assert second is not first
+    assert second.resolve(IntType.instance(), 'increment') is None
+    assert second.resolve(IntType.instance(), 'decrement') is not None
+
+
+def test_mutation_table_init_hub_released(patch):
+    """
+    Ensures the table of a replaced Hub doesn't outlive it.
+    """
+    patch.object(Hub, 'instance')
+    Hub.instance.return_value = Hub('int increment -> int')
+    MutationTable.init()
+    hub = weakref.ref(Hub.instance.return_value)
+    Hub.instance.return_value = Hub('int decrement -> int')
+    gc.collect()
+    assert hub() is None
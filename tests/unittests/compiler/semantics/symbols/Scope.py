@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
-from storyscript.compiler.semantics.symbols.Scope import Scope
-from storyscript.compiler.semantics.symbols.Symbols import Symbols
+from storyscript.compiler.semantics.symbols.Scope import Scope, ScopeJoiner
+from storyscript.compiler.semantics.symbols.Symbols import Symbol, Symbols
+from storyscript.compiler.semantics.types.Types import IntType, StringType
 
 
 def test_scope_pretty_none(patch):
@@ -54,3 +55,80 @@ def test_scope_scopes_multiple():
     assert r[0] is s3
     assert r[1] is s2
     assert r[2] is s1
+
+
+def test_scope_resolve_parent():
+    s1 = Scope()
+    s2 = Scope(parent=s1)
+    s3 = Scope(parent=s2)
+    a = Symbol('a', IntType.instance())
+    s1.insert(a)
+    assert s3.resolve('a') is a
+    assert s2.resolve('a') is a
+    assert s3.resolve('b') is None
+
+
+def test_scope_resolve_cached(patch):
+    s1 = Scope()
+    s2 = Scope(parent=s1)
+    s3 = Scope(parent=s2)
+    a = Symbol('a', IntType.instance())
+    s1.insert(a)
+    assert s3.resolve('a') is a
+    patch.object(Symbols, 'resolve', return_value=None)
+    assert s3.resolve('a') is a
+    # only the symbols of s3 have been searched
+    assert Symbols.resolve.call_count == 1
+
+
+def test_scope_resolve_invalidate():
+    s1 = Scope()
+    s2 = Scope(parent=s1)
+    s3 = Scope(parent=s2)
+    assert s3.resolve('a') is None
+    a = Symbol('a', IntType.instance())
+    s1.insert(a)
+    assert s3.resolve('a') is a
+    a2 = Symbol('a', StringType.instance())
+    s2.insert(a2)
+    assert s3.resolve('a') is a2
+    assert s1.resolve('a') is a
+
+
+def test_scope_resolve_shadow():
+    s1 = Scope()
+    s2 = Scope(parent=s1)
+    a = Symbol('a', IntType.instance())
+    a2 = Symbol('a', StringType.instance())
+    s1.insert(a)
+    assert s2.resolve('a') is a
+    s2.insert(a2)
+    assert s2.resolve('a') is a2
+    assert s1.resolve('a') is a
+
+
+def test_scope_generations_shared():
+    s1 = Scope()
+    s2 = Scope(parent=s1)
+    s3 = Scope()
+    assert s2.generations() is s1.generations()
+    assert s3.generations() is not s1.generations()
+    s2.insert(Symbol('a', IntType.instance()))
+    assert s1.generations() == {'a': 1}
+
+
+def test_scope_joiner_insert_to_invalidates():
+    root = Scope()
+    child = Scope(parent=root)
+    assert child.resolve('a') is None
+    if_scope = Scope(parent=root)
+    else_scope = Scope(parent=root)
+    a = Symbol('a', IntType.instance())
+    if_scope.insert(a)
+    else_scope.insert(Symbol('a', IntType.instance()))
+    joiner = ScopeJoiner()
+    joiner.add(if_scope)
+    joiner.add(else_scope)
+    joiner.insert_to(None, root)
+    assert root.resolve('a') is a
+    assert child.resolve('a') is a
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+from itertools import product
+
+from lark.lexer import Token
+
+from pytest import mark
+
+from storyscript.compiler.semantics.types.Lattice import Lattice, memoize
+from storyscript.compiler.semantics.types.Types import AnyType, \
+    BooleanType, FloatType, IntType, ListType, MapType, NoneType, \
+    ObjectType, RangeType, RegExpType, StringType, TimeType, explicit_cast
+
+
+all_types = [
+    AnyType.instance(),
+    BooleanType.instance(),
+    FloatType.instance(),
+    IntType.instance(),
+    NoneType.instance(),
+    ObjectType.instance(),
+    RangeType.instance(),
+    RegExpType.instance(),
+    StringType.instance(),
+    TimeType.instance(),
+    ListType(IntType.instance()),
+    ListType(FloatType.instance()),
+    ListType(AnyType.instance()),
+    ListType(ListType(StringType.instance())),
+    ListType(ObjectType.instance()),
+    MapType(StringType.instance(), IntType.instance()),
+    MapType(StringType.instance(), FloatType.instance()),
+    MapType(AnyType.instance(), AnyType.instance()),
+    MapType(IntType.instance(), ListType(BooleanType.instance())),
+]
+
+type_pairs = list(product(all_types, all_types))
+
+operators = [Token(t, v) for t, v in [
+    ('PLUS', '+'), ('DASH', '-'), ('MULTIPLIER', '*'), ('BSLASH', '/'),
+    ('MODULUS', '%'), ('POWER', '^'),
+]]
+
+
+def outcome(fn, *args):
+    """
+    Returns the result of a type operation or the class of the exception it
+    raised, s.t. unsupported operations can be compared too.
+    """
+    try:
+        return fn(*args)
+    except Exception as e:
+        return e.__class__
+
+
+def test_lattice_memoize():
+    calls = []
+
+    def fn(t1, t2, op):
+        calls.append((t1, t2, op))
+        return t1
+
+    memoized = memoize(fn)
+    int_ = IntType.instance()
+    plus = Token('PLUS', '+')
+    assert memoized(int_, int_, plus) == int_
+    assert memoized(IntType(), IntType(), Token('PLUS', '+')) == int_
+    assert len(calls) == 1
+    assert memoized(int_, int_, Token('DASH', '-')) == int_
+    assert len(calls) == 2
+
+
+def test_lattice_memoize_none():
+    calls = []
+
+    def fn(t1):
+        calls.append(t1)
+        return None
+
+    memoized = memoize(fn)
+    assert memoized(IntType.instance()) is None
+    assert memoized(IntType.instance()) is None
+    assert len(calls) == 1
+
+
+def test_lattice_memoize_not_cacheable():
+    obj = ObjectType(obj='.obj.')
+    memoized = memoize(lambda t1, t2: t1)
+    assert memoized(obj, IntType.instance()) is obj
+    assert memoized(ListType(obj), IntType.instance()) == ListType(obj)
+    assert memoized.cache == {}
+
+
+def test_lattice_object_identity():
+    """
+    Types wrapping different objects must not share cached results.
+    """
+    l1 = ListType(ObjectType(obj='.o1.'))
+    l2 = ListType(ObjectType(obj='.o2.'))
+    plus = Token('PLUS', '+')
+    assert Lattice.binary_op(l1, l1, plus).inner.object() == '.o1.'
+    assert Lattice.binary_op(l2, l2, plus).inner.object() == '.o2.'
+
+
+@mark.parametrize('left,right', type_pairs)
+@mark.parametrize('op', operators)
+def test_lattice_binary_op(left, right, op):
+    expected = outcome(left.binary_op, right, op)
+    assert outcome(Lattice.binary_op, left, right, op) == expected
+    # cached lookup
+    assert outcome(Lattice.binary_op, left, right, op) == expected
+
+
+@mark.parametrize('left,right', type_pairs)
+def test_lattice_cmp(left, right):
+    expected = outcome(left.cmp, right)
+    assert outcome(Lattice.cmp, left, right) == expected
+    assert outcome(Lattice.cmp, left, right) == expected
+
+
+@mark.parametrize('left,right', type_pairs)
+def test_lattice_equal(left, right):
+    expected = outcome(left.equal, right)
+    assert outcome(Lattice.equal, left, right) == expected
+    assert outcome(Lattice.equal, left, right) == expected
+
+
+@mark.parametrize('target,source', type_pairs)
+def test_lattice_can_be_assigned(target, source):
+    expected = outcome(target.can_be_assigned, source)
+    assert outcome(Lattice.can_be_assigned, target, source) == expected
+    assert outcome(Lattice.can_be_assigned, target, source) == expected
+
+
+@mark.parametrize('from_,to', type_pairs)
+def test_lattice_explicit_cast(from_, to):
+    expected = outcome(explicit_cast, from_, to)
+    assert outcome(Lattice.explicit_cast, from_, to) == expected
+    assert outcome(Lattice.explicit_cast, from_, to) == expected
+
+
+@mark.parametrize('t1,t2', type_pairs)
+def test_types_hash(t1, t2):
+    if t1 == t2:
+        assert hash(t1) == hash(t2)
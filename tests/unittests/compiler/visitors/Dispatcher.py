@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+from storyscript.compiler.visitors.Dispatcher import Dispatcher
+
+
+class Visitor(metaclass=Dispatcher):
+
+    def a(self, tree):
+        return ('a', tree)
+
+    @staticmethod
+    def b(tree):
+        return ('b', tree)
+
+    @classmethod
+    def c(cls, tree):
+        return ('c', cls, tree)
+
+    def _private(self, tree):
+        pass
+
+
+class ChildVisitor(Visitor):
+
+    def a(self, tree):
+        return ('child', tree)
+
+
+class SelectedVisitor(Visitor):
+    dispatch_nodes = ['b', 'unknown']
+
+
+def test_dispatcher_dispatch_table():
+    table = Visitor.dispatch_table()
+    assert sorted(table.keys()) == ['a', 'b', 'c']
+    assert table['a'] is Visitor.__dict__['a']
+    assert Visitor.dispatch_table() is table
+
+
+def test_dispatcher_handlers():
+    visitor = Visitor()
+    table = Visitor.dispatch_table()
+    assert table['a'](visitor, '.tree.') == ('a', '.tree.')
+    assert table['b'](visitor, '.tree.') == ('b', '.tree.')
+    assert table['c'](visitor, '.tree.') == ('c', Visitor, '.tree.')
+
+
+def test_dispatcher_inheritance():
+    table = ChildVisitor.dispatch_table()
+    assert table['a'](ChildVisitor(), '.tree.') == ('child', '.tree.')
+    assert table['b'](ChildVisitor(), '.tree.') == ('b', '.tree.')
+    assert Visitor.dispatch_table()['a'](Visitor(), 1) == ('a', 1)
+
+
+def test_dispatcher_dispatch_nodes():
+    assert list(SelectedVisitor.dispatch_table().keys()) == ['b']
+
+
+def test_dispatcher_patch(patch):
+    """
+    Ensures that patched handlers are dispatched to.
+    """
+    table = ChildVisitor.dispatch_table()
+    patch.object(Visitor, 'b')
+    assert ChildVisitor.dispatch_table() is not table
+    ChildVisitor.dispatch_table()['b'](ChildVisitor(), '.tree.')
+    Visitor.b.assert_called_with('.tree.')
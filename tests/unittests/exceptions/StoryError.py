@@ -9,6 +9,7 @@ from lark.lexer import Token
 from pytest import fixture, mark
 
 from storyscript.ErrorCodes import ErrorCodes
+from storyscript.FakeLine import FakeLine
 from storyscript.Intention import Intention
 from storyscript.exceptions import CompilerError, StoryError
 
@@ -79,6 +80,8 @@ def test_storyerror_int_line_fake_tree(patch, storyerror, error):
     """
     storyerror.error.line = '1.2.3'
     assert storyerror.int_line() == 1
+    storyerror.error.line = FakeLine(4, 2)
+    assert storyerror.int_line() == 4
 
 
 def test_storyerror_get_line(patch, storyerror, error):
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+from pytest import fixture
+
+import storyscript.hub.Hub as HubModule
+from storyscript.hub.Hub import HubSnapshot, hub_snapshot
+
+
+@fixture
+def service_wrapper(patch):
+    patch.object(HubModule, 'ServiceWrapper')
+    return HubModule.ServiceWrapper
+
+
+def test_hub_snapshot(patch):
+    patch.object(HubSnapshot, 'load')
+    hub_snapshot.cache_clear()
+    first = hub_snapshot('hub.json')
+    second = hub_snapshot('hub.json')
+    hub_snapshot.cache_clear()
+    HubSnapshot.load.assert_called_once_with('hub.json')
+    assert first is second
+    assert first == HubSnapshot.load()
+
+
+def test_hubsnapshot_load(service_wrapper):
+    snapshot = HubSnapshot.load('hub.json')
+    service_wrapper.from_json_file.assert_called_with('hub.json')
+    assert snapshot.services == service_wrapper.from_json_file()
+
+
+def test_hubsnapshot_write(service_wrapper):
+    HubSnapshot.write('hub.json', ['http'])
+    service_wrapper.assert_called_with(['http'])
+    service_wrapper().as_json_file.assert_called_with('hub.json')
+
+
+def test_hubsnapshot_get(magic):
+    services = magic()
+    result = HubSnapshot(services).get('http', wrap_service=True)
+    services.get.assert_called_with('http')
+    assert result == services.get()
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+from pytest import fixture
+
+from storyscript.Features import Features
+from storyscript.compiler.Compiler import Compiler
+from storyscript.exceptions import CompilerError, StoryError
+from storyscript.lsp import Document
+from storyscript.lsp.Document import CompletionKind
+from storyscript.parser import Tree
+
+
+@fixture
+def document():
+    return Document('uri', 'a = 1', version=1)
+
+
+def test_document_init(document):
+    assert document.uri == 'uri'
+    assert document.source == 'a = 1'
+    assert document.version == 1
+    assert document.dirty is True
+    assert isinstance(document.features, Features)
+    assert document.tree is None
+    assert document.scopes == []
+
+
+def test_document_update(document):
+    document.dirty = False
+    document.update('a = 1', version=2)
+    assert document.version == 2
+    assert document.dirty is False
+    document.update('a = 2', version=3)
+    assert document.source == 'a = 2'
+    assert document.dirty is True
+
+
+def test_document_compile(patch, magic, document):
+    patch.object(Compiler, 'generate', return_value=('lowered', 'module'))
+    patch.object(Document, 'find_scopes')
+    patch.object(Tree, 'shifted_copy')
+    patch('storyscript.lsp.Document.JSONCompiler')
+    parser = magic()
+    tree = parser.parse_incremental.return_value
+    tree.data = 'start'
+    document.compile(parser)
+    parser.parse_incremental.assert_called_with('a = 1', None)
+    assert document.tree == tree
+    tree.shifted_copy.assert_called_with(0, 0)
+    Compiler.generate.assert_called_with(tree.shifted_copy(),
+                                         document.features)
+    assert document.lowered == 'lowered'
+    assert document.module == 'module'
+    Document.find_scopes.assert_called_with('lowered')
+    assert document.scopes == Document.find_scopes()
+    assert document.error is None
+    assert document.dirty is False
+
+
+def test_document_compile_unchanged(magic, document):
+    parser = magic()
+    document.dirty = False
+    document.compile(parser)
+    assert parser.parse_incremental.call_count == 0
+
+
+def test_document_compile_error(patch, magic, document):
+    error = CompilerError('error')
+    patch.object(Compiler, 'generate', side_effect=error)
+    parser = magic()
+    parser.parse_incremental.return_value = Tree('start', [])
+    document.lowered = 'previous'
+    document.compile(parser)
+    assert isinstance(document.error, StoryError)
+    assert document.error.error == error
+    assert document.lowered == 'previous'
+
+
+def test_document_compile_internal_error(magic, document):
+    parser = magic()
+    parser.parse_incremental.side_effect = ValueError('.error.')
+    document.compile(parser)
+    assert isinstance(document.error.error, ValueError)
+
+
+def test_document_draft(document):
+    draft = document.draft()
+    assert draft is not document
+    assert draft.source == document.source
+    draft.source = 'a = 2'
+    assert document.source == 'a = 1'
+
+
+def test_document_accept(document):
+    draft = document.draft()
+    draft.dirty = False
+    draft.lowered = 'lowered'
+    assert document.accept(draft) is True
+    assert document.lowered == 'lowered'
+    assert document.dirty is False
+
+
+def test_document_accept_compiled(document):
+    """
+    Ensures a document compiled in the meantime keeps its compilation.
+    """
+    draft = document.draft()
+    draft.lowered = 'lowered'
+    document.dirty = False
+    assert document.accept(draft) is True
+    assert document.lowered is None
+
+
+def test_document_accept_outdated(document):
+    draft = document.draft()
+    draft.lowered = 'lowered'
+    document.update('a = 2', version=2)
+    assert document.accept(draft) is False
+    assert document.lowered is None
+    assert document.dirty is True
+    draft = document.draft()
+    document.update('a = 2', version=3)
+    assert document.accept(draft) is False
+
+
+def test_document_diagnostics_none(document):
+    assert document.diagnostics() == []
+
+
+def test_document_diagnostics(patch, magic, document):
+    patch.object(StoryError, 'short_message', return_value='message')
+    document.error = StoryError(magic(line='1', column='3', end_column='4'),
+                                None)
+    assert document.diagnostics() == [{
+        'range': {
+            'start': {'line': 0, 'character': 2},
+            'end': {'line': 0, 'character': 3},
+        },
+        'severity': 1,
+        'source': 'storyscript',
+        'message': 'message',
+    }]
+
+
+def test_document_columns(magic):
+    document = Document('uri', '  abc')
+    assert document.columns(magic(column='2', end_column='5'), 0) == (1, 4)
+    assert document.columns(magic(column='2', end_column='None'), 0) == (1, 2)
+    assert document.columns(magic(column='None'), 0) == (2, 5)
+
+
+def test_document_block_end():
+    lines = ['a', 'if a', '  b', '', '     ', '  c', 'd']
+    assert Document.block_end(lines, 2, 3) == 6
+    assert Document.block_end(lines, 7, 7) == 7
+
+
+def test_document_scope(document):
+    document.scopes = [((1, 10), 'root'), ((2, 4), 'foreach')]
+    assert document.scope(1) == 'root'
+    assert document.scope(3) == 'foreach'
+    assert document.scope(11) is None
+
+
+def test_document_items():
+    items = Document.items({'ab': 'int', 'b': 'int'}, 'a',
+                           CompletionKind.variable)
+    assert items == [{'label': 'ab', 'kind': 6, 'detail': 'int'}]
+    items = Document.items(['b', 'a'], '', CompletionKind.keyword)
+    assert items == [{'label': 'a', 'kind': 14}, {'label': 'b', 'kind': 14}]
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+
+from pytest import fixture
+
+from storyscript.lsp import Document, LanguageServer
+from storyscript.parser import ParserPool
+
+
+def frame(message):
+    body = json.dumps(message).encode('utf-8')
+    return b'Content-Length: %d\r\n\r\n' % len(body) + body
+
+
+@fixture
+def server():
+    return LanguageServer(io.BytesIO(), io.BytesIO())
+
+
+def test_language_server_read():
+    reader = io.BytesIO(frame({'id': 1}) + b'Content-Type: x\r\n' +
+                        frame({'id': 2}))
+    server = LanguageServer(reader, io.BytesIO())
+    assert server.read() == {'id': 1}
+    assert server.read() == {'id': 2}
+    assert server.read() is None
+
+
+def test_language_server_write(server):
+    server.write({'id': 1})
+    assert server.writer.getvalue() == frame({'id': 1, 'jsonrpc': '2.0'})
+
+
+def test_language_server_handle(patch, server):
+    patch.object(LanguageServer, 'write')
+    patch.object(LanguageServer, 'shutdown', return_value='result')
+    server.handle({'id': 1, 'method': 'shutdown', 'params': {'a': 1}})
+    LanguageServer.shutdown.assert_called_with({'a': 1})
+    LanguageServer.write.assert_called_with({'id': 1, 'result': 'result'})
+
+
+def test_language_server_handle_notification(patch, server):
+    patch.object(LanguageServer, 'write')
+    patch.object(LanguageServer, 'did_close')
+    server.handle({'method': 'textDocument/didClose', 'params': {}})
+    LanguageServer.did_close.assert_called_with({})
+    assert LanguageServer.write.call_count == 0
+
+
+def test_language_server_handle_unknown(patch, server):
+    patch.object(LanguageServer, 'write')
+    server.handle({'method': 'unknown'})
+    assert LanguageServer.write.call_count == 0
+    server.handle({'id': 1, 'method': 'unknown'})
+    error = LanguageServer.write.call_args[0][0]['error']
+    assert error['code'] == -32601
+
+
+def test_language_server_handle_error(patch, server):
+    patch.object(LanguageServer, 'write')
+    patch.object(LanguageServer, 'hover', side_effect=KeyError('uri'))
+    server.handle({'id': 1, 'method': 'textDocument/hover'})
+    error = LanguageServer.write.call_args[0][0]['error']
+    assert error['code'] == -32603
+
+
+def test_language_server_did_open(patch, server):
+    patch.object(LanguageServer, 'schedule')
+    server.did_open({'textDocument': {'uri': 'uri', 'text': 'a = 1',
+                                      'version': 1}})
+    document = server.documents['uri']
+    assert document.source == 'a = 1'
+    assert document.features == server.features
+    LanguageServer.schedule.assert_called_with('uri', delay=0)
+
+
+def test_language_server_did_change(patch, server):
+    patch.object(LanguageServer, 'schedule')
+    server.documents['uri'] = Document('uri', 'a = 1')
+    server.did_change({'textDocument': {'uri': 'uri', 'version': 2},
+                       'contentChanges': [{'text': 'a'}, {'text': 'a = 2'}]})
+    assert server.documents['uri'].source == 'a = 2'
+    assert server.documents['uri'].version == 2
+    LanguageServer.schedule.assert_called_with('uri', delay=server.debounce)
+
+
+def test_language_server_did_close(patch, server):
+    patch.object(LanguageServer, 'notify')
+    server.documents['uri'] = 'document'
+    server.pending['uri'] = 0
+    server.did_close({'textDocument': {'uri': 'uri'}})
+    assert server.documents == {}
+    assert server.pending == {}
+    LanguageServer.notify.assert_called_with(
+        'textDocument/publishDiagnostics', {'uri': 'uri', 'diagnostics': []})
+
+
+def test_language_server_compiled(patch, magic, server):
+    def compile(document):
+        document.dirty = False
+
+    patch.object(LanguageServer, 'compile', side_effect=compile)
+    document = magic(dirty=True)
+    server.documents['uri'] = document
+    server.pending['uri'] = 0
+    assert server.compiled('uri') == document
+    LanguageServer.compile.assert_called_with(document)
+    assert server.pending == {}
+    assert server.compiled('uri') == document
+    assert LanguageServer.compile.call_count == 1
+
+
+def test_language_server_compile(patch, magic, server):
+    patch.object(LanguageServer, 'publish')
+    patch.object(ParserPool, 'instance')
+    document = magic()
+    server.compile(document)
+    document.compile.assert_called_with(ParserPool.instance().get())
+    LanguageServer.publish.assert_called_with(document)
+
+
+def test_language_server_publish(patch, magic, server):
+    patch.object(LanguageServer, 'notify')
+    document = magic(uri='uri', version=1)
+    server.publish(document)
+    LanguageServer.notify.assert_called_with(
+        'textDocument/publishDiagnostics',
+        {'uri': 'uri', 'version': 1,
+         'diagnostics': document.diagnostics()})
+
+
+def test_language_server_due_drafts(magic, server):
+    server.running = True
+    document = magic()
+    server.documents = {'due': document, 'later': magic()}
+    server.pending = {'due': 0, 'later': float('inf')}
+    with server.changed:
+        assert server.due_drafts() == [document.draft()]
+    assert server.pending == {'later': float('inf')}
+
+
+def test_language_server_due_drafts_stopped(server):
+    assert server.due_drafts() is None
+
+
+def test_language_server_compile_pending(patch, magic, server):
+    """
+    Ensures drafts are compiled without holding the lock and only current
+    drafts are published.
+    """
+    patch.object(LanguageServer, 'publish')
+    patch.object(ParserPool, 'instance')
+    current, outdated = magic(uri='current'), magic(uri='outdated')
+    server.documents = {'current': magic(), 'outdated': magic()}
+    server.documents['outdated'].accept.return_value = False
+    locked = []
+
+    def compile(parser):
+        locked.append(server.lock._is_owned())
+
+    current.compile.side_effect = outdated.compile.side_effect = compile
+    patch.object(LanguageServer, 'due_drafts',
+                 side_effect=[[current, outdated], None])
+    server.compile_pending()
+    assert locked == [False, False]
+    server.documents['current'].accept.assert_called_with(current)
+    LanguageServer.publish.assert_called_once_with(
+        server.documents['current'])
+
+
+def test_language_server_hover(patch, magic, server):
+    patch.object(LanguageServer, 'compiled')
+    LanguageServer.compiled().hover.return_value = 'a: int'
+    params = {'textDocument': {'uri': 'uri'},
+              'position': {'line': 1, 'character': 2}}
+    result = server.hover(params)
+    LanguageServer.compiled.assert_called_with('uri')
+    LanguageServer.compiled().hover.assert_called_with(1, 2)
+    assert result == {'contents': {'kind': 'plaintext', 'value': 'a: int'}}
+    LanguageServer.compiled().hover.return_value = None
+    assert server.hover(params) is None
+
+
+def test_language_server_completion(patch, server):
+    patch.object(LanguageServer, 'compiled')
+    params = {'textDocument': {'uri': 'uri'},
+              'position': {'line': 1, 'character': 2}}
+    result = server.completion(params)
+    LanguageServer.compiled().completions.assert_called_with(1, 2)
+    assert result == {'isIncomplete': False,
+                      'items': LanguageServer.compiled().completions()}
+
+
+def test_language_server_serve(patch, server):
+    server.reader = io.BytesIO(frame({'id': 1, 'method': 'shutdown'}) +
+                               frame({'method': 'exit'}) +
+                               frame({'id': 2, 'method': 'shutdown'}))
+    server.serve()
+    assert server.writer.getvalue() == \
+        frame({'id': 1, 'result': None, 'jsonrpc': '2.0'})
@@ -2,11 +2,14 @@
 import io
 
 from lark import Lark
+from lark.lexer import Token
 
 from pytest import fixture
 
 from storyscript.parser import (CustomIndenter, Grammar, Parser, Transformer,
                                 Tree)
+from storyscript.parser.Parser import IncrementalState
+from storyscript.parser.Transformer import TransformerCallbacks
 
 
 @fixture
@@ -16,6 +19,7 @@ def parser(magic, patch):
     parser.algo = 'lalr'
     parser.ebnf = None
     parser.lark = magic()
+    parser.callbacks = magic()
     return parser
 
 
@@ -24,6 +28,8 @@ def test_parser_init(patch):
     parser = Parser()
     assert parser.algo == 'lalr'
     assert parser.ebnf is None
+    assert isinstance(parser.callbacks, TransformerCallbacks)
+    assert isinstance(parser.callbacks.transformer, Transformer)
 
 
 def test_parser_init_algo(patch):
@@ -72,18 +78,50 @@ def test_parser_lark(patch, parser):
     patch.init(Lark)
     patch.many(Parser, ['indenter', 'grammar'])
     result = parser._lark()
-    kwargs = {'parser': parser.algo, 'postlex': Parser.indenter()}
+    kwargs = {'parser': parser.algo, 'postlex': Parser.indenter(),
+              'transformer': parser.callbacks}
     Lark.__init__.assert_called_with(parser.grammar(), **kwargs)
     assert isinstance(result, Lark)
 
 
+def test_parser_lark_earley(patch, parser):
+    patch.init(Lark)
+    patch.many(Parser, ['indenter', 'grammar'])
+    parser.algo = 'earley'
+    parser._lark()
+    kwargs = {'parser': 'earley', 'postlex': Parser.indenter()}
+    Lark.__init__.assert_called_with(parser.grammar(), **kwargs)
+
+
+def test_parser_clone_earley(patch, parser):
+    patch.many(Parser, ['_lark', 'transformer'])
+    parser.algo = 'earley'
+    result = parser.clone()
+    assert result is not parser
+    assert result.lark == Parser._lark()
+    assert result.callbacks.transformer == Parser.transformer()
+    assert parser.lark != result.lark
+
+
 def test_parser_parse(patch, parser):
     """
     Ensures the build method can build the grammar
     """
     patch.many(Parser, ['transformer'])
+    result = parser.parse('source', allow_single_quotes=True)
+    parser.callbacks.reset.assert_called_with(True)
+    parser.lark.parse.assert_called_with('source\n')
+    parser.callbacks.raise_error.assert_called()
+    assert Parser.transformer.call_count == 0
+    assert result == parser.lark.parse()
+
+
+def test_parser_parse_earley(patch, parser):
+    patch.many(Parser, ['transformer'])
+    parser.algo = 'earley'
     result = parser.parse('source', allow_single_quotes=False)
     parser.lark.parse.assert_called_with('source\n')
+    Parser.transformer.assert_called_with(False)
     Parser.transformer().transform.assert_called_with(parser.lark.parse())
     assert result == Parser.transformer().transform()
 
@@ -95,6 +133,54 @@ def test_parser_parse_empty(patch, parser, magic):
     assert parser.parse('', allow_single_quotes=False) == Tree('empty', [])
 
 
+def test_parser_parse_incremental(patch, parser):
+    """
+    Ensures that a story without a previous tree is parsed completely
+    """
+    block = Tree('block', [Token('NAME', 'a', line=1)])
+    patch.object(Parser, 'parse', return_value=Tree('start', [block]))
+    result = parser.parse_incremental('a', allow_single_quotes=True)
+    Parser.parse.assert_called_with('a', True)
+    assert result == Parser.parse()
+    assert result.parser == parser
+    assert result._incremental == IncrementalState(['a'], 1, [(1, 1)], True)
+
+
+def test_parser_parse_incremental_empty(patch, parser):
+    patch.object(Parser, 'parse', return_value=Tree('empty', []))
+    assert parser.parse_incremental('') == Tree('empty', [])
+    assert '_incremental' not in Parser.parse().__dict__
+
+
+def test_parser_parse_incremental_unchanged(patch, parser):
+    patch.object(Parser, 'parse')
+    previous = Tree('start', [])
+    previous._incremental = IncrementalState(['a'], 1, [], False)
+    assert parser.parse_incremental('a', previous) is previous
+    assert Parser.parse.call_count == 0
+
+
+def test_parser_parse_incremental_single_quotes(patch, parser):
+    """
+    Ensures that trees are not reused with another string quoting
+    """
+    patch.object(Parser, '_parse_full')
+    previous = Tree('start', [])
+    previous._incremental = IncrementalState(['a'], 1, [], False)
+    result = parser.parse_incremental('a', previous, allow_single_quotes=True)
+    Parser._parse_full.assert_called_with('a', ['a'], True)
+    assert result == Parser._parse_full()
+
+
+def test_parser_separated():
+    lines = ['a', '', '  # comment', 'b', 'c', 'd', ' e']
+    assert Parser._separated(lines, [(1, 1), (4, 4)], 1)
+    assert Parser._separated(lines, [(4, 4), (5, 5)], 1)
+    assert not Parser._separated(lines, [(4, 4), (4, 4)], 1)
+    assert not Parser._separated(lines, [(4, 4), (6, 6)], 1)
+    assert not Parser._separated(lines, [(6, 6), (7, 7)], 1)
+
+
 def test_parser_lex(patch, parser):
     patch.many(Parser, ['indenter'])
     result = parser.lex('source')
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+import threading
+
+from storyscript.parser import Parser, ParserPool
+from storyscript.parser.ParserPool import pool
+
+
+def test_parser_pool_instance():
+    assert ParserPool.instance() is pool
+
+
+def test_parser_pool_get(patch):
+    patch.init(Parser)
+    patch.object(Parser, 'clone')
+    parser_pool = ParserPool()
+    result = parser_pool.get()
+    Parser.__init__.assert_called_with(ebnf=None)
+    assert result == Parser.clone.return_value
+    assert parser_pool.get() is result
+    assert Parser.__init__.call_count == 1
+    assert Parser.clone.call_count == 1
+
+
+def test_parser_pool_get_ebnf(patch):
+    patch.init(Parser)
+    patch.object(Parser, 'clone', side_effect=lambda: object())
+    parser_pool = ParserPool()
+    assert parser_pool.get('a.ebnf') is not parser_pool.get()
+    Parser.__init__.assert_called_with(ebnf=None)
+    assert Parser.__init__.call_count == 2
+
+
+def test_parser_pool_get_threads(patch):
+    """
+    Ensures that every thread gets its own clone of the same parser.
+    """
+    patch.init(Parser)
+    patch.object(Parser, 'clone', side_effect=lambda: object())
+    parser_pool = ParserPool()
+    parsers = []
+
+    def get():
+        parsers.append(parser_pool.get())
+
+    threads = [threading.Thread(target=get) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(map(id, parsers))) == 4
+    assert Parser.__init__.call_count == 1
@@ -6,6 +6,7 @@ from pytest import fixture, mark, raises
 
 from storyscript.exceptions import StorySyntaxError
 from storyscript.parser import Transformer, Tree
+from storyscript.parser.Transformer import TransformerCallbacks
 
 
 @fixture
@@ -56,6 +57,26 @@ def test_transformer_is_keyword_future(syntax_error, keyword):
     syntax_error.assert_called_with(name, token=token, format_args=format)
 
 
+def test_transformer_keyword_errors():
+    for keyword in Transformer.reserved_keywords:
+        assert Transformer.keyword_errors[keyword] == 'reserved_keyword'
+    for keyword in Transformer.future_reserved_keywords:
+        assert Transformer.keyword_errors[keyword] == \
+            'future_reserved_keyword'
+
+
+def test_transformer_is_keyword_internal(syntax_error):
+    token = Token('any', '__name')
+    with raises(StorySyntaxError):
+        Transformer.is_keyword(token)
+    syntax_error.assert_called_with('path_name_internal', token=token)
+
+
+@mark.parametrize('name', ['a', '_a', 'iffy', 'services', 'a__'])
+def test_transformer_is_keyword_name(name):
+    assert Transformer.is_keyword(Token('NAME', name)) is None
+
+
 def test_transformer_assignment(magic):
     matches = [magic(), magic()]
     assert Transformer.assignment(matches) == Tree('assignment', matches)
@@ -242,3 +263,37 @@ def test_multi_line_string_multi_line_start_backslash():
 
 def test_multi_line_string_multi_line_start_multiple_backslashs():
     assert Transformer.multi_line_string('\\\n\\\n  b') == 'b'
+
+
+def test_transformer_callbacks_reset():
+    callbacks = TransformerCallbacks(Transformer())
+    callbacks.error = Exception()
+    callbacks.reset(allow_single_quotes=True)
+    assert callbacks.transformer.allow_single_quotes is True
+    assert callbacks.error is None
+
+
+def test_transformer_callbacks_rule():
+    callbacks = TransformerCallbacks(Transformer())
+    result = callbacks.start(['matches'])
+    assert result == Tree('start', ['matches'])
+    callbacks.raise_error()
+
+
+def test_transformer_callbacks_deferred_error(patch):
+    """
+    Ensures that only the first error of a rule is raised after parsing.
+    """
+    error = StorySyntaxError('reserved_keyword')
+    patch.object(Transformer, 'path', side_effect=[error, Exception()])
+    patch.object(Transformer, 'absolute_expression')
+    callbacks = TransformerCallbacks(Transformer())
+    assert callbacks.path(['a']) == Tree('path', ['a'])
+    assert callbacks.path(['b']) == Tree('path', ['b'])
+    assert callbacks.absolute_expression(['c']) == \
+        Tree('absolute_expression', ['c'])
+    assert Transformer.absolute_expression.call_count == 0
+    with raises(StorySyntaxError) as e:
+        callbacks.raise_error()
+    assert e.value is error
+    callbacks.raise_error()
@@ -6,6 +6,7 @@ from lark.tree import Tree as LarkTree
 
 from pytest import fixture, raises
 
+from storyscript.FakeLine import FakeLine
 from storyscript.exceptions.CompilerError import CompilerError
 from storyscript.parser import Tree
 
@@ -125,6 +126,50 @@ def test_tree_end_column():
     assert tree.end_column() == '1'
 
 
+def test_tree_line_range():
+    first = Token('WORD', 'word', line=2)
+    last = Token('WORD', 'word', line=3, end_line=5)
+    tree = Tree('outer', [Tree('path', [first]), Token('WORD', 'word'), last])
+    assert tree.line_range() == (2, 5)
+
+
+def test_tree_line_range_fake_lines():
+    tree = Tree('outer', [Token('WORD', 'word', line='4.1'),
+                          Token('WORD', 'word', line='2')])
+    assert tree.line_range() == (2, 4)
+
+
+def test_tree_source_line():
+    assert Tree.source_line(3) == 3
+    assert Tree.source_line('3') == 3
+    assert Tree.source_line('3.2') == 3
+    assert Tree.source_line(FakeLine(3, 2)) == 3
+
+
+def test_tree_line_range_none():
+    assert Tree('outer', [Token('WORD', 'word')]).line_range() is None
+
+
+def test_tree_shifted_copy():
+    token = Token('WORD', 'word', 4, 2, 3, 2, 7)
+    token.value = 'value'
+    created = Token('WORD', 'word', line='2')
+    inner = Tree('path', [token, created])
+    inner._line = 2
+    tree = Tree('outer', [inner])
+    result = tree.shifted_copy(3, 10)
+    assert result == tree
+    assert result.children[0] is not inner
+    assert result.children[0]._line == 5
+    copy = result.children[0].children[0]
+    assert copy.value == 'value'
+    assert str(copy) == 'word'
+    assert (copy.pos_in_stream, copy.line, copy.column, copy.end_line,
+            copy.end_column) == (14, 5, 3, 5, 7)
+    assert result.children[0].children[1].line == '5'
+    assert token.line == 2
+
+
 def test_tree_insert():
     tree = Tree('tree', [])
     tree.insert('child')